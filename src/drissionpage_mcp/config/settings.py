@@ -77,7 +77,12 @@ DEFAULT_CONFIG = {
         "save_path": "screenshots",
         "filename_template": "screenshot_{timestamp}",
         "max_files": 100,
-        "auto_cleanup": True
+        "max_total_mb": 0,
+        "max_age_days": 0,
+        "auto_cleanup": True,
+        "llm_max_dimension": 1280,
+        "llm_format": "auto",
+        "llm_grayscale": False
     },
     "network": {
         "enable_monitoring": True,
@@ -88,7 +93,20 @@ DEFAULT_CONFIG = {
         },
         "request_timeout": 30,
         "max_redirects": 10,
-        "cache_disabled": False
+        "cache_disabled": False,
+        "max_records": 1000,
+        "max_cdp_events": 1000,
+        "keep_raw_events": False,
+        "persist_logs": False,
+        "log_batch_size": 200,
+        "log_flush_interval": 0.5,
+        "body_inline_max_kb": 64,
+        "body_max_mb": 10,
+        "body_max_entries": 500,
+        "browser_monitor_max_records": 5000,
+        "stream_max_connections": 100,
+        "stream_max_frames": 500,
+        "stream_max_payload_kb": 64
     },
     "dom": {
         "max_depth": 10,
@@ -111,6 +129,31 @@ DEFAULT_CONFIG = {
         "max_file_size_mb": 10,
         "backup_count": 5
     },
+    "cdp": {
+        "event_capacity": 1000,
+        "event_segment_events": 10000,
+        "event_spill_max_mb": 200,
+        "profile_on_start": False,
+        "profile_payloads": True,
+        "trace_categories": [
+            "devtools.timeline",
+            "disabled-by-default-devtools.timeline",
+            "disabled-by-default-devtools.timeline.frame",
+            "toplevel",
+            "v8.execute",
+            "blink.user_timing",
+            "loading"
+        ],
+        "trace_chunk_kb": 1024,
+        "long_task_ms": 50
+    },
+    "metrics": {
+        "collect_on_navigate": False,
+        "persist": True,
+        "baseline_runs": 10,
+        "regression_pct": 20,
+        "max_slowest_resources": 5
+    },
     "performance": {
         "element_wait_timeout": 10,
         "page_load_timeout": 30,
@@ -149,7 +192,9 @@ INSTRUCTIONS = {
             "name": "navigate",
             "description": "导航到指定URL",
             "parameters": {
-                "url": {"type": "string", "description": "目标URL", "required": True}
+                "url": {"type": "string", "description": "目标URL", "required": True},
+                "collect_metrics": {"type": "boolean", "description": "是否在导航后采集页面性能指标", "default": False},
+                "throttling": {"type": "string", "description": "本次导航使用的限速方案，结束后恢复", "required": False}
             }
         }
     },
@@ -229,6 +274,46 @@ INSTRUCTIONS = {
             "parameters": {
                 "format": {"type": "string", "enum": ["png", "jpeg"], "default": "png"}
             }
+        },
+        "get_screenshot_image": {
+            "name": "get_screenshot_image",
+            "description": "获取缩放压缩后的截图图片（MCP ImageContent），供多模态模型直接查看",
+            "parameters": {
+                "max_dimension": {"type": "integer", "description": "最长边像素上限", "default": 1280},
+                "image_format": {"type": "string", "enum": ["auto", "webp", "jpeg", "png"], "default": "auto"},
+                "quality": {"type": "integer", "description": "压缩质量（默认取screenshot.quality）", "required": False},
+                "grayscale": {"type": "boolean", "description": "是否灰度", "default": False},
+                "full_page": {"type": "boolean", "description": "是否全页面截图", "default": False},
+                "element_selector": {"type": "string", "description": "元素XPath（截取特定元素）", "required": False}
+            }
+        },
+        "get_screenshot_diff": {
+            "name": "get_screenshot_diff",
+            "description": "比较当前视口与上一次截图，返回变化区域（可附带裁剪图）",
+            "parameters": {
+                "block_size": {"type": "integer", "description": "分块边长（像素）", "default": 16},
+                "threshold": {"type": "integer", "description": "像素差阈值（0-255）", "default": 24},
+                "return_crops": {"type": "boolean", "description": "是否返回变化区域裁剪图", "default": False},
+                "max_regions": {"type": "integer", "description": "最多返回的区域数量", "default": 8}
+            }
+        },
+        "take_scroll_screenshots": {
+            "name": "take_scroll_screenshots",
+            "description": "滚动截取长页面，等待页面稳定后截图，可拼接为一张长图",
+            "parameters": {
+                "stitch": {"type": "boolean", "description": "是否拼接为长图", "default": True},
+                "max_frames": {"type": "integer", "description": "最大截图帧数", "default": 20},
+                "keep_frames": {"type": "boolean", "description": "拼接时是否保留各帧文件", "default": False},
+                "quiet_ms": {"type": "integer", "description": "资源请求静默时长（毫秒）", "default": 300}
+            }
+        },
+        "get_annotated_screenshot": {
+            "name": "get_annotated_screenshot",
+            "description": "获取标注了可交互元素编号的截图，同时返回编号到选择器（xpath: 定位符）的对照表",
+            "parameters": {
+                "max_elements": {"type": "integer", "description": "最多标注的元素数量", "default": 60},
+                "max_dimension": {"type": "integer", "description": "图片最长边像素上限", "default": None}
+            }
         }
     },
     "network_operations": {
@@ -236,14 +321,152 @@ INSTRUCTIONS = {
             "name": "enable_network_monitoring",
             "description": "启用网络监控",
             "parameters": {
-                "filter_types": {"type": "array", "items": {"type": "string"}, "description": "过滤的MIME类型", "required": False}
+                "filter_types": {"type": "array", "items": {"type": "string"}, "description": "过滤的MIME类型", "required": False},
+                "persist": {"type": "boolean", "description": "是否持久化到SQLite", "default": False},
+                "hosts": {"type": "array", "description": "域名列表（含子域名）", "default": None},
+                "url_patterns": {"type": "array", "description": "URL正则表达式列表", "default": None},
+                "status_ranges": {"type": "array", "description": "状态码条件，如 2xx、400-499", "default": None},
+                "resource_types": {"type": "array", "description": "资源类型，如 XHR、Fetch", "default": None}
             }
         },
         "get_network_logs": {
             "name": "get_network_logs",
             "description": "获取网络请求日志",
             "parameters": {
-                "limit": {"type": "integer", "description": "返回记录数限制", "default": 50}
+                "limit": {"type": "integer", "description": "返回记录数限制", "default": 50},
+                "cursor": {"type": "integer", "description": "增量读取的游标，首次传 0", "required": False}
+            }
+        },
+        "wait_for_network_idle": {
+            "name": "wait_for_network_idle",
+            "description": "等待网络空闲（进行中请求数不超过阈值并保持指定时长）",
+            "parameters": {
+                "idle_ms": {"type": "integer", "description": "需要保持空闲的时长（毫秒）", "default": 500},
+                "max_inflight": {"type": "integer", "description": "允许的进行中请求数", "default": 0},
+                "timeout": {"type": "number", "description": "最长等待时间（秒）", "default": 30}
+            }
+        },
+        "set_request_blocking": {
+            "name": "set_request_blocking",
+            "description": "按方案或URL模式拦截请求（text-only、no-media、no-images、no-third-party、no-trackers）",
+            "parameters": {
+                "profiles": {"type": "array", "description": "拦截方案列表", "default": None},
+                "url_patterns": {"type": "array", "description": "自定义URL通配模式", "default": None}
+            }
+        },
+        "set_network_replay_mode": {
+            "name": "set_network_replay_mode",
+            "description": "切换网络录制回放模式（record 录制响应到本地缓存，replay 从缓存返回响应，off 关闭）",
+            "parameters": {
+                "mode": {"type": "string", "description": "off / record / replay", "required": True},
+                "cache_name": {"type": "string", "description": "缓存名称", "default": "default"},
+                "offline": {"type": "boolean", "description": "回放未命中时是否直接失败", "default": False}
+            }
+        },
+        "get_request_blocking_stats": {
+            "name": "get_request_blocking_stats",
+            "description": "获取请求拦截数量和估算节省的流量",
+            "parameters": {}
+        },
+        "get_network_stats": {
+            "name": "get_network_stats",
+            "description": "获取按主机或资源类型聚合的请求数、字节数和耗时分位数",
+            "parameters": {
+                "group_by": {"type": "string", "description": "分组方式：host 或 resource_type", "default": "host"},
+                "sort_by": {"type": "string", "description": "排序字段", "default": "p95_ms"},
+                "limit": {"type": "integer", "description": "返回行数", "default": 20}
+            }
+        },
+        "enable_response_body_capture": {
+            "name": "enable_response_body_capture",
+            "description": "启用或停止响应体捕获，仅捕获匹配条件的响应",
+            "parameters": {
+                "mime_types": {"type": "array", "description": "需要捕获的mimeType关键字", "default": ["json"]},
+                "url_pattern": {"type": "string", "description": "URL正则表达式", "default": None},
+                "enabled": {"type": "boolean", "description": "是否启用", "default": True}
+            }
+        },
+        "get_response_body": {
+            "name": "get_response_body",
+            "description": "按请求ID获取已捕获的响应体",
+            "parameters": {
+                "request_id": {"type": "string", "description": "请求ID", "required": True},
+                "max_chars": {"type": "integer", "description": "返回文本的最大字符数", "default": 20000}
+            }
+        },
+        "start_har_recording": {
+            "name": "start_har_recording",
+            "description": "开始以流的方式录制HAR文件",
+            "parameters": {
+                "file_path": {"type": "string", "description": "HAR文件路径", "default": None}
+            }
+        },
+        "stop_har_recording": {
+            "name": "stop_har_recording",
+            "description": "停止录制HAR文件并补全文件结尾",
+            "parameters": {}
+        },
+        "enable_stream_capture": {
+            "name": "enable_stream_capture",
+            "description": "启用或停止 WebSocket / EventSource 消息捕获",
+            "parameters": {
+                "url_pattern": {"type": "string", "description": "连接URL正则表达式", "default": None},
+                "opcodes": {"type": "array", "description": "帧类型（text、binary、close、ping、pong）", "default": None},
+                "decode_json": {"type": "boolean", "description": "是否将文本消息解析为JSON", "default": False},
+                "enabled": {"type": "boolean", "description": "False 表示停止捕获", "default": True}
+            }
+        },
+        "get_stream_frames": {
+            "name": "get_stream_frames",
+            "description": "按游标增量获取 WebSocket / EventSource 消息",
+            "parameters": {
+                "cursor": {"type": "integer", "description": "上次返回的游标", "default": 0},
+                "limit": {"type": "integer", "description": "返回消息的最大数量", "default": 100},
+                "connection_id": {"type": "string", "description": "只返回该连接的消息", "default": None},
+                "include_connections": {"type": "boolean", "description": "是否附带连接列表", "default": False}
+            }
+        },
+        "query_network_logs": {
+            "name": "query_network_logs",
+            "description": "按条件查询已持久化的网络日志，支持字段投影和分页",
+            "parameters": {
+                "host": {"type": "string", "description": "主机名（精确匹配）", "default": None},
+                "mime_type": {"type": "string", "description": "mimeType，支持 image/* 前缀", "default": None},
+                "status_min": {"type": "integer", "description": "最小状态码", "default": None},
+                "status_max": {"type": "integer", "description": "最大状态码", "default": None},
+                "url_contains": {"type": "string", "description": "URL包含的关键字", "default": None},
+                "resource_type": {"type": "string", "description": "资源类型（如 XHR、Document）", "default": None},
+                "fields": {"type": "array", "description": "返回字段列表", "default": None},
+                "limit": {"type": "integer", "description": "每页条数", "default": 50},
+                "offset": {"type": "integer", "description": "偏移量", "default": 0},
+                "tab_id": {"type": "string", "description": "标签页/目标ID", "default": None}
+            }
+        },
+        "start_browser_network_monitor": {
+            "name": "start_browser_network_monitor",
+            "description": "启动浏览器级网络监听，覆盖所有标签页、弹窗和跨进程iframe",
+            "parameters": {
+                "filter_types": {"type": "array", "description": "mimeType类型列表", "default": None},
+                "persist": {"type": "boolean", "description": "是否写入网络日志数据库", "default": False},
+                "hosts": {"type": "array", "description": "主机名列表", "default": None},
+                "url_patterns": {"type": "array", "description": "URL正则表达式列表", "default": None},
+                "status_ranges": {"type": "array", "description": "状态码条件", "default": None},
+                "resource_types": {"type": "array", "description": "资源类型列表", "default": None}
+            }
+        },
+        "stop_browser_network_monitor": {
+            "name": "stop_browser_network_monitor",
+            "description": "停止浏览器级网络监听",
+            "parameters": {}
+        },
+        "get_browser_network_logs": {
+            "name": "get_browser_network_logs",
+            "description": "按游标增量获取浏览器级网络监听记录",
+            "parameters": {
+                "cursor": {"type": "integer", "description": "上次返回的游标", "default": 0},
+                "limit": {"type": "integer", "description": "返回数据的最大数量", "default": 50},
+                "target_id": {"type": "string", "description": "只返回该目标的记录", "default": None},
+                "include_stats": {"type": "boolean", "description": "是否附带目标列表和统计", "default": False}
             }
         },
         "clear_network_logs": {
@@ -270,6 +493,171 @@ INSTRUCTIONS = {
             }
         }
     },
+    "cdp_operations": {
+        "run_cdp_commands": {
+            "name": "run_cdp_commands",
+            "description": "批量执行多个CDP命令（按顺序逐条发送），单条失败或超时不影响其他命令",
+            "parameters": {
+                "commands": {"type": "array", "description": "命令列表（command、params、timeout）", "required": True},
+                "timeout": {"type": "number", "description": "默认的单条命令超时时间（秒）", "default": 10}
+            }
+        },
+        "get_cdp_domain_status": {
+            "name": "get_cdp_domain_status",
+            "description": "获取当前标签页CDP域的启用状态和使用者",
+            "parameters": {}
+        },
+        "listen_cdp_events": {
+            "name": "listen_cdp_events",
+            "description": "收集指定CDP事件，支持容量、采样比例和落盘",
+            "parameters": {
+                "event_name": {"type": "string", "description": "CDP事件名称", "required": True},
+                "capacity": {"type": "integer", "description": "内存中保留的事件数", "default": None},
+                "sample_rate": {"type": "number", "description": "采样比例（0-1）", "default": None},
+                "spill": {"type": "boolean", "description": "是否写入磁盘", "default": None}
+            }
+        },
+        "get_cdp_events": {
+            "name": "get_cdp_events",
+            "description": "按游标增量读取已收集的CDP事件",
+            "parameters": {
+                "event_name": {"type": "string", "description": "CDP事件名称", "required": True},
+                "cursor": {"type": "integer", "description": "上次返回的游标", "default": 0},
+                "limit": {"type": "integer", "description": "返回事件的最大数量", "default": 100}
+            }
+        },
+        "set_cdp_profiling": {
+            "name": "set_cdp_profiling",
+            "description": "开启或关闭CDP往返耗时分析，按CDP方法和触发的工具统计耗时与数据量",
+            "parameters": {
+                "enabled": {"type": "boolean", "description": "是否开启", "default": True},
+                "measure_payloads": {"type": "boolean", "description": "是否统计请求/响应大小", "default": True},
+                "reset": {"type": "boolean", "description": "是否清空已记录的数据", "default": False}
+            }
+        },
+        "get_cdp_profile": {
+            "name": "get_cdp_profile",
+            "description": "获取CDP往返耗时分析报告（也可读取资源 status://cdp_profile）",
+            "parameters": {
+                "sort_by": {"type": "string", "description": "方法表排序字段", "default": "total_ms"},
+                "limit": {"type": "integer", "description": "最大行数", "default": 30}
+            }
+        },
+        "dump_cdp_profile": {
+            "name": "dump_cdp_profile",
+            "description": "将完整的CDP耗时分析报告保存为JSON文件",
+            "parameters": {
+                "file_path": {"type": "string", "description": "文件路径", "required": False}
+            }
+        },
+        "start_tracing": {
+            "name": "start_tracing",
+            "description": "开始性能追踪（Tracing），结束时追踪数据以流的方式写入 gzip 文件",
+            "parameters": {
+                "categories": {"type": "array", "description": "追踪类别列表", "default": None}
+            }
+        },
+        "stop_tracing": {
+            "name": "stop_tracing",
+            "description": "结束性能追踪，保存追踪文件并返回长任务、脚本执行和布局耗时摘要",
+            "parameters": {
+                "file_path": {"type": "string", "description": "保存路径", "required": False},
+                "top": {"type": "integer", "description": "最长任务和脚本的返回数量", "default": 10}
+            }
+        },
+        "summarize_trace": {
+            "name": "summarize_trace",
+            "description": "流式读取已有的追踪文件（.json 或 .json.gz）并生成摘要",
+            "parameters": {
+                "file_path": {"type": "string", "description": "追踪文件路径", "required": True},
+                "top": {"type": "integer", "description": "最长任务和脚本的返回数量", "default": 10}
+            }
+        }
+    },
+    "performance_operations": {
+        "set_throttling": {
+            "name": "set_throttling",
+            "description": "对当前标签页同时设置网络与CPU限速（slow-3g、fast-3g、fast-4g、offline、cpu-4x、mobile 等）",
+            "parameters": {
+                "profile": {"type": "string", "description": "限速方案名称", "required": False},
+                "latency_ms": {"type": "number", "description": "自定义网络延迟（毫秒）", "required": False},
+                "download_kbps": {"type": "number", "description": "自定义下行速率（kbps）", "required": False},
+                "upload_kbps": {"type": "number", "description": "自定义上行速率（kbps）", "required": False},
+                "cpu_rate": {"type": "number", "description": "CPU降速倍数", "required": False},
+                "duration": {"type": "number", "description": "自动恢复前的持续时间（秒）", "required": False}
+            }
+        },
+        "clear_throttling": {
+            "name": "clear_throttling",
+            "description": "恢复当前标签页为不限速",
+            "parameters": {}
+        },
+        "get_throttling_status": {
+            "name": "get_throttling_status",
+            "description": "获取当前标签页的限速设置和可用方案",
+            "parameters": {}
+        },
+        "start_coverage": {
+            "name": "start_coverage",
+            "description": "开始采集JS/CSS覆盖率，之后执行需要分析的导航或操作",
+            "parameters": {
+                "js": {"type": "boolean", "description": "是否采集脚本覆盖率", "default": True},
+                "css": {"type": "boolean", "description": "是否采集样式规则使用情况", "default": True}
+            }
+        },
+        "stop_coverage": {
+            "name": "stop_coverage",
+            "description": "结束覆盖率采集，返回按未使用字节排序的脚本和样式表",
+            "parameters": {
+                "top": {"type": "integer", "description": "返回的资源数量", "default": 20},
+                "include_anonymous": {"type": "boolean", "description": "是否包含没有URL的脚本", "default": False}
+            }
+        },
+        "collect_coverage": {
+            "name": "collect_coverage",
+            "description": "采集一次页面加载（打开URL或刷新当前页面）的JS/CSS覆盖率",
+            "parameters": {
+                "url": {"type": "string", "description": "要打开的URL，为空时刷新当前页面", "required": False},
+                "top": {"type": "integer", "description": "返回的资源数量", "default": 20},
+                "throttling": {"type": "string", "description": "本次加载使用的限速方案，结束后恢复", "required": False}
+            }
+        },
+        "enable_page_metrics": {
+            "name": "enable_page_metrics",
+            "description": "在文档开始时安装性能观察器（LCP、CLS、INP、FCP、长任务）",
+            "parameters": {}
+        },
+        "collect_page_metrics": {
+            "name": "collect_page_metrics",
+            "description": "采集当前页面的性能指标记录并追加到本地时间序列库",
+            "parameters": {
+                "label": {"type": "string", "description": "运行标签（如版本号）", "required": False},
+                "store": {"type": "boolean", "description": "是否写入时间序列库", "default": True}
+            }
+        },
+        "query_page_metrics": {
+            "name": "query_page_metrics",
+            "description": "按时间倒序查询已保存的页面性能指标",
+            "parameters": {
+                "url_contains": {"type": "string", "description": "URL包含的子串", "required": False},
+                "host": {"type": "string", "description": "主机名", "required": False},
+                "label": {"type": "string", "description": "运行标签", "required": False},
+                "limit": {"type": "integer", "description": "返回数量上限", "default": 20},
+                "throttling": {"type": "string", "description": "限速方案名称，none 表示未限速", "required": False}
+            }
+        },
+        "compare_page_metrics": {
+            "name": "compare_page_metrics",
+            "description": "将最新一次指标与同一URL、同一限速方案的历史中位数对比，列出退化的指标",
+            "parameters": {
+                "url": {"type": "string", "description": "完整URL", "required": False},
+                "host": {"type": "string", "description": "主机名", "required": False},
+                "label": {"type": "string", "description": "运行标签", "required": False},
+                "baseline_runs": {"type": "integer", "description": "基线使用的历史记录数", "default": 10},
+                "throttling": {"type": "string", "description": "只对比该限速方案下的记录", "required": False}
+            }
+        }
+    },
     "file_operations": {
         "save_page_source": {
             "name": "save_page_source",
@@ -425,6 +813,42 @@ def get_screenshots_directory() -> Path:
     return screenshots_dir
 
 
+def get_network_directory() -> Path:
+    """获取网络数据目录
+    
+    Returns:
+        Path: 网络数据目录路径
+    """
+    base_dir = get_drissionpage_mcp_directory()
+    network_dir = base_dir / "network"
+    network_dir.mkdir(parents=True, exist_ok=True)
+    return network_dir
+
+
+def get_metrics_directory() -> Path:
+    """获取页面性能指标数据目录
+    
+    Returns:
+        Path: 指标数据目录路径
+    """
+    base_dir = get_drissionpage_mcp_directory()
+    metrics_dir = base_dir / "metrics"
+    metrics_dir.mkdir(parents=True, exist_ok=True)
+    return metrics_dir
+
+
+def get_cdp_directory() -> Path:
+    """获取CDP数据目录（事件落盘、性能分析等）
+    
+    Returns:
+        Path: CDP数据目录路径
+    """
+    base_dir = get_drissionpage_mcp_directory()
+    cdp_dir = base_dir / "cdp"
+    cdp_dir.mkdir(parents=True, exist_ok=True)
+    return cdp_dir
+
+
 def get_downloads_directory() -> Path:
     """获取下载目录
     
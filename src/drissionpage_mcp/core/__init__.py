@@ -3,12 +3,34 @@
 
 from .browser_manager import BrowserManager
 from .element_handler import ElementHandler
+from .event_bus import CDPEventBus
 from .network_listener import NetworkListener
+from .network_log_store import NetworkLogStore
+from .network_filter import NetworkFilter
+from .network_stats import NetworkStats
+from .request_blocker import RequestBlocker
+from .network_replay import NetworkReplay
+from .browser_network_monitor import BrowserNetworkMonitor
+from .cdp_profiler import CDPProfiler
+from .page_metrics import PageMetricsCollector
+from .page_metrics_store import PageMetricsStore
+from .throttling import ThrottlingManager
 from .file_handler import FileHandler
 
 __all__ = [
     "BrowserManager",
     "ElementHandler", 
+    "CDPEventBus",
     "NetworkListener",
+    "NetworkLogStore",
+    "NetworkFilter",
+    "NetworkStats",
+    "RequestBlocker",
+    "NetworkReplay",
+    "BrowserNetworkMonitor",
+    "CDPProfiler",
+    "PageMetricsCollector",
+    "PageMetricsStore",
+    "ThrottlingManager",
     "FileHandler"
 ]
\ No newline at end of file
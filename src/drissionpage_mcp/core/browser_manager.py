@@ -24,7 +24,8 @@ class BrowserManager:
         """打开或接管已打开的浏览器
         
         Args:
-            config: 浏览器配置字典，可选键包括 debug_port、browser_path、headless
+            config: 浏览器配置字典，可选键包括 debug_port、browser_path、headless、user_data_dir、
+                extensions（解压后的扩展目录列表，只在启动新浏览器时加载）
             
         Returns:
             dict: 浏览器信息
@@ -43,6 +44,8 @@ class BrowserManager:
                 co.headless(True)
             if config.get("user_data_dir"):
                 co.set_user_data_path(config["user_data_dir"])
+            for extension in config.get("extensions") or []:
+                co.add_extension(extension)
 
             self.browser = Chromium(co)
             
@@ -0,0 +1,255 @@
+# -*- coding: utf-8 -*-
+"""浏览器级网络监听模块
+
+监听浏览器内所有标签页、弹窗以及跨进程iframe和worker发出的请求，
+每条记录标注所属目标ID，写入同一个缓冲区、统计和日志数据库，
+切换标签页或新开弹窗时不需要重新设置。
+"""
+
+import threading
+from typing import Dict, Any, List, Optional
+
+from ..utils.ring_buffer import RingBuffer
+from .domain_manager import CDPDomainManager
+from .event_bus import CDPEventBus
+from .network_filter import NetworkFilter
+from .network_listener import ResponseRecord
+from .network_stats import NetworkStats
+
+
+class BrowserNetworkMonitor:
+    """浏览器级网络监听器
+
+    通过浏览器连接上的 Target.targetCreated / targetDestroyed 事件发现页面目标，
+    为每个页面在其自身的连接上启用 Network 域，并用 Target.setAutoAttach（flatten）
+    自动附加该页面内的跨进程iframe和worker。
+
+    DrissionPage 的驱动在分发事件时不保留 sessionId，同一连接上子会话的事件
+    无法与页面自身的事件区分，因此iframe和worker的请求标注为所属页面的目标ID。
+    """
+
+    # 需要在附加后启用网络监听的子目标类型
+    CHILD_TARGET_TYPES = frozenset(("iframe", "worker"))
+    _KEY = "browser_monitor"
+
+    def __init__(self, browser, log_store=None):
+        """
+        初始化浏览器级网络监听器
+
+        Args:
+            browser: Chromium 浏览器对象
+            log_store: NetworkLogStore，设置后记录同时写入日志数据库
+        """
+        from ..config.settings import get_config_value
+
+        self.browser = browser
+        self.log_store = log_store
+        self.records = RingBuffer(get_config_value('network.browser_monitor_max_records', 5000))
+        self.stats = NetworkStats()
+        self.running = False
+        self._filter: Optional[NetworkFilter] = None
+        # 目标ID -> {"tab", "type", "url", "opener_id", "responses", "children"}
+        self._targets: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._browser_bus = CDPEventBus.for_driver(browser._driver)
+
+    def start(self,
+              filter_types: Optional[List[str]] = None,
+              hosts: Optional[List[str]] = None,
+              url_patterns: Optional[List[str]] = None,
+              status_ranges: Optional[List[Any]] = None,
+              resource_types: Optional[List[str]] = None) -> str:
+        """开始浏览器级网络监听，已在监听时替换过滤条件
+
+        Args:
+            filter_types: mimeType 条件列表，为空时记录全部响应
+            hosts: 主机名列表，匹配该域名及其子域名
+            url_patterns: URL正则表达式列表
+            status_ranges: 状态码条件，如 [200, "4xx", "500-599"]
+            resource_types: 资源类型列表，如 ["XHR", "Fetch"]
+
+        Returns:
+            str: 启动结果
+        """
+        try:
+            self._filter = NetworkFilter(filter_types or ["*/*"], hosts, url_patterns, None,
+                                         status_ranges, resource_types)
+        except ValueError as e:
+            return f"启动浏览器级网络监听失败: {str(e)}"
+
+        if self.running:
+            return f"浏览器级网络监听过滤条件已更新: {self._filter.describe()}"
+
+        try:
+            # 先订阅再附加已有页面，避免遗漏两者之间新建的页面
+            self._browser_bus.subscribe("Target.targetCreated", self._on_target_created, self._KEY)
+            self._browser_bus.subscribe("Target.targetDestroyed", self._on_target_destroyed, self._KEY)
+            self.running = True
+            for target_id in self.browser.tab_ids:
+                self._attach_page(target_id, {"type": "page"})
+            return f"浏览器级网络监听已启动，已附加 {len(self._targets)} 个页面，过滤条件: {self._filter.describe()}"
+        except Exception as e:
+            self.stop()
+            return f"启动浏览器级网络监听失败: {str(e)}"
+
+    def stop(self) -> str:
+        """停止浏览器级网络监听，已收集的记录保留
+
+        Returns:
+            str: 停止结果
+        """
+        self.running = False
+        self._browser_bus.unsubscribe_all(self._KEY)
+        with self._lock:
+            targets = list(self._targets.items())
+            self._targets.clear()
+        for target_id, target in targets:
+            self._detach_page(target)
+        return f"浏览器级网络监听已停止，共附加过 {len(targets)} 个页面，记录 {len(self.records)} 条"
+
+    def _on_target_created(self, **event) -> None:
+        info = event.get("targetInfo", {})
+        if info.get("type") in ("page", "webview") and not info.get("url", "").startswith("devtools://"):
+            self._attach_page(info.get("targetId"), info)
+
+    def _on_target_destroyed(self, **event) -> None:
+        with self._lock:
+            target = self._targets.pop(event.get("targetId"), None)
+        if target is not None:
+            self._detach_page(target, closed=True)
+
+    def _attach_page(self, target_id: str, info: Dict[str, Any]) -> None:
+        """在页面自身的连接上订阅网络事件并自动附加子目标"""
+        if not self.running or not target_id:
+            return
+        with self._lock:
+            if target_id in self._targets:
+                return
+            self._targets[target_id] = target = {
+                "tab": None,
+                "type": info.get("type", "page"),
+                "url": info.get("url", ""),
+                "opener_id": info.get("openerId"),
+                "responses": 0,
+                "children": {}
+            }
+        try:
+            tab = self.browser.get_tab(target_id)
+            target["tab"] = tab
+            bus = CDPEventBus.for_tab(tab)
+
+            def on_response(**event):
+                self._on_response(target_id, target, event)
+
+            def on_attached(**event):
+                self._on_attached_to_target(tab, target, event)
+
+            def on_detached(**event):
+                target["children"].pop(event.get("sessionId"), None)
+
+            bus.subscribe("Network.responseReceived", on_response, self._KEY)
+            bus.subscribe("Network.loadingFinished", self.stats.on_finished, self._KEY)
+            bus.subscribe("Network.loadingFailed", self.stats.on_failed, self._KEY)
+            bus.subscribe("Target.attachedToTarget", on_attached, self._KEY)
+            bus.subscribe("Target.detachedFromTarget", on_detached, self._KEY)
+            CDPDomainManager.for_tab(tab).acquire("Network", self._KEY)
+            tab.run_cdp("Target.setAutoAttach", autoAttach=True, waitForDebuggerOnStart=False, flatten=True)
+        except Exception:
+            # 页面可能在附加前已关闭
+            with self._lock:
+                self._targets.pop(target_id, None)
+            if target["tab"] is not None:
+                self._detach_page(target)
+
+    def _detach_page(self, target: Dict[str, Any], closed: bool = False) -> None:
+        tab = target.get("tab")
+        if tab is None:
+            return
+        CDPEventBus.for_tab(tab).unsubscribe_all(self._KEY)
+        if closed:
+            return
+        CDPDomainManager.for_tab(tab).release("Network", self._KEY)
+        try:
+            tab.run_cdp("Target.setAutoAttach", autoAttach=False, waitForDebuggerOnStart=False, flatten=True)
+        except Exception:
+            pass
+
+    def _on_attached_to_target(self, tab, target: Dict[str, Any], event: Dict[str, Any]) -> None:
+        info = event.get("targetInfo", {})
+        session_id = event.get("sessionId")
+        if info.get("type") not in self.CHILD_TARGET_TYPES or not session_id:
+            return
+        # 子会话的事件经由页面连接分发给上面订阅的处理函数
+        # 使用独立会话连接（ws_only）的驱动不能向其他会话发送命令
+        if getattr(tab.driver, "session_id", None):
+            return
+        try:
+            tab.driver.run("Network.enable", sessionId=session_id)
+            target["children"][session_id] = {"type": info.get("type"), "url": info.get("url", "")}
+        except Exception:
+            pass
+
+    def _on_response(self, target_id: str, target: Dict[str, Any], event: Dict[str, Any]) -> None:
+        self.stats.on_response(**event)
+        network_filter = self._filter
+        if network_filter is None or not network_filter.match_response(event):
+            return
+        record = ResponseRecord(event, target_id=target_id)
+        target["responses"] += 1
+        self.records.append(record)
+        if self.log_store is not None:
+            self.log_store.add(record, target_id)
+
+    def get_records(self, cursor: int = 0, limit: int = 50, target_id: Optional[str] = None) -> Dict[str, Any]:
+        """按游标增量获取记录
+
+        Args:
+            cursor: 上次调用返回的游标，首次调用传 0
+            limit: 返回数据的最大数量
+            target_id: 只返回该目标的记录
+
+        Returns:
+            dict: 记录列表、下次调用使用的游标和被丢弃的记录数
+        """
+        if target_id:
+            # 按目标过滤时扫描游标之后的记录，取满 limit 条即停，游标停在最后一条之后
+            items, end = self.records.since(cursor)
+            first_seq = end - len(items)
+            records, next_cursor = [], end
+            for offset, record in enumerate(items):
+                if record.target_id == target_id:
+                    records.append(record)
+                    if len(records) >= limit:
+                        next_cursor = first_seq + offset + 1
+                        break
+        else:
+            records, next_cursor = self.records.since(cursor, limit)
+        return {
+            "records": [record.to_dict() for record in records],
+            "cursor": next_cursor,
+            "dropped": self.records.stats()["dropped"]
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取监听状态与统计
+
+        Returns:
+            dict: 已附加的目标、总体摘要、按主机统计和缓冲区状态
+        """
+        with self._lock:
+            targets = [{
+                "target_id": target_id,
+                "type": target["type"],
+                "url": target["tab"].url if target["tab"] is not None else target["url"],
+                "opener_id": target["opener_id"],
+                "responses": target["responses"],
+                "children": list(target["children"].values())
+            } for target_id, target in self._targets.items()]
+        return {
+            "running": self.running,
+            "filter": self._filter.describe() if self._filter is not None else None,
+            "targets": targets,
+            "summary": self.stats.summary(),
+            "slowest_hosts": self.stats.get_table("host", "p95_ms", 10),
+            "buffer": self.records.stats()
+        }
@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*-
+"""CDP往返耗时分析模块
+
+启用后包装 DrissionPage 驱动的 run 方法（tab.run_cdp、run_js 等最终都经过它），
+按CDP方法统计调用次数、耗时分位数和请求/响应大小，
+并通过 contextvars 将每次调用归属到触发它的MCP工具调用。
+"""
+
+import functools
+import json
+import threading
+import time
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+from .network_stats import LogHistogram
+
+
+# 当前正在执行的MCP工具名称；asyncio.to_thread 会复制上下文，线程中的调用同样可以归属。
+# 直接提交到 ThreadPoolExecutor 或 threading.Thread 的任务不会继承上下文，
+# 除非经由 contextvars.copy_context().run 提交，否则其中的调用归入 "(background)"
+current_tool: ContextVar[Optional[str]] = ContextVar("current_tool", default=None)
+
+# 不在任何工具调用中发生的CDP调用（事件回调、后台线程等）
+BACKGROUND = "(background)"
+
+
+class _MethodStats:
+    """单个CDP方法的统计"""
+
+    __slots__ = ("count", "errors", "latency", "request_bytes", "response_bytes", "max_response_bytes")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.latency = LogHistogram()
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.max_response_bytes = 0
+
+
+class _ToolStats:
+    """单个MCP工具的统计"""
+
+    __slots__ = ("calls", "total_ms", "cdp_calls", "cdp_ms", "methods")
+
+    def __init__(self):
+        self.calls = 0
+        self.total_ms = 0.0
+        self.cdp_calls = 0
+        self.cdp_ms = 0.0
+        # 方法名 -> [次数, 耗时]
+        self.methods: Dict[str, List[float]] = {}
+
+
+class CDPProfiler:
+    """CDP往返耗时分析器
+
+    通过模块级实例 profiler 使用。enable() 对驱动类的 run 方法打补丁，disable() 还原，
+    未启用时没有任何额外开销。
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.measure_payloads = True
+        self.started_at: Optional[float] = None
+        self._methods: Dict[str, _MethodStats] = {}
+        self._tools: Dict[str, _ToolStats] = {}
+        self._original_run = None
+        self._lock = threading.Lock()
+
+    def enable(self, measure_payloads: bool = True) -> None:
+        """开始记录
+
+        Args:
+            measure_payloads: 是否统计请求/响应的JSON大小（需要额外序列化一次）
+        """
+        from DrissionPage._base.driver import Driver
+
+        self.measure_payloads = measure_payloads
+        if self.enabled:
+            return
+        original = self._original_run = Driver.run
+        profiler = self
+
+        @functools.wraps(original)
+        def run(driver, _method, *args, **kwargs):
+            start = time.perf_counter()
+            result = original(driver, _method, *args, **kwargs)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            try:
+                profiler.record(_method, elapsed_ms, kwargs, result)
+            except Exception:
+                pass
+            return result
+
+        Driver.run = run
+        self.enabled = True
+        if self.started_at is None:
+            self.started_at = time.time()
+
+    def disable(self) -> None:
+        """停止记录（已记录的数据保留）"""
+        from DrissionPage._base.driver import Driver
+
+        if self.enabled and self._original_run is not None:
+            Driver.run = self._original_run
+        self.enabled = False
+
+    def reset(self) -> None:
+        """清空已记录的数据"""
+        with self._lock:
+            self._methods.clear()
+            self._tools.clear()
+            self.started_at = time.time() if self.enabled else None
+
+    @staticmethod
+    def _size(value: Any) -> int:
+        try:
+            return len(json.dumps(value, ensure_ascii=False, default=str))
+        except (TypeError, ValueError):
+            return 0
+
+    def record(self, method: str, elapsed_ms: float, params: Dict[str, Any], result: Any) -> None:
+        """记录一次CDP调用"""
+        request_bytes = response_bytes = 0
+        if self.measure_payloads:
+            request_bytes = self._size({k: v for k, v in params.items() if k != "_timeout"})
+            response_bytes = self._size(result)
+        failed = isinstance(result, dict) and "error" in result and "type" in result
+        tool = current_tool.get() or BACKGROUND
+        with self._lock:
+            stats = self._methods.get(method)
+            if stats is None:
+                stats = self._methods[method] = _MethodStats()
+            stats.count += 1
+            stats.latency.record(elapsed_ms)
+            stats.request_bytes += request_bytes
+            stats.response_bytes += response_bytes
+            if response_bytes > stats.max_response_bytes:
+                stats.max_response_bytes = response_bytes
+            if failed:
+                stats.errors += 1
+
+            tool_stats = self._tools.get(tool)
+            if tool_stats is None:
+                tool_stats = self._tools[tool] = _ToolStats()
+            tool_stats.cdp_calls += 1
+            tool_stats.cdp_ms += elapsed_ms
+            method_entry = tool_stats.methods.setdefault(method, [0, 0.0])
+            method_entry[0] += 1
+            method_entry[1] += elapsed_ms
+
+    def record_tool(self, tool: str, elapsed_ms: float) -> None:
+        """记录一次MCP工具调用的总耗时"""
+        with self._lock:
+            tool_stats = self._tools.get(tool)
+            if tool_stats is None:
+                tool_stats = self._tools[tool] = _ToolStats()
+            tool_stats.calls += 1
+            tool_stats.total_ms += elapsed_ms
+
+    def get_report(self, sort_by: str = "total_ms", limit: int = 30) -> Dict[str, Any]:
+        """生成分析报告
+
+        Args:
+            sort_by: 方法表排序字段（count、total_ms、p95_ms、response_kb），降序
+            limit: 方法表和工具表的最大行数
+
+        Returns:
+            dict: 按方法和按工具的统计
+        """
+        def ms(value: Optional[float]) -> Optional[float]:
+            return round(value, 2) if value is not None else None
+
+        with self._lock:
+            methods = [{
+                "method": method,
+                "count": stats.count,
+                "errors": stats.errors,
+                "total_ms": ms(stats.latency.total),
+                "mean_ms": ms(stats.latency.mean),
+                "p50_ms": ms(stats.latency.percentile(50)),
+                "p95_ms": ms(stats.latency.percentile(95)),
+                "p99_ms": ms(stats.latency.percentile(99)),
+                "max_ms": ms(stats.latency.max),
+                "request_kb": round(stats.request_bytes / 1024, 1),
+                "response_kb": round(stats.response_bytes / 1024, 1),
+                "max_response_kb": round(stats.max_response_bytes / 1024, 1)
+            } for method, stats in self._methods.items()]
+            tools = [{
+                "tool": tool,
+                "calls": stats.calls,
+                "total_ms": ms(stats.total_ms),
+                "cdp_calls": stats.cdp_calls,
+                "cdp_ms": ms(stats.cdp_ms),
+                # 每次工具调用平均的CDP往返次数，越大说明越依赖逐条往返
+                "cdp_calls_per_call": round(stats.cdp_calls / stats.calls, 1) if stats.calls else None,
+                "top_methods": [{"method": method, "count": int(count), "total_ms": ms(total)}
+                                for method, (count, total) in
+                                sorted(stats.methods.items(), key=lambda item: item[1][1], reverse=True)[:5]]
+            } for tool, stats in self._tools.items()]
+
+        methods.sort(key=lambda row: row.get(sort_by) or 0, reverse=True)
+        tools.sort(key=lambda row: row["cdp_ms"] or 0, reverse=True)
+        return {
+            "enabled": self.enabled,
+            "measure_payloads": self.measure_payloads,
+            "since": self.started_at,
+            "methods": methods[:max(0, limit)],
+            "tools": tools[:max(0, limit)]
+        }
+
+    def dump(self, path: Optional[str] = None) -> Path:
+        """将完整报告写入JSON文件
+
+        Args:
+            path: 文件路径，默认保存到CDP数据目录的 profiles 子目录
+
+        Returns:
+            Path: 文件路径
+        """
+        from datetime import datetime
+        from ..config.settings import get_cdp_directory
+
+        if not path:
+            path = get_cdp_directory() / "profiles" / f"cdp_profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        report = self.get_report(limit=10000)
+        path.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+        return path
+
+
+profiler = CDPProfiler()
+
+
+def profile_tool(func):
+    """MCP工具装饰器：在调用期间设置当前工具名称并记录工具总耗时"""
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        token = current_tool.set(func.__name__)
+        start = time.perf_counter()
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            current_tool.reset(token)
+            if profiler.enabled:
+                profiler.record_tool(func.__name__, (time.perf_counter() - start) * 1000)
+
+    return wrapper
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+"""JS/CSS覆盖率计算模块
+
+将 Profiler.takePreciseCoverage 的嵌套计数区间和 CSS.stopRuleUsageTracking 的规则使用记录
+转换为互不重叠的已使用区间，按资源统计已使用/未使用的字节数，并按未使用字节排序生成报告。
+"""
+
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+
+Range = Tuple[int, int]
+
+
+def merge_ranges(ranges: Iterable[Range]) -> List[Range]:
+    """合并重叠或相邻的区间
+
+    Args:
+        ranges: (起点, 终点) 区间，终点不包含
+
+    Returns:
+        list: 按起点排序、互不重叠的区间
+    """
+    merged: List[List[int]] = []
+    for start, end in sorted(r for r in ranges if r[1] > r[0]):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1][1] = end
+        else:
+            merged.append([start, end])
+    return [(start, end) for start, end in merged]
+
+
+def js_used_ranges(functions: List[Dict[str, Any]]) -> List[Range]:
+    """计算脚本中被执行过的区间
+
+    块级覆盖率的区间是嵌套的，每个位置的执行次数由包含它的最内层区间决定，
+    例如已执行函数中未进入的分支（count 为 0）属于未使用部分。
+
+    Args:
+        functions: takePreciseCoverage 结果中单个脚本的 functions 列表
+
+    Returns:
+        list: 合并后的已执行区间
+    """
+    points: List[Tuple[int, int, int, int]] = []
+    for function in functions:
+        for item in function.get("ranges", []):
+            start, end, count = item["startOffset"], item["endOffset"], item.get("count", 0)
+            if end <= start:
+                continue
+            # 同一位置：先结束再开始；同时开始时外层先入栈，同时结束时内层先出栈
+            points.append((start, 1, start - end, count))
+            points.append((end, 0, end - start, count))
+    points.sort()
+
+    used: List[Range] = []
+    stack: List[int] = []
+    last = 0
+    for offset, is_start, _, count in points:
+        if stack and offset > last and stack[-1] > 0:
+            used.append((last, offset))
+        last = offset
+        if is_start:
+            stack.append(count)
+        elif stack:
+            stack.pop()
+    return merge_ranges(used)
+
+
+def css_used_ranges(rule_usage: List[Dict[str, Any]]) -> Dict[str, List[Range]]:
+    """按样式表汇总被使用的规则区间
+
+    Args:
+        rule_usage: CSS.stopRuleUsageTracking 返回的 ruleUsage 列表
+
+    Returns:
+        dict: 样式表ID -> 合并后的已使用区间
+    """
+    ranges: Dict[str, List[Range]] = {}
+    for rule in rule_usage:
+        sheet_ranges = ranges.setdefault(rule["styleSheetId"], [])
+        if rule.get("used"):
+            sheet_ranges.append((int(rule["startOffset"]), int(rule["endOffset"])))
+    return {sheet_id: merge_ranges(sheet_ranges) for sheet_id, sheet_ranges in ranges.items()}
+
+
+def _byte_length(source: str, start: int, end: int, ascii_only: bool) -> int:
+    return end - start if ascii_only else len(source[start:end].encode("utf-8"))
+
+
+def resource_usage(source: str, used: List[Range], max_unused_ranges: int = 3) -> Dict[str, Any]:
+    """统计单个资源的已使用/未使用字节数
+
+    Args:
+        source: 资源源码
+        used: 合并后的已使用区间（字符偏移）
+        max_unused_ranges: 返回的最大未使用区间数量
+
+    Returns:
+        dict: total_bytes、used_bytes、unused_bytes 和最大的几个未使用区间
+    """
+    length = len(source)
+    ascii_only = source.isascii()
+    used = [(max(0, start), min(end, length)) for start, end in used if start < length]
+    used_bytes = sum(_byte_length(source, start, end, ascii_only) for start, end in used)
+    total_bytes = length if ascii_only else len(source.encode("utf-8"))
+
+    unused: List[Range] = []
+    position = 0
+    for start, end in used:
+        if start > position:
+            unused.append((position, start))
+        position = max(position, end)
+    if position < length:
+        unused.append((position, length))
+    largest = sorted(unused, key=lambda r: r[1] - r[0], reverse=True)[:max_unused_ranges]
+    return {
+        "total_bytes": total_bytes,
+        "used_bytes": used_bytes,
+        "unused_bytes": total_bytes - used_bytes,
+        "largest_unused_ranges": [{"start": start, "end": end,
+                                   "bytes": _byte_length(source, start, end, ascii_only)}
+                                  for start, end in sorted(largest)]
+    }
+
+
+def build_coverage_report(entries: List[Dict[str, Any]], top: int = 20,
+                          duration: Optional[float] = None) -> Dict[str, Any]:
+    """按URL汇总各资源的覆盖率并按未使用字节排序
+
+    Args:
+        entries: 每项含 type（js/css）、url 以及 resource_usage() 的统计结果
+        top: 返回的资源数量
+        duration: 采集时长（秒）
+
+    Returns:
+        dict: 按类型的总计和未使用字节最多的资源列表
+    """
+    resources: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    totals = {kind: {"resources": 0, "total_bytes": 0, "used_bytes": 0, "unused_bytes": 0}
+              for kind in ("js", "css")}
+    for entry in entries:
+        key = (entry["type"], entry["url"])
+        resource = resources.get(key)
+        if resource is None:
+            resource = resources[key] = {"url": entry["url"], "type": entry["type"], "instances": 0,
+                                         "total_bytes": 0, "used_bytes": 0, "unused_bytes": 0,
+                                         "largest_unused_ranges": []}
+            totals[entry["type"]]["resources"] += 1
+        # 同一URL的多个内联脚本或多个框架中的同一文件合并统计
+        resource["instances"] += 1
+        if entry["largest_unused_ranges"]:
+            ranges = resource["largest_unused_ranges"] + entry["largest_unused_ranges"]
+            resource["largest_unused_ranges"] = sorted(ranges, key=lambda r: r["bytes"], reverse=True)[:3]
+        for field in ("total_bytes", "used_bytes", "unused_bytes"):
+            resource[field] += entry[field]
+            totals[entry["type"]][field] += entry[field]
+
+    for item in list(resources.values()) + list(totals.values()):
+        item["unused_pct"] = round(item["unused_bytes"] / item["total_bytes"] * 100, 1) if item["total_bytes"] else 0.0
+    ranked = sorted(resources.values(), key=lambda r: r["unused_bytes"], reverse=True)
+    report: Dict[str, Any] = {"totals": totals, "resources": ranked[:max(0, top)]}
+    if duration is not None:
+        report["duration_s"] = round(duration, 1)
+    return report
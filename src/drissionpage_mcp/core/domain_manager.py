@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""CDP域管理模块
+
+按标签页对 Network、Fetch 等域的启用请求做引用计数：第一个使用者启用域，
+最后一个使用者释放时才禁用，已启用的域不再重复发送 enable 命令，
+一个功能关闭时不会影响仍在使用该域的其他功能。
+"""
+
+import threading
+import weakref
+from typing import Dict, Any, Iterable, Optional, Set
+
+
+class CDPDomainManager:
+    """每个标签页一个的CDP域管理器
+
+    通过 CDPDomainManager.for_tab(tab) 获取，同一标签页的所有组件共享。
+    使用者以名称登记，同一使用者重复登记只算一次。
+    """
+
+    _managers: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+    _managers_lock = threading.Lock()
+
+    def __init__(self, tab):
+        self.tab = tab
+        self._owners: Dict[str, Set[str]] = {}
+        self._enabled: Dict[str, bool] = {}
+        # 带参数启用的域（如 Fetch 的拦截模式）记录当前参数，参数变化时需要重新启用
+        self._params: Dict[str, Dict[str, Any]] = {}
+        self._stats = {"enable_calls": 0, "disable_calls": 0, "skipped": 0}
+        self._lock = threading.RLock()
+
+    @classmethod
+    def for_tab(cls, tab) -> "CDPDomainManager":
+        """获取标签页对应的域管理器，不存在时创建"""
+        driver = tab.driver
+        with cls._managers_lock:
+            manager = cls._managers.get(driver)
+            if manager is None:
+                manager = cls._managers[driver] = cls(tab)
+            return manager
+
+    def acquire(self, domain: str, owner: str, **params) -> bool:
+        """登记使用者并确保域已启用
+
+        Args:
+            domain: 域名称（如 Network、Fetch）
+            owner: 使用者名称
+            **params: enable 命令参数，与当前参数不同时重新启用
+
+        Returns:
+            bool: 本次是否实际发送了 enable 命令
+
+        Raises:
+            Exception: enable 命令失败时抛出，使用者不会被登记
+        """
+        with self._lock:
+            if self._enabled.get(domain) and (not params or self._params.get(domain) == params):
+                self._owners.setdefault(domain, set()).add(owner)
+                self._stats["skipped"] += 1
+                return False
+            self.tab.run_cdp(f"{domain}.enable", **params)
+            self._stats["enable_calls"] += 1
+            self._enabled[domain] = True
+            self._params[domain] = params
+            self._owners.setdefault(domain, set()).add(owner)
+            return True
+
+    def release(self, domain: str, owner: str) -> bool:
+        """注销使用者，没有其他使用者时禁用域
+
+        Args:
+            domain: 域名称
+            owner: 使用者名称
+
+        Returns:
+            bool: 本次是否实际发送了 disable 命令；owner 未登记时不做任何操作并返回 False
+        """
+        with self._lock:
+            # 原因：未登记的使用者释放时也会禁用域，关闭由他人（如直接发送的 enable 命令）启用的域，
+            # 副作用：调用方未先 acquire 的 release 不再生效，回滚策略：去掉该判断
+            owners = self._owners.get(domain)
+            if not owners or owner not in owners:
+                return False
+            owners.discard(owner)
+            if owners or not self._enabled.get(domain):
+                return False
+            self._enabled[domain] = False
+            self._params.pop(domain, None)
+            self._stats["disable_calls"] += 1
+            try:
+                self.tab.run_cdp(f"{domain}.disable")
+            except Exception:
+                pass
+            return True
+
+    def owners(self, domain: str) -> Set[str]:
+        """获取域的当前使用者"""
+        with self._lock:
+            return set(self._owners.get(domain, set()))
+
+    def note_command(self, command: str) -> None:
+        """记录绕过管理器直接发送的 enable/disable 命令，保持缓存状态一致"""
+        domain, _, method = command.partition(".")
+        if method not in ("enable", "disable"):
+            return
+        with self._lock:
+            self._enabled[domain] = method == "enable"
+            self._params.pop(domain, None)
+            if method == "disable":
+                self._owners.pop(domain, None)
+
+    def is_enabled(self, domain: str) -> bool:
+        """域是否已启用（按缓存状态判断，不发送命令）"""
+        return bool(self._enabled.get(domain))
+
+    def status(self, domains: Optional[Iterable[str]] = None) -> Dict[str, bool]:
+        """获取各域的启用状态
+
+        Args:
+            domains: 需要查询的域，默认为已登记过的全部域
+
+        Returns:
+            dict: 域名称 -> 是否启用
+        """
+        with self._lock:
+            names = list(domains) if domains is not None else list(self._enabled)
+            return {name: bool(self._enabled.get(name)) for name in names}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取使用者与命令统计"""
+        with self._lock:
+            return {
+                "domains": {name: {"enabled": enabled, "owners": sorted(self._owners.get(name, set()))}
+                            for name, enabled in self._enabled.items()},
+                **self._stats
+            }
@@ -20,6 +20,11 @@ class ElementHandler:
         self.tab = tab
         self.browser_manager = browser_manager  # 原因：添加browser_manager引用以支持标签页切换，副作用：无，回滚策略：移除此参数
     
+    @staticmethod
+    def _xpath_locator(xpath: str) -> str:
+        """将XPath转换为定位符，已带 "xpath:" / "x:" 前缀的保持不变"""
+        return xpath if xpath.startswith(("xpath:", "xpath=", "x:", "x=")) else f"xpath:{xpath}"
+
     def click_by_xpath(self, xpath: str) -> Dict[str, Any]:
         """通过XPath点击元素
         
@@ -29,7 +34,8 @@ class ElementHandler:
         Returns:
             dict: 点击结果
         """
-        locator = f"xpath:{xpath}"
+        # 原因：标注截图对照表输出带 "xpath:" 前缀的定位符，重复加前缀会导致定位失败，副作用：无，回滚策略：还原为 f"xpath:{xpath}"
+        locator = self._xpath_locator(xpath)
         element = self.tab.ele(locator, timeout=4)
         
         if element:
@@ -221,7 +227,8 @@ class ElementHandler:
         Returns:
             dict: 输入操作的结果
         """
-        locator = f"xpath:{xpath}"
+        # 原因：标注截图对照表输出带 "xpath:" 前缀的定位符，重复加前缀会导致定位失败，副作用：无，回滚策略：还原为 f"xpath:{xpath}"
+        locator = self._xpath_locator(xpath)
         element = self.tab.ele(locator, timeout=4)
         
         if element:
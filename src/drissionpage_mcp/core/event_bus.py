@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+"""CDP事件总线模块
+
+DrissionPage 的 driver.set_callback 每个事件只能注册一个回调，后注册的会覆盖之前的。
+事件总线为每个标签页的每个事件只注册一个分发回调，再分发给多个订阅者；
+订阅者可以带过滤函数，也可以使用有界队列在独立线程中处理，避免阻塞驱动的事件线程。
+"""
+
+import itertools
+import threading
+import weakref
+from collections import deque
+from typing import Dict, Any, Callable, Optional, Tuple
+
+
+class _Subscriber:
+    """订阅者：同一订阅键下的所有事件共用一个投递通道（保证事件顺序）"""
+
+    __slots__ = ("key", "queue_size", "delivered", "dropped", "errors",
+                 "_queue", "_cond", "_worker", "_busy", "_closed")
+
+    def __init__(self, key: str, queue_size: Optional[int] = None):
+        self.key = key
+        self.queue_size = queue_size
+        self.delivered = 0
+        self.dropped = 0
+        self.errors = 0
+        self._busy = False
+        self._closed = False
+        self._queue: Optional[deque] = None
+        self._cond: Optional[threading.Condition] = None
+        self._worker: Optional[threading.Thread] = None
+        if queue_size:
+            self._queue = deque(maxlen=queue_size)
+            self._cond = threading.Condition()
+            self._worker = threading.Thread(target=self._run, name=f"cdp-event-{key}", daemon=True)
+            self._worker.start()
+
+    def deliver(self, handler: Callable, params: Dict[str, Any]) -> None:
+        if self._queue is None:
+            self._call(handler, params)
+            return
+        with self._cond:
+            if len(self._queue) == self._queue.maxlen:
+                # 队列已满时丢弃最旧的事件
+                self.dropped += 1
+            self._queue.append((handler, params))
+            self._cond.notify()
+
+    def _call(self, handler: Callable, params: Dict[str, Any]) -> None:
+        try:
+            handler(**params)
+            self.delivered += 1
+        except Exception:
+            self.errors += 1
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed:
+                    self._busy = False
+                    self._cond.notify_all()
+                    self._cond.wait()
+                if not self._queue and self._closed:
+                    self._busy = False
+                    self._cond.notify_all()
+                    return
+                handler, params = self._queue.popleft()
+                self._busy = True
+            self._call(handler, params)
+
+    def drain(self, timeout: float = 5.0) -> bool:
+        """等待队列中的事件处理完毕"""
+        if self._queue is None:
+            return True
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._queue and not self._busy, timeout)
+
+    def close(self) -> None:
+        """处理完剩余事件后停止工作线程"""
+        if self._cond is None:
+            return
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": f"queue({self.queue_size})" if self.queue_size else "sync",
+            "pending": len(self._queue) if self._queue is not None else 0,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "errors": self.errors
+        }
+
+
+class CDPEventBus:
+    """每个标签页一个的CDP事件总线
+
+    通过 CDPEventBus.for_tab(tab) 获取，同一标签页的所有组件共享同一个总线。
+    首次订阅某个事件时若驱动上已有其他回调（例如 DrissionPage 自身注册的），
+    会将其保留为一个订阅者，不会被覆盖。
+    """
+
+    _buses: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+    _buses_lock = threading.Lock()
+    _PREVIOUS = "__previous__"
+
+    def __init__(self, driver):
+        self.driver = driver
+        self._routes: Dict[str, Dict[str, Tuple[Callable, Optional[Callable]]]] = {}
+        self._subscribers: Dict[str, _Subscriber] = {}
+        self._previous: Dict[str, Callable] = {}
+        self._event_counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._key_counter = itertools.count(1)
+
+    @classmethod
+    def for_tab(cls, tab) -> "CDPEventBus":
+        """获取标签页对应的事件总线，不存在时创建"""
+        return cls.for_driver(tab.driver)
+
+    @classmethod
+    def for_driver(cls, driver) -> "CDPEventBus":
+        """获取驱动对应的事件总线（也用于浏览器级驱动），不存在时创建"""
+        with cls._buses_lock:
+            bus = cls._buses.get(driver)
+            if bus is None:
+                bus = cls._buses[driver] = cls(driver)
+            return bus
+
+    def subscribe(self,
+                  event_name: str,
+                  handler: Callable,
+                  key: Optional[str] = None,
+                  event_filter: Optional[Callable[[Dict[str, Any]], bool]] = None,
+                  queue_size: Optional[int] = None) -> str:
+        """订阅CDP事件
+
+        Args:
+            event_name: CDP事件名称
+            handler: 处理函数，以关键字参数接收事件数据
+            key: 订阅键，相同键在同一事件上的处理函数会被替换；不提供时自动生成
+            event_filter: 过滤函数，接收事件数据字典，返回 False 时不投递
+            queue_size: 队列容量。为空时在驱动事件线程上同步调用；
+                设置后事件进入有界队列由独立线程处理（满时丢弃最旧的），
+                同一订阅键的所有事件按到达顺序处理。只在订阅键首次出现时生效
+
+        Returns:
+            str: 订阅键
+        """
+        key = key or f"subscriber-{next(self._key_counter)}"
+        with self._lock:
+            if key not in self._subscribers:
+                self._subscribers[key] = _Subscriber(key, queue_size)
+            routes = self._routes.get(event_name)
+            if routes is None:
+                routes = self._routes[event_name] = {}
+                self._install(event_name, routes)
+            routes[key] = (handler, event_filter)
+        return key
+
+    def _install(self, event_name: str, routes: Dict[str, Tuple[Callable, Optional[Callable]]]) -> None:
+        """为事件注册唯一的驱动回调（调用方需持有锁）"""
+        existing = getattr(self.driver, "event_handlers", {}).get(event_name)
+        if existing is not None and not getattr(existing, "_cdp_event_bus", False):
+            # 保留驱动上已有的回调
+            self._previous[event_name] = existing
+            self._subscribers.setdefault(self._PREVIOUS, _Subscriber(self._PREVIOUS))
+            routes[self._PREVIOUS] = (existing, None)
+
+        subscribers = self._subscribers
+        counts = self._event_counts
+
+        def dispatch(**params):
+            counts[event_name] = counts.get(event_name, 0) + 1
+            for key, (handler, event_filter) in list(routes.items()):
+                if event_filter is not None:
+                    try:
+                        if not event_filter(params):
+                            continue
+                    except Exception:
+                        continue
+                subscriber = subscribers.get(key)
+                if subscriber is not None:
+                    subscriber.deliver(handler, params)
+
+        dispatch._cdp_event_bus = True
+        self.driver.set_callback(event_name, dispatch)
+
+    def unsubscribe(self, event_name: str, key: str) -> None:
+        """取消订阅；事件没有订阅者时恢复原有的驱动回调"""
+        with self._lock:
+            routes = self._routes.get(event_name)
+            if not routes or key not in routes:
+                return
+            del routes[key]
+            if not any(k != self._PREVIOUS for k in routes):
+                del self._routes[event_name]
+                self.driver.set_callback(event_name, self._previous.pop(event_name, None))
+            self._release(key)
+
+    def unsubscribe_all(self, key: str) -> None:
+        """取消订阅键在所有事件上的订阅"""
+        for event_name in [name for name, routes in list(self._routes.items()) if key in routes]:
+            self.unsubscribe(event_name, key)
+
+    def _release(self, key: str) -> None:
+        """订阅键不再订阅任何事件时关闭其投递通道（调用方需持有锁）"""
+        if key == self._PREVIOUS or any(key in routes for routes in self._routes.values()):
+            return
+        subscriber = self._subscribers.pop(key, None)
+        if subscriber is not None:
+            subscriber.close()
+
+    def drain(self, key: str, timeout: float = 5.0) -> bool:
+        """等待订阅键队列中的事件处理完毕"""
+        subscriber = self._subscribers.get(key)
+        return subscriber.drain(timeout) if subscriber is not None else True
+
+    def has_subscribers(self, event_name: str) -> bool:
+        """判断事件是否有订阅者"""
+        return bool(self._routes.get(event_name))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取事件总线统计
+
+        Returns:
+            dict: 各事件的订阅者与接收次数，以及各订阅者的投递统计
+        """
+        with self._lock:
+            return {
+                "events": {name: {"subscribers": sorted(routes), "received": self._event_counts.get(name, 0)}
+                           for name, routes in self._routes.items()},
+                "subscribers": {key: subscriber.stats() for key, subscriber in self._subscribers.items()}
+            }
@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+"""CDP事件收集模块
+
+每个事件名称一个收集器：内存中只保留最新的若干条（定长环形缓冲区），
+可按比例采样，并可将保留的事件按顺序写入磁盘上的 gzip 压缩 JSONL 分段文件，
+读取时按游标先读磁盘分段、再读内存缓冲区，长时间运行时内存占用保持不变。
+"""
+
+import gzip
+import json
+import re
+import threading
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+from ..utils.ring_buffer import RingBuffer
+
+
+class EventCollector:
+    """单个CDP事件的收集器
+
+    事件序号与内存缓冲区序号一致：序号仍在缓冲区内时直接从内存读取，
+    更早的序号从磁盘分段读取（需启用落盘），两者都没有时计入 missed。
+    """
+
+    def __init__(self,
+                 event_name: str,
+                 capacity: int = 1000,
+                 sample_rate: float = 1.0,
+                 spill_dir: Optional[Path] = None,
+                 segment_events: int = 10000,
+                 max_spill_mb: float = 200):
+        """
+        初始化收集器
+
+        Args:
+            event_name: 事件名称
+            capacity: 内存中保留的事件数
+            sample_rate: 采样比例（0-1），按固定间隔保留，1 表示全部保留
+            spill_dir: 落盘目录，为空时不落盘
+            segment_events: 每个分段文件的事件数
+            max_spill_mb: 落盘总大小上限，超出时删除最旧的分段
+        """
+        if not 0 < sample_rate <= 1:
+            raise ValueError(f"采样比例必须在 (0, 1] 范围内: {sample_rate}")
+        self.event_name = event_name
+        self.sample_rate = sample_rate
+        self.buffer = RingBuffer(capacity)
+        self.seen = 0
+        self.sampled_out = 0
+        self._sample_credit = 0.0
+        self._lock = threading.Lock()
+
+        self.spill_dir = Path(spill_dir) if spill_dir else None
+        self.segment_events = segment_events
+        self.max_spill_bytes = int(max_spill_mb * 1024 * 1024)
+        # 已写完的分段：(首条序号, 条数, 路径, 文件大小)
+        self._segments: List[Tuple[int, int, Path, int]] = []
+        self._writer = None
+        self._writer_path: Optional[Path] = None
+        self._writer_first = 0
+        self._writer_count = 0
+        self.spilled = 0
+        if self.spill_dir is not None:
+            self.spill_dir.mkdir(parents=True, exist_ok=True)
+
+    def add(self, event_data: Dict[str, Any]) -> bool:
+        """记录一个事件
+
+        Args:
+            event_data: 事件参数
+
+        Returns:
+            bool: 是否被保留（未被采样丢弃）
+        """
+        with self._lock:
+            self.seen += 1
+            if self.sample_rate < 1:
+                self._sample_credit += self.sample_rate
+                if self._sample_credit < 1:
+                    self.sampled_out += 1
+                    return False
+                self._sample_credit -= 1
+            entry = {"timestamp": event_data.get("timestamp", ""), "data": event_data}
+            seq = self.buffer.append(entry)
+            if self.spill_dir is not None:
+                self._spill(seq, entry)
+            return True
+
+    def _segment_name(self, first_seq: int) -> str:
+        safe_name = re.sub(r"[^\w.-]", "_", self.event_name)
+        return f"{safe_name}_{first_seq:012d}.jsonl.gz"
+
+    def _spill(self, seq: int, entry: Dict[str, Any]) -> None:
+        """写入当前分段（调用方需持有锁）"""
+        try:
+            if self._writer is None:
+                self._writer_path = self.spill_dir / self._segment_name(seq)
+                self._writer = gzip.open(self._writer_path, "wt", encoding="utf-8")
+                self._writer_first = seq
+                self._writer_count = 0
+            self._writer.write(json.dumps({"seq": seq, **entry}, ensure_ascii=False, default=str))
+            self._writer.write("\n")
+            self._writer_count += 1
+            self.spilled += 1
+            if self._writer_count >= self.segment_events:
+                self._rotate()
+        except (OSError, ValueError):
+            # 磁盘写入失败时只保留内存数据
+            self._close_writer()
+
+    def _rotate(self) -> None:
+        """结束当前分段，并按总大小上限删除最旧的分段（调用方需持有锁）"""
+        path, first, count = self._writer_path, self._writer_first, self._writer_count
+        self._close_writer()
+        if path is None or not path.exists():
+            return
+        self._segments.append((first, count, path, path.stat().st_size))
+        total = sum(segment[3] for segment in self._segments)
+        while self._segments and total > self.max_spill_bytes:
+            _, _, old_path, size = self._segments.pop(0)
+            old_path.unlink(missing_ok=True)
+            total -= size
+
+    def _close_writer(self) -> None:
+        if self._writer is not None:
+            try:
+                self._writer.close()
+            except OSError:
+                pass
+        self._writer = None
+
+    def since(self, cursor: int = 0, limit: int = 100) -> Dict[str, Any]:
+        """按游标增量读取事件
+
+        Args:
+            cursor: 上次读取返回的游标，首次读取传 0
+            limit: 单次读取条数上限
+
+        Returns:
+            dict: 事件列表、下次读取使用的游标、因超出保留范围而无法读取的条数
+        """
+        events: List[Dict[str, Any]] = []
+        missed = 0
+        memory_start = self.buffer.stats()["cursor"] - len(self.buffer)
+        if cursor < memory_start and limit > 0:
+            disk_events, disk_start = self._read_disk(cursor, min(limit, memory_start - cursor))
+            if disk_start is None or disk_start > cursor:
+                # 早于最旧可读事件的部分已丢失
+                missed = (disk_start if disk_start is not None else memory_start) - cursor
+            events.extend(disk_events)
+            cursor = events[-1]["seq"] + 1 if events else cursor + missed
+            limit -= len(events)
+
+        if limit <= 0:
+            return {"events": events, "cursor": cursor, "missed": missed}
+        items, next_cursor = self.buffer.since(cursor, limit)
+        first_seq = next_cursor - len(items)
+        events.extend({"seq": first_seq + offset, **item} for offset, item in enumerate(items))
+        return {"events": events, "cursor": next_cursor, "missed": missed}
+
+    def _read_disk(self, cursor: int, limit: int) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """从磁盘分段读取序号不小于 cursor 的事件
+
+        Returns:
+            tuple: (事件列表, 磁盘上最早可读的序号；没有落盘数据时为 None)
+        """
+        with self._lock:
+            segments = [(first, path) for first, _, path, _ in self._segments]
+            if self._writer is not None:
+                # 让读取方能读到当前分段中已写入的内容
+                self._writer.flush()
+                segments.append((self._writer_first, self._writer_path))
+        if not segments:
+            return [], None
+
+        earliest = segments[0][0]
+        events: List[Dict[str, Any]] = []
+        for index, (first, path) in enumerate(segments):
+            next_first = segments[index + 1][0] if index + 1 < len(segments) else None
+            if next_first is not None and next_first <= cursor:
+                continue
+            try:
+                with gzip.open(path, "rt", encoding="utf-8") as file:
+                    for line in file:
+                        event = json.loads(line)
+                        if event["seq"] < cursor:
+                            continue
+                        events.append(event)
+                        if len(events) >= limit:
+                            return events, earliest
+            except (OSError, EOFError, ValueError):
+                # 当前分段末尾可能尚未完整写出
+                continue
+        return events, earliest
+
+    def tail(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """获取内存中最新的事件"""
+        return self.buffer.tail(limit)
+
+    def clear(self) -> None:
+        """清空内存缓冲区（已落盘的分段保留，序号继续递增）"""
+        self.buffer.clear()
+
+    def close(self) -> None:
+        """结束当前分段"""
+        with self._lock:
+            if self._writer is not None:
+                self._rotate()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取收集统计"""
+        with self._lock:
+            stats = {
+                "seen": self.seen,
+                "sampled_out": self.sampled_out,
+                "sample_rate": self.sample_rate,
+                "buffer": self.buffer.stats()
+            }
+            if self.spill_dir is not None:
+                stats["spill"] = {
+                    "dir": str(self.spill_dir),
+                    "spilled": self.spilled,
+                    "segments": len(self._segments) + (1 if self._writer is not None else 0),
+                    "closed_segments_kb": round(sum(s[3] for s in self._segments) / 1024, 1)
+                }
+            return stats
@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+"""HAR流式写入模块
+
+按请求逐条关联 CDP Network 事件并以流的方式写出 HAR 1.2 文件，
+内存中只保留尚未完成的请求，导出规模与内存占用无关。
+"""
+
+import json
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+from urllib.parse import urlsplit, parse_qsl
+
+
+class HarWriter:
+    """增量JSON写入器
+
+    先写出 HAR 头部，随后每完成一个请求追加一条 entry，关闭时补全结尾，
+    不在内存中构造完整的 HAR 字典。
+    """
+
+    def __init__(self, path: Path, creator_version: str = "1.0"):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._file = open(self.path, "w", encoding="utf-8")
+        self._count = 0
+        self._closed = False
+        header = {
+            "version": "1.2",
+            "creator": {"name": "DrissionPage MCP", "version": creator_version},
+            "pages": []
+        }
+        # 去掉头部最后的 "}"，后面接 entries 数组
+        self._file.write('{"log": ' + json.dumps(header, ensure_ascii=False)[:-1] + ', "entries": [\n')
+
+    @property
+    def count(self) -> int:
+        """已写出的条目数"""
+        return self._count
+
+    def write_entry(self, entry: Dict[str, Any]) -> None:
+        """追加一条HAR条目"""
+        data = json.dumps(entry, ensure_ascii=False, separators=(",", ":"))
+        with self._lock:
+            if self._closed:
+                return
+            if self._count:
+                self._file.write(",\n")
+            self._file.write(data)
+            self._count += 1
+            if self._count % 100 == 0:
+                self._file.flush()
+
+    def close(self) -> None:
+        """写入结尾并关闭文件"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._file.write("\n]}}\n")
+            self._file.close()
+
+
+def _headers_to_list(headers: Optional[Dict[str, Any]]) -> List[Dict[str, str]]:
+    """将CDP头部字典转换为HAR头部列表（多值头部以换行分隔）"""
+    result = []
+    for name, value in (headers or {}).items():
+        for part in str(value).split("\n"):
+            result.append({"name": name, "value": part})
+    return result
+
+
+def _http_version(protocol: str) -> str:
+    protocol = (protocol or "").lower()
+    if protocol in ("h2", "http/2.0"):
+        return "HTTP/2.0"
+    if protocol in ("h3", "http/3", "quic"):
+        return "HTTP/3"
+    return protocol.upper() if protocol else "HTTP/1.1"
+
+
+def _span(timing: Dict[str, float], start: str, end: str) -> float:
+    if timing.get(start, -1) < 0 or timing.get(end, -1) < 0:
+        return -1
+    return round(timing[end] - timing[start], 3)
+
+
+def build_har_entry(request_event: Dict[str, Any],
+                    response_event: Optional[Dict[str, Any]] = None,
+                    finish_event: Optional[Dict[str, Any]] = None,
+                    redirect_response: Optional[Dict[str, Any]] = None,
+                    error_text: Optional[str] = None) -> Dict[str, Any]:
+    """由关联好的 CDP 事件构造一条 HAR 条目
+
+    Args:
+        request_event: Network.requestWillBeSent 事件
+        response_event: Network.responseReceived 事件
+        finish_event: Network.loadingFinished / loadingFailed 事件，
+            或重定向时下一跳的 requestWillBeSent 事件
+        redirect_response: 重定向响应（来自下一跳 requestWillBeSent 的 redirectResponse）
+        error_text: 请求失败原因
+
+    Returns:
+        dict: HAR 条目
+    """
+    request = request_event.get("request", {})
+    response = redirect_response or (response_event or {}).get("response") or {}
+    timing = response.get("timing") or {}
+    start_ts = request_event.get("timestamp", 0.0)
+    end_ts = (finish_event or {}).get("timestamp", start_ts)
+    total_ms = max(0.0, (end_ts - start_ts) * 1000)
+    encoded_length = (finish_event or {}).get("encodedDataLength", response.get("encodedDataLength", 0)) or 0
+
+    wall_time = request_event.get("wallTime")
+    started = (datetime.fromtimestamp(wall_time, tz=timezone.utc) if wall_time
+               else datetime.now(timezone.utc))
+    version = _http_version(response.get("protocol", ""))
+
+    post_data = request.get("postData")
+    request_headers = request.get("headers", {})
+    har_request = {
+        "method": request.get("method", "GET"),
+        "url": request.get("url", "") + request.get("urlFragment", ""),
+        "httpVersion": version,
+        "cookies": [],
+        "headers": _headers_to_list(response.get("requestHeaders") or request_headers),
+        "queryString": [{"name": k, "value": v}
+                        for k, v in parse_qsl(urlsplit(request.get("url", "")).query, keep_blank_values=True)],
+        "headersSize": -1,
+        "bodySize": len(post_data.encode("utf-8")) if post_data else 0
+    }
+    if post_data:
+        content_type = next((v for k, v in request_headers.items() if k.lower() == "content-type"), "")
+        har_request["postData"] = {"mimeType": content_type, "text": post_data}
+
+    response_headers = response.get("headers", {})
+    har_response = {
+        "status": response.get("status", 0),
+        "statusText": response.get("statusText", "") or (error_text or ""),
+        "httpVersion": version,
+        "cookies": [],
+        "headers": _headers_to_list(response_headers),
+        "content": {"size": encoded_length, "mimeType": response.get("mimeType", "x-unknown")},
+        "redirectURL": next((v for k, v in response_headers.items() if k.lower() == "location"), ""),
+        "headersSize": -1,
+        "bodySize": encoded_length
+    }
+
+    if timing:
+        request_time = timing.get("requestTime", start_ts)
+        blocked = next((timing[k] for k in ("dnsStart", "connectStart", "sendStart") if timing.get(k, -1) >= 0), -1)
+        wait = _span(timing, "sendEnd", "receiveHeadersEnd")
+        receive = max(0.0, (end_ts - request_time) * 1000 - timing.get("receiveHeadersEnd", 0))
+        timings = {
+            "blocked": round(blocked, 3) if blocked >= 0 else -1,
+            "dns": _span(timing, "dnsStart", "dnsEnd"),
+            "connect": _span(timing, "connectStart", "connectEnd"),
+            "ssl": _span(timing, "sslStart", "sslEnd"),
+            "send": max(0.0, _span(timing, "sendStart", "sendEnd")),
+            "wait": max(0.0, wait),
+            "receive": round(receive, 3)
+        }
+    else:
+        timings = {"send": 0, "wait": round(total_ms, 3), "receive": 0}
+
+    entry = {
+        "startedDateTime": started.isoformat().replace("+00:00", "Z"),
+        "time": round(total_ms, 3),
+        "request": har_request,
+        "response": har_response,
+        "cache": {},
+        "timings": timings,
+        "_requestId": request_event.get("requestId", ""),
+        "_resourceType": request_event.get("type", "")
+    }
+    if response.get("remoteIPAddress"):
+        entry["serverIPAddress"] = response["remoteIPAddress"]
+    if error_text:
+        entry["_error"] = error_text
+    return entry
@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+"""网络事件过滤模块
+
+将 mimeType、主机、URL正则、状态码和资源类型条件预编译为一个过滤器对象，
+在驱动事件线程上以 O(1) / O(len(url)) 的代价判断事件是否匹配。
+"""
+
+import re
+from typing import Dict, Any, Iterable, List, Optional, Union
+from urllib.parse import urlsplit
+
+
+# 匹配任意mimeType的写法
+MIME_WILDCARDS = ("*", "*/*")
+
+
+class HostTrie:
+    """主机名后缀字典树
+
+    按域名标签从右向左存储，"example.com" 同时匹配 example.com 与其所有子域名。
+    """
+
+    _END = object()
+
+    def __init__(self, hosts: Iterable[str] = ()):
+        self._root: Dict[Any, Any] = {}
+        self.size = 0
+        for host in hosts:
+            self.add(host)
+
+    def add(self, host: str) -> None:
+        """添加主机名（可带前缀 "*." 或 "."）"""
+        host = host.strip().lower().lstrip("*").lstrip(".")
+        if not host:
+            return
+        node = self._root
+        for label in reversed(host.split(".")):
+            node = node.setdefault(label, {})
+        node[self._END] = True
+        self.size += 1
+
+    def matches(self, host: str) -> bool:
+        """判断主机名是否等于或属于已添加的某个域名"""
+        node = self._root
+        for label in reversed(host.split(".")):
+            node = node.get(label)
+            if node is None:
+                return False
+            if self._END in node:
+                return True
+        return False
+
+    def __bool__(self) -> bool:
+        return self.size > 0
+
+
+class NetworkFilter:
+    """预编译的网络事件过滤器
+
+    各条件之间为“与”关系，同一条件内的多个值为“或”关系，未设置的条件视为全部匹配。
+    """
+
+    def __init__(self,
+                 mime_types: Optional[List[str]] = None,
+                 hosts: Optional[List[str]] = None,
+                 url_patterns: Optional[List[str]] = None,
+                 url_include: Optional[str] = None,
+                 status_ranges: Optional[List[Union[int, str]]] = None,
+                 resource_types: Optional[List[str]] = None):
+        """
+        初始化过滤器
+
+        Args:
+            mime_types: mimeType 条件。完整类型（application/json）按集合精确匹配，
+                "image/*" 按主类型匹配，其余关键字（json）按子串匹配，"*/*" 匹配全部
+            hosts: 主机名列表，匹配该域名及其子域名
+            url_patterns: URL正则表达式列表，编译为一个交替表达式
+            url_include: URL需要包含的子串
+            status_ranges: 状态码条件，支持 404、"404"、"4xx"、"400-499"
+            resource_types: 资源类型列表（Document、XHR、Fetch、Image 等，不区分大小写）
+
+        Raises:
+            ValueError: 正则表达式或状态码格式无效
+        """
+        self.mime_types = list(mime_types or [])
+        self.url_include = url_include or None
+
+        # mimeType：精确集合 + 主类型集合 + 关键字交替正则
+        self._mime_any = not self.mime_types or any(m in MIME_WILDCARDS for m in self.mime_types)
+        self._mime_exact = frozenset(m.lower() for m in self.mime_types
+                                     if "/" in m and not m.endswith(("/", "/*")))
+        self._mime_major = frozenset(m.lower().split("/")[0] for m in self.mime_types
+                                     if m.endswith(("/", "/*")) and m not in MIME_WILDCARDS)
+        keywords = [m.lower() for m in self.mime_types if "/" not in m and m not in MIME_WILDCARDS]
+        self._mime_keywords = (re.compile("|".join(re.escape(k) for k in keywords)) if keywords else None)
+        # 页面中mimeType种类很少，缓存判断结果
+        self._mime_cache: Dict[str, bool] = {}
+
+        self.hosts = list(hosts or [])
+        self._hosts = HostTrie(self.hosts)
+
+        self.url_patterns = list(url_patterns or [])
+        try:
+            self._url_regex = (re.compile("|".join(f"(?:{p})" for p in self.url_patterns))
+                               if self.url_patterns else None)
+        except re.error as e:
+            raise ValueError(f"URL正则表达式无效: {str(e)}")
+
+        self.status_ranges = list(status_ranges or [])
+        self._status_table = self._compile_status(self.status_ranges) if self.status_ranges else None
+
+        self._resource_types = frozenset(t.lower() for t in (resource_types or []))
+
+    @staticmethod
+    def _compile_status(ranges: List[Union[int, str]]) -> bytearray:
+        """将状态码条件编译为查找表"""
+        table = bytearray(600)
+        for item in ranges:
+            text = str(item).strip().lower()
+            if re.fullmatch(r"[1-5]xx", text):
+                low, high = int(text[0]) * 100, int(text[0]) * 100 + 99
+            elif re.fullmatch(r"\d{3}-\d{3}", text):
+                low, high = (int(part) for part in text.split("-"))
+            elif re.fullmatch(r"\d{1,3}", text):
+                low = high = int(text)
+            else:
+                raise ValueError(f"无效的状态码条件: {item}")
+            for code in range(max(low, 0), min(high, 599) + 1):
+                table[code] = 1
+        return table
+
+    def match_mime(self, mime_type: str) -> bool:
+        """判断mimeType是否匹配"""
+        if self._mime_any:
+            return True
+        cached = self._mime_cache.get(mime_type)
+        if cached is not None:
+            return cached
+        value = mime_type.lower().split(";")[0].strip()
+        result = (value in self._mime_exact
+                  or value.split("/")[0] in self._mime_major
+                  or (self._mime_keywords is not None and self._mime_keywords.search(value) is not None))
+        if len(self._mime_cache) < 1024:
+            self._mime_cache[mime_type] = result
+        return result
+
+    def match_url(self, url: str) -> bool:
+        """判断URL是否匹配（主机、子串、正则条件）"""
+        if self.url_include is not None and self.url_include not in url:
+            return False
+        if self._hosts and not self._hosts.matches(urlsplit(url).hostname or ""):
+            return False
+        if self._url_regex is not None and self._url_regex.search(url) is None:
+            return False
+        return True
+
+    def match_status(self, status: int) -> bool:
+        """判断状态码是否匹配"""
+        if self._status_table is None:
+            return True
+        return 0 <= status < 600 and self._status_table[status] == 1
+
+    def match_response(self, event: Dict[str, Any]) -> bool:
+        """判断 Network.responseReceived 事件是否匹配
+
+        Args:
+            event: 事件参数
+
+        Returns:
+            bool: 是否匹配
+        """
+        if self._resource_types and event.get("type", "").lower() not in self._resource_types:
+            return False
+        response = event.get("response", {})
+        if not self.match_status(int(response.get("status", 0))):
+            return False
+        if not self.match_mime(response.get("mimeType", "")):
+            return False
+        return self.match_url(response.get("url", ""))
+
+    def matched_mime_filters(self, mime_type: str) -> List[str]:
+        """列出命中的mimeType条件（用于记录匹配原因）"""
+        value = mime_type.lower()
+        return [m for m in self.mime_types
+                if m in MIME_WILDCARDS or m.lower().rstrip("*").rstrip("/") in value]
+
+    def describe(self) -> Dict[str, Any]:
+        """返回过滤条件摘要"""
+        description: Dict[str, Any] = {}
+        if self.mime_types:
+            description["mime_types"] = self.mime_types
+        if self._hosts:
+            description["hosts"] = self.hosts
+        if self.url_include:
+            description["url_include"] = self.url_include
+        if self.url_patterns:
+            description["url_patterns"] = self.url_patterns
+        if self.status_ranges:
+            description["status_ranges"] = self.status_ranges
+        if self._resource_types:
+            description["resource_types"] = sorted(self._resource_types)
+        return description
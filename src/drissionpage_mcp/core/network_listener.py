@@ -4,21 +4,259 @@
 负责CDP事件监听和网络数据包监听功能。
 """
 
-from typing import Dict, Any, List, Literal, Callable
+import base64
+import json
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Literal, Callable, Optional
 from DrissionPage import Chromium
+from ..utils.ring_buffer import RingBuffer
+from .domain_manager import CDPDomainManager
+from .event_bus import CDPEventBus
+from .network_filter import NetworkFilter
+from .network_stats import NetworkStats
+
+
+class ResponseRecord:
+    """网络响应记录
+
+    只保留常用字段，原始事件默认不保存，以降低长时间监听的内存占用。
+    """
+
+    __slots__ = ("request_id", "url", "status", "mime_type", "resource_type",
+                 "timestamp", "timing", "size", "matched_filters", "raw", "target_id")
+
+    def __init__(self, event: Dict[str, Any], matched_filters: Optional[List[str]] = None,
+                 keep_raw: bool = False, target_id: Optional[str] = None):
+        response = event.get("response", {})
+        timing = response.get("timing") or {}
+        self.request_id = event.get("requestId", "")
+        self.url = response.get("url", "")
+        self.status = response.get("status", 0)
+        self.mime_type = response.get("mimeType", "")
+        self.resource_type = event.get("type", "")
+        self.timestamp = event.get("timestamp", 0.0)
+        # 从发出请求到收到响应头的耗时（毫秒）
+        self.timing = timing.get("receiveHeadersEnd")
+        self.size = response.get("encodedDataLength", 0)
+        self.matched_filters = matched_filters
+        self.raw = event if keep_raw else None
+        # 浏览器级监听时记录所属目标（标签页/弹窗）ID
+        self.target_id = target_id
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典"""
+        data = {
+            "event_name": "Network.responseReceived",
+            "request_id": self.request_id,
+            "url": self.url,
+            "status": self.status,
+            "mime_type": self.mime_type,
+            "resource_type": self.resource_type,
+            "timestamp": self.timestamp,
+            "timing": self.timing,
+            "size": self.size
+        }
+        if self.target_id is not None:
+            data["target_id"] = self.target_id
+        if self.matched_filters is not None:
+            data["matched_filters"] = self.matched_filters
+        if self.raw is not None:
+            data["event_data"] = self.raw
+        return data
 
 
 class NetworkListener:
     """网络监听器
     
     负责CDP事件监听和网络响应监听。
+    通过 NetworkListener.for_tab(tab) 获取时每个标签页一个实例，重新初始化服务后
+    HAR录制、响应体捕获和流式消息捕获的状态仍然保留，可以继续查询和停止。
     """
+
+    _listeners: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+    _listeners_lock = threading.Lock()
     
-    def __init__(self, tab):
+    def __init__(self, tab, log_store=None, body_store=None):
+        from ..config.settings import get_config_value
+
         self.tab = tab
-        self.cdp_event_data: List[Dict[str, Any]] = []
-        self.response_listener_data: List[Dict[str, Any]] = []
+        self.log_store = log_store
+        self.body_store = body_store
+        # 同一标签页的所有组件共享一个事件总线，各自订阅互不覆盖
+        self.event_bus = CDPEventBus.for_tab(tab)
+        # 域的启用/禁用按使用者引用计数，关闭一个功能不会影响其他功能
+        self.domains = CDPDomainManager.for_tab(tab)
+        # 响应体捕获状态
+        self._body_filter: Optional[Dict[str, Any]] = None
+        self._body_pending: Dict[str, tuple] = {}
+        self._body_executor: Optional[ThreadPoolExecutor] = None
+        self._body_stats = {"captured": 0, "skipped_too_large": 0, "failed": 0}
+        # 统计在事件线程和取响应体的线程池中同时更新
+        self._body_lock = threading.Lock()
+        # 按主机/资源类型的流式统计，启用网络监听时自动开启
+        self.stats = NetworkStats()
+        # 进行中的请求（requestId -> URL），用于等待网络空闲
+        self._inflight: Dict[str, str] = {}
+        self._inflight_cond = threading.Condition()
+        self._request_seq = 0
+        self._tracking_inflight = False
+        # WebSocket / EventSource 消息捕获状态
+        self._stream_filter: Optional[Dict[str, Any]] = None
+        self.stream_store = None
+        # HAR录制状态：只保留未完成的请求
+        self._har_writer = None
+        self._har_inflight: Dict[str, Dict[str, Any]] = {}
+        self._har_lock = threading.Lock()
+        # 原因：原先使用无限增长的列表，长时间监听会持续占用内存；改为定长环形缓冲区，
+        # 副作用：超出容量的最旧数据会被丢弃（计入 dropped），回滚策略：还原为列表
+        self.cdp_event_data = RingBuffer(get_config_value('network.max_cdp_events', 1000))
+        self.response_listener_data = RingBuffer(get_config_value('network.max_records', 1000))
+        self.keep_raw_events = get_config_value('network.keep_raw_events', False)
+
+    @classmethod
+    def for_tab(cls, tab, log_store=None, body_store=None) -> "NetworkListener":
+        """获取标签页对应的网络监听器，不存在时创建
+
+        Args:
+            tab: 标签页对象
+            log_store: 网络日志数据库，已有实例时替换其数据库
+            body_store: 响应体存储，已有实例且尚未创建存储时使用
+        """
+        driver = tab.driver
+        with cls._listeners_lock:
+            listener = cls._listeners.get(driver)
+            if listener is None:
+                listener = cls._listeners[driver] = cls(tab, log_store, body_store)
+                return listener
+        listener.tab = tab
+        if log_store is not None:
+            listener.log_store = log_store
+        if listener.body_store is None:
+            listener.body_store = body_store
+        return listener
+
+    @classmethod
+    def close_all(cls) -> int:
+        """结束所有标签页上进行中的录制（服务退出时调用，保证HAR文件完整）
+
+        Returns:
+            int: 关闭的监听器数量
+        """
+        with cls._listeners_lock:
+            listeners = list(cls._listeners.values())
+        for listener in listeners:
+            try:
+                listener.close()
+            except Exception:
+                pass
+        return len(listeners)
+
+    def close(self) -> None:
+        """停止HAR录制并写出文件结尾，释放响应体捕获的线程池"""
+        if self._har_writer is not None:
+            self.stop_har_recording()
+        if self._body_filter is not None or self._body_executor is not None:
+            self.disable_body_capture()
     
+    def subscribe(self, event_name: str, key: str, handler: Callable, queue_size: Optional[int] = None) -> None:
+        """通过事件总线订阅CDP事件
+
+        相同订阅键在同一事件上的处理函数会被替换，不影响其他订阅者。
+
+        Args:
+            event_name: CDP事件名称
+            key: 订阅键（自动加 "network:" 前缀）
+            handler: 处理函数，以关键字参数接收事件数据
+            queue_size: 设置后在独立线程中按顺序处理，不阻塞驱动事件线程
+        """
+        self.event_bus.subscribe(event_name, handler, f"network:{key}", queue_size=queue_size)
+
+    def unsubscribe(self, event_name: str, key: str) -> None:
+        """取消订阅CDP事件"""
+        self.event_bus.unsubscribe(event_name, f"network:{key}")
+
+    def _enable_stats(self) -> None:
+        """订阅统计与进行中请求跟踪所需的网络事件"""
+        self.subscribe("Network.responseReceived", "stats", self.stats.on_response)
+        self.subscribe("Network.loadingFinished", "stats", self.stats.on_finished)
+        self.subscribe("Network.loadingFailed", "stats", self.stats.on_failed)
+        self._enable_inflight_tracking()
+
+    # 长连接类型的请求不会结束，不计入进行中的请求
+    _LONG_LIVED_TYPES = frozenset(("WebSocket", "EventSource"))
+
+    def _enable_inflight_tracking(self) -> None:
+        """订阅请求开始/结束事件以跟踪进行中的请求"""
+        if self._tracking_inflight:
+            return
+        self.subscribe("Network.requestWillBeSent", "inflight", self._on_request_started)
+        self.subscribe("Network.loadingFinished", "inflight", self._on_request_done)
+        self.subscribe("Network.loadingFailed", "inflight", self._on_request_done)
+        self._tracking_inflight = True
+
+    def _on_request_started(self, **event) -> None:
+        if event.get("type") in self._LONG_LIVED_TYPES:
+            return
+        with self._inflight_cond:
+            self._inflight[event.get("requestId")] = event.get("request", {}).get("url", "")
+            self._request_seq += 1
+            self._inflight_cond.notify_all()
+
+    def _on_request_done(self, **event) -> None:
+        with self._inflight_cond:
+            if self._inflight.pop(event.get("requestId"), None) is not None:
+                self._inflight_cond.notify_all()
+
+    def wait_for_network_idle(self, idle_ms: int = 500, max_inflight: int = 0,
+                              timeout: float = 30) -> Dict[str, Any]:
+        """等待网络空闲
+
+        进行中的请求数不超过 max_inflight 并持续 idle_ms 毫秒即返回，不做固定时长的等待。
+        max_inflight 为 0 时，等待期间任何新请求都会重新计时。
+
+        Args:
+            idle_ms: 需要保持空闲的时长（毫秒）
+            max_inflight: 允许的进行中请求数（用于容忍轮询、长轮询等请求）
+            timeout: 最长等待时间（秒）
+
+        Returns:
+            dict: 是否达到空闲、实际等待时长、剩余的进行中请求
+        """
+        if not self._tracking_inflight:
+            # 首次跟踪前已发出的请求无法感知，此时至少等待一个完整的空闲窗口
+            self.domains.acquire("Network", "network:inflight")
+            self._enable_inflight_tracking()
+
+        idle = idle_ms / 1000.0
+        start = time.monotonic()
+        deadline = start + timeout
+        quiet_since = None
+        with self._inflight_cond:
+            seen_seq = self._request_seq
+            while True:
+                now = time.monotonic()
+                new_request = self._request_seq != seen_seq
+                seen_seq = self._request_seq
+                if len(self._inflight) > max_inflight or (max_inflight == 0 and new_request):
+                    quiet_since = None
+                elif quiet_since is None:
+                    quiet_since = now
+
+                reached = quiet_since is not None and now - quiet_since >= idle
+                if reached or now >= deadline:
+                    return {
+                        "idle": reached,
+                        "waited_ms": round((now - start) * 1000),
+                        "inflight": len(self._inflight),
+                        "pending_urls": list(self._inflight.values())[:5]
+                    }
+
+                wake_at = deadline if quiet_since is None else min(deadline, quiet_since + idle)
+                self._inflight_cond.wait(max(wake_at - now, 0.001))
+
     def run_cdp(self, cmd: str, **cmd_args) -> Any:
         """在当前标签页中运行谷歌CDP协议代码并获取结果
         
@@ -55,7 +293,7 @@ class NetworkListener:
             })
 
         try:
-            self.tab.driver.set_callback(event_name, callback)
+            self.subscribe(event_name, "cdp_event", callback)
             return f"CDP event callback for '{event_name}' set successfully."
         except Exception as e:
             return f"设置CDP事件监听失败: {str(e)}"
@@ -66,7 +304,7 @@ class NetworkListener:
         Returns:
             list: CDP事件数据列表
         """
-        return self.cdp_event_data
+        return self.cdp_event_data.tail()
     
     def clear_cdp_event_data(self) -> str:
         """清空CDP事件数据
@@ -124,31 +362,36 @@ class NetworkListener:
             str: 设置结果
         """
         # 启用网络域
-        self.tab.run_cdp("Network.enable")
+        self.domains.acquire("Network", "network:response_listener")
+        network_filter = NetworkFilter(mime_types=[mime_type], url_include=url_include)
 
         def response_callback(**event):
-            response = event.get("response", {})
-            _url = response.get("url", "")
-            _mime_type = response.get("mimeType", "")
-            
-            if mime_type in _mime_type and url_include in _url:
-                self.response_listener_data.append({
-                    "event_name": "Network.responseReceived",
-                    "event_data": event
-                })
+            if network_filter.match_response(event):
+                self._store_record(ResponseRecord(event, keep_raw=self.keep_raw_events))
         
         try:
-            self.tab.driver.set_callback("Network.responseReceived", response_callback)
+            self.subscribe("Network.responseReceived", "response_listener", response_callback)
+            self._enable_stats()
             return f"网络响应监听设置成功，监听mimeType: {mime_type}, URL包含: {url_include}"
         except Exception as e:
             return f"设置网络响应监听失败: {str(e)}"
     
-    def setup_multi_filter_listener(self, filter_types: List[str] = None, url_include: str = ".") -> str:
+    def setup_multi_filter_listener(self,
+                                    filter_types: List[str] = None,
+                                    url_include: str = ".",
+                                    hosts: Optional[List[str]] = None,
+                                    url_patterns: Optional[List[str]] = None,
+                                    status_ranges: Optional[List[Any]] = None,
+                                    resource_types: Optional[List[str]] = None) -> str:
         """设置多过滤器网络响应监听
         
         Args:
-            filter_types: 需要监听的mimeType类型列表
+            filter_types: 需要监听的mimeType类型列表，"*/*" 表示全部
             url_include: 需要监听的url包含的关键字
+            hosts: 主机名列表，匹配该域名及其子域名
+            url_patterns: URL正则表达式列表
+            status_ranges: 状态码条件，如 [200, "4xx", "500-599"]
+            resource_types: 资源类型列表，如 ["XHR", "Fetch"]
             
         Returns:
             str: 设置结果
@@ -157,30 +400,38 @@ class NetworkListener:
         if not filter_types:
             filter_types = ["application/json"]
         
+        # 原因：过滤条件预编译为 NetworkFilter，避免在驱动事件线程上逐条遍历比较，
+        # 副作用：无效的正则或状态码在设置时即报错，回滚策略：还原逐条子串比较
+        try:
+            network_filter = NetworkFilter(filter_types, hosts, url_patterns, url_include,
+                                           status_ranges, resource_types)
+        except ValueError as e:
+            return f"设置多过滤器网络响应监听失败: {str(e)}"
+
         # 启用网络域
-        self.tab.run_cdp("Network.enable")
+        self.domains.acquire("Network", "network:response_listener")
 
         def multi_response_callback(**event):
-            response = event.get("response", {})
-            _url = response.get("url", "")
-            _mime_type = response.get("mimeType", "")
-            
-            # 检查是否匹配任一过滤器类型
-            type_matched = any(filter_type in _mime_type for filter_type in filter_types)
-            
-            if type_matched and url_include in _url:
-                self.response_listener_data.append({
-                    "event_name": "Network.responseReceived",
-                    "event_data": event,
-                    "matched_filters": [ft for ft in filter_types if ft in _mime_type]
-                })
+            if network_filter.match_response(event):
+                self._store_record(ResponseRecord(
+                    event,
+                    matched_filters=network_filter.matched_mime_filters(event["response"].get("mimeType", "")),
+                    keep_raw=self.keep_raw_events
+                ))
         
         try:
-            self.tab.driver.set_callback("Network.responseReceived", multi_response_callback)
-            return f"多过滤器网络响应监听设置成功，监听类型: {filter_types}, URL包含: {url_include}"
+            self.subscribe("Network.responseReceived", "response_listener", multi_response_callback)
+            self._enable_stats()
+            return f"多过滤器网络响应监听设置成功，过滤条件: {network_filter.describe()}"
         except Exception as e:
             return f"设置多过滤器网络响应监听失败: {str(e)}"
     
+    def _store_record(self, record: ResponseRecord) -> None:
+        """写入内存缓冲区，并在启用持久化时交给日志存储"""
+        self.response_listener_data.append(record)
+        if self.log_store is not None:
+            self.log_store.add(record, getattr(self.tab, "tab_id", None))
+
     def stop_response_listener(self, clear_data: bool = False) -> str:
         """关闭监听网页发送的数据包
         
@@ -191,7 +442,10 @@ class NetworkListener:
             str: 关闭结果
         """
         try:
-            self.tab.run_cdp("Network.disable")
+            # 原因：直接禁用 Network 域会中断其他仍在使用该域的功能，改为取消订阅并释放引用，
+            # 副作用：其他功能仍在使用时 Network 域保持启用，回滚策略：还原为 Network.disable
+            self.unsubscribe("Network.responseReceived", "response_listener")
+            self.domains.release("Network", "network:response_listener")
             if clear_data:
                 self.response_listener_data.clear()
             return f"网络响应监听关闭成功，是否清空数据: {clear_data}"
@@ -204,7 +458,7 @@ class NetworkListener:
         Returns:
             list: 网络响应数据列表
         """
-        return self.response_listener_data
+        return [record.to_dict() for record in self.response_listener_data.tail()]
     
     def get_response_listener_data_limited(self, limit: int = 50) -> List[Dict[str, Any]]:
         """获取限制数量的网络响应监听数据
@@ -218,7 +472,24 @@ class NetworkListener:
         # 原因：添加limit参数支持，提供数据量控制功能，副作用：无，回滚策略：移除此方法
         if limit <= 0:
             return []
-        return self.response_listener_data[-limit:] if len(self.response_listener_data) > limit else self.response_listener_data
+        return [record.to_dict() for record in self.response_listener_data.tail(limit)]
+
+    def get_response_listener_data_since(self, cursor: int = 0, limit: int = 50) -> Dict[str, Any]:
+        """按游标增量获取网络响应监听数据
+
+        Args:
+            cursor: 上次调用返回的游标，首次调用传 0
+            limit: 返回数据的最大数量
+
+        Returns:
+            dict: 数据列表、下次调用使用的游标，以及游标之后因缓冲区覆盖而错过的条数
+        """
+        records, next_cursor = self.response_listener_data.since(cursor, limit)
+        return {
+            "records": [record.to_dict() for record in records],
+            "cursor": next_cursor,
+            "missed": max(0, next_cursor - len(records) - cursor)
+        }
     
     def clear_response_listener_data(self) -> str:
         """清空网络响应监听数据
@@ -235,13 +506,460 @@ class NetworkListener:
         Returns:
             dict: 统计信息
         """
+        latest_response = self.response_listener_data.latest()
         return {
+            "summary": self.stats.summary(),
+            "slowest_hosts": self.stats.get_table("host", "p95_ms", 10),
+            "resource_types": self.stats.get_table("resource_type", "bytes_kb", 10),
             "cdp_events_count": len(self.cdp_event_data),
             "response_events_count": len(self.response_listener_data),
-            "latest_cdp_event": self.cdp_event_data[-1] if self.cdp_event_data else None,
-            "latest_response_event": self.response_listener_data[-1] if self.response_listener_data else None
+            "latest_cdp_event": self.cdp_event_data.latest(),
+            "latest_response_event": latest_response.to_dict() if latest_response else None,
+            "cdp_events_buffer": self.cdp_event_data.stats(),
+            "response_events_buffer": self.response_listener_data.stats()
         }
     
+    def enable_body_capture(self,
+                            mime_types: Optional[List[str]] = None,
+                            url_pattern: Optional[str] = None,
+                            max_body_mb: Optional[float] = None) -> str:
+        """启用响应体捕获
+
+        只对匹配过滤条件的响应，在 Network.loadingFinished 之后由后台线程调用
+        Network.getResponseBody 获取响应体，不阻塞事件回调线程。
+
+        Args:
+            mime_types: 需要捕获的mimeType关键字列表，默认 ["json"]
+            url_pattern: URL正则表达式，默认不限制
+            max_body_mb: 单个响应体大小上限（MB），超出则跳过
+
+        Returns:
+            str: 启用结果
+        """
+        from ..config.settings import get_config_value
+        from .response_body_store import ResponseBodyStore
+
+        try:
+            network_filter = NetworkFilter(mime_types or ["json"], url_patterns=[url_pattern] if url_pattern else None)
+        except ValueError as e:
+            return str(e)
+        if max_body_mb is None:
+            max_body_mb = get_config_value('network.body_max_mb', 10)
+
+        self._body_filter = {
+            "filter": network_filter,
+            "max_bytes": int(max_body_mb * 1024 * 1024)
+        }
+        if self.body_store is None:
+            self.body_store = ResponseBodyStore()
+        if self._body_executor is None:
+            self._body_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="response-body")
+
+        try:
+            self.domains.acquire("Network", "network:body_capture")
+            self.subscribe("Network.responseReceived", "body_capture", self._on_body_response)
+            self.subscribe("Network.loadingFinished", "body_capture", self._on_body_finished)
+            self.subscribe("Network.loadingFailed", "body_capture", self._on_body_failed)
+            return f"响应体捕获已启用，过滤条件: {network_filter.describe()}, 大小上限: {max_body_mb}MB"
+        except Exception as e:
+            return f"启用响应体捕获失败: {str(e)}"
+
+    def disable_body_capture(self) -> str:
+        """停止响应体捕获（已捕获的响应体保留）
+
+        Returns:
+            str: 停止结果
+        """
+        self._body_filter = None
+        for event_name in ("Network.responseReceived", "Network.loadingFinished", "Network.loadingFailed"):
+            self.unsubscribe(event_name, "body_capture")
+        self.domains.release("Network", "network:body_capture")
+        self._body_pending.clear()
+        # 原因：线程池从不关闭，每次启用/重建都会遗留工作线程，副作用：无，回滚策略：移除 shutdown
+        # 已提交的获取任务继续完成，下次启用时重新创建线程池
+        executor, self._body_executor = self._body_executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+        return "响应体捕获已停止"
+
+    def _on_body_response(self, **event) -> None:
+        body_filter = self._body_filter
+        if body_filter is None:
+            return
+        if not body_filter["filter"].match_response(event):
+            return
+        response = event["response"]
+        # 防止未完成的请求无限累积
+        if len(self._body_pending) > 1000:
+            self._body_pending.pop(next(iter(self._body_pending)), None)
+        self._body_pending[event.get("requestId")] = (response.get("url", ""), response.get("mimeType", ""))
+
+    def _count_body(self, key: str) -> None:
+        with self._body_lock:
+            self._body_stats[key] += 1
+
+    def _on_body_finished(self, **event) -> None:
+        request_id = event.get("requestId")
+        pending = self._body_pending.pop(request_id, None)
+        body_filter = self._body_filter
+        executor = self._body_executor
+        if pending is None or body_filter is None or executor is None:
+            return
+        if event.get("encodedDataLength", 0) > body_filter["max_bytes"]:
+            self._count_body("skipped_too_large")
+            return
+        try:
+            executor.submit(self._fetch_body, request_id, pending[0], pending[1], body_filter["max_bytes"])
+        except RuntimeError:
+            # 捕获已停止，线程池已关闭
+            pass
+
+    def _on_body_failed(self, **event) -> None:
+        self._body_pending.pop(event.get("requestId"), None)
+
+    def _fetch_body(self, request_id: str, url: str, mime_type: str, max_bytes: int) -> None:
+        """后台线程：获取并保存响应体"""
+        try:
+            result = self.tab.run_cdp("Network.getResponseBody", requestId=request_id)
+            body = result.get("body", "")
+            body = base64.b64decode(body) if result.get("base64Encoded") else body.encode("utf-8")
+            if len(body) > max_bytes:
+                self._count_body("skipped_too_large")
+                return
+            self.body_store.put(request_id, body, url, mime_type)
+            self._count_body("captured")
+        except Exception:
+            self._count_body("failed")
+
+    def get_response_body(self, request_id: str, max_chars: int = 20000) -> Optional[Dict[str, Any]]:
+        """按请求ID获取已捕获的响应体
+
+        Args:
+            request_id: CDP请求ID（见网络日志中的 request_id）
+            max_chars: 返回文本的最大字符数
+
+        Returns:
+            dict: 响应体信息，文本类型返回 body，二进制类型返回 body_base64 或文件路径；
+                未捕获时返回 None
+        """
+        from .response_body_store import is_text_mime
+
+        if self.body_store is None:
+            return None
+        entry = self.body_store.get(request_id)
+        if entry is None:
+            return None
+
+        body = entry.pop("body")
+        if is_text_mime(entry["mime_type"]):
+            text = body.decode("utf-8", errors="replace")
+            entry["body"] = text[:max_chars]
+            entry["truncated"] = len(text) > max_chars
+        elif len(body) * 4 // 3 <= max_chars:
+            entry["body_base64"] = base64.b64encode(body).decode("ascii")
+        else:
+            entry["truncated"] = True
+        return entry
+
+    def get_body_capture_stats(self) -> Dict[str, Any]:
+        """获取响应体捕获统计信息
+
+        Returns:
+            dict: 统计信息
+        """
+        with self._body_lock:
+            stats = dict(self._body_stats)
+        stats["enabled"] = self._body_filter is not None
+        stats["pending"] = len(self._body_pending)
+        if self.body_store is not None:
+            stats["store"] = self.body_store.get_stats()
+        return stats
+
+    # WebSocket 帧类型名称与 opcode 对应关系
+    STREAM_OPCODES = {"text": 1, "binary": 2, "close": 8, "ping": 9, "pong": 10}
+    _STREAM_EVENTS = ("Network.webSocketCreated", "Network.webSocketClosed",
+                      "Network.webSocketFrameReceived", "Network.webSocketFrameSent",
+                      "Network.webSocketFrameError", "Network.requestWillBeSent",
+                      "Network.eventSourceMessageReceived")
+
+    def enable_stream_capture(self,
+                              url_pattern: Optional[str] = None,
+                              opcodes: Optional[List[Any]] = None,
+                              decode_json: bool = False,
+                              max_frames_per_connection: Optional[int] = None) -> str:
+        """启用 WebSocket / EventSource 消息捕获
+
+        每个连接的消息写入独立的定长环形缓冲区，超出容量时丢弃最旧的消息。
+
+        Args:
+            url_pattern: 连接URL正则表达式，默认不限制
+            opcodes: WebSocket 帧类型，支持 text、binary、close、ping、pong 或数字 opcode，
+                默认 ["text", "binary"]；EventSource 消息视为 text
+            decode_json: 是否将文本消息解析为JSON（解析失败时保留原文）
+            max_frames_per_connection: 每个连接保留的消息数
+
+        Returns:
+            str: 启用结果
+        """
+        from ..config.settings import get_config_value
+        from .stream_frames import StreamFrameStore
+
+        try:
+            network_filter = NetworkFilter(url_patterns=[url_pattern] if url_pattern else None)
+        except ValueError as e:
+            return str(e)
+        opcode_set = set()
+        for opcode in opcodes or ["text", "binary"]:
+            value = self.STREAM_OPCODES.get(str(opcode).lower()) if not isinstance(opcode, int) else opcode
+            if value is None and str(opcode).isdigit():
+                value = int(opcode)
+            if value is None:
+                return f"未知的帧类型: {opcode}，可选: {', '.join(self.STREAM_OPCODES)}"
+            opcode_set.add(value)
+
+        max_frames = max_frames_per_connection or get_config_value('network.stream_max_frames', 500)
+        if self.stream_store is None or self.stream_store.max_frames != max_frames:
+            self.stream_store = StreamFrameStore(get_config_value('network.stream_max_connections', 100),
+                                                 max_frames)
+        self._stream_filter = {
+            "filter": network_filter,
+            "opcodes": frozenset(opcode_set),
+            "decode_json": decode_json,
+            "max_payload_chars": get_config_value('network.stream_max_payload_kb', 64) * 1024
+        }
+
+        try:
+            self.domains.acquire("Network", "network:stream")
+            handlers = (self._on_ws_created, self._on_ws_closed, self._on_ws_received, self._on_ws_sent,
+                        self._on_ws_error, self._on_eventsource_request, self._on_eventsource_message)
+            for event_name, handler in zip(self._STREAM_EVENTS, handlers):
+                self.subscribe(event_name, "stream", handler)
+            return (f"流式消息捕获已启用，过滤条件: {network_filter.describe() or '无'}，"
+                    f"帧类型: {sorted(opcode_set)}，每个连接保留 {max_frames} 条")
+        except Exception as e:
+            return f"启用流式消息捕获失败: {str(e)}"
+
+    def disable_stream_capture(self) -> str:
+        """停止 WebSocket / EventSource 消息捕获（已捕获的消息保留）
+
+        Returns:
+            str: 停止结果
+        """
+        self._stream_filter = None
+        for event_name in self._STREAM_EVENTS:
+            self.unsubscribe(event_name, "stream")
+        self.domains.release("Network", "network:stream")
+        return "流式消息捕获已停止"
+
+    def _stream_connection(self, event: Dict[str, Any], kind: str, url: str = ""):
+        """获取连接（捕获开始前建立的连接在收到第一条消息时登记）"""
+        store = self.stream_store
+        if store is None:
+            return None
+        request_id = event.get("requestId", "")
+        return store.get(request_id) or store.open(request_id, kind, url, event.get("timestamp", 0.0))
+
+    def _on_ws_created(self, **event) -> None:
+        self._stream_connection(event, "WebSocket", event.get("url", ""))
+
+    def _on_ws_closed(self, **event) -> None:
+        if self.stream_store is not None:
+            self.stream_store.close(event.get("requestId", ""), event.get("timestamp", 0.0))
+
+    def _on_ws_received(self, **event) -> None:
+        self._store_frame(event, "WebSocket", "received", event.get("response", {}))
+
+    def _on_ws_sent(self, **event) -> None:
+        self._store_frame(event, "WebSocket", "sent", event.get("response", {}))
+
+    def _on_ws_error(self, **event) -> None:
+        connection = self._stream_connection(event, "WebSocket")
+        if connection is not None:
+            connection.errors += 1
+
+    def _on_eventsource_request(self, **event) -> None:
+        if event.get("type") == "EventSource":
+            self._stream_connection(event, "EventSource", event.get("request", {}).get("url", ""))
+
+    def _on_eventsource_message(self, **event) -> None:
+        self._store_frame(event, "EventSource", "received",
+                          {"opcode": 1, "payloadData": event.get("data", "")},
+                          {"event_name": event.get("eventName", ""), "event_id": event.get("eventId", "")})
+
+    def _store_frame(self, event: Dict[str, Any], kind: str, direction: str,
+                     payload: Dict[str, Any], extra: Optional[Dict[str, Any]] = None) -> None:
+        stream_filter = self._stream_filter
+        connection = self._stream_connection(event, kind)
+        if stream_filter is None or connection is None:
+            return
+        if direction == "sent":
+            connection.sent += 1
+        else:
+            connection.received += 1
+
+        opcode = payload.get("opcode", 1)
+        # 未知URL的连接（捕获开始前建立）只在未设置URL条件时保留
+        if opcode not in stream_filter["opcodes"] or not stream_filter["filter"].match_url(connection.url):
+            connection.filtered_out += 1
+            return
+
+        data = payload.get("payloadData", "")
+        frame: Dict[str, Any] = {
+            "connection_id": connection.connection_id,
+            "direction": direction,
+            "opcode": opcode,
+            "timestamp": event.get("timestamp", 0.0),
+            "size": len(data)
+        }
+        if extra:
+            frame.update(extra)
+        if len(data) > stream_filter["max_payload_chars"]:
+            frame["data"] = data[:stream_filter["max_payload_chars"]]
+            frame["truncated"] = True
+        elif stream_filter["decode_json"] and opcode == 1:
+            try:
+                frame["json"] = json.loads(data)
+            except ValueError:
+                frame["data"] = data
+        else:
+            # binary 帧的 payloadData 为 base64 编码
+            frame["data"] = data
+        self.stream_store.append(connection, frame)
+
+    def get_stream_frames(self, cursor: int = 0, limit: int = 100,
+                          connection_id: Optional[str] = None,
+                          include_connections: bool = False) -> Dict[str, Any]:
+        """按游标增量获取 WebSocket / EventSource 消息
+
+        Args:
+            cursor: 上次调用返回的游标，首次调用传 0
+            limit: 返回消息的最大数量
+            connection_id: 只返回该连接的消息（连接ID即 requestId）
+            include_connections: 是否附带连接列表与统计
+
+        Returns:
+            dict: 消息列表（按到达顺序）和下次调用使用的游标
+        """
+        if self.stream_store is None:
+            return {"frames": [], "cursor": cursor, "enabled": False}
+        result = self.stream_store.since(cursor, limit, connection_id)
+        result["enabled"] = self._stream_filter is not None
+        if include_connections:
+            result["connections"] = self.stream_store.connections()
+        return result
+
+    # HAR录制使用的事件
+    _HAR_EVENTS = ("Network.requestWillBeSent", "Network.responseReceived",
+                   "Network.loadingFinished", "Network.loadingFailed")
+
+    def start_har_recording(self, path: Optional[str] = None, max_inflight: int = 10000) -> str:
+        """开始录制HAR
+
+        按 requestId 关联 requestWillBeSent / responseReceived / loadingFinished 事件，
+        请求完成后立即写入文件，内存中只保留未完成的请求。
+
+        Args:
+            path: HAR文件路径，默认保存到网络数据目录的 har 子目录
+            max_inflight: 未完成请求的最大数量，超出时最早的请求以未完成状态写出
+
+        Returns:
+            str: 开始结果
+        """
+        from datetime import datetime
+        from pathlib import Path
+        from ..config.settings import get_network_directory
+        from .har_writer import HarWriter
+
+        if self._har_writer is not None:
+            return f"HAR录制已在进行中: {self._har_writer.path}"
+
+        if not path:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            path = get_network_directory() / "har" / f"network_{timestamp}.har"
+        try:
+            self._har_writer = HarWriter(Path(path))
+            self._har_max_inflight = max_inflight
+            self.domains.acquire("Network", "network:har")
+            # 同步处理：有界队列满时会丢事件，导致请求无法关联（写入本身有缓冲，开销很小）
+            self.subscribe("Network.requestWillBeSent", "har", self._on_har_request)
+            self.subscribe("Network.responseReceived", "har", self._on_har_response)
+            self.subscribe("Network.loadingFinished", "har", self._on_har_finished)
+            self.subscribe("Network.loadingFailed", "har", self._on_har_failed)
+            return f"HAR录制已开始: {self._har_writer.path}"
+        except Exception as e:
+            self._har_writer = None
+            return f"开始HAR录制失败: {str(e)}"
+
+    def stop_har_recording(self) -> Dict[str, Any]:
+        """停止录制HAR，未完成的请求以未完成状态写出
+
+        Returns:
+            dict: HAR文件路径和条目数
+        """
+        from .har_writer import build_har_entry
+
+        writer = self._har_writer
+        if writer is None:
+            return {"error": "HAR录制未开始"}
+        for event_name in self._HAR_EVENTS:
+            self.unsubscribe(event_name, "har")
+        self.domains.release("Network", "network:har")
+
+        with self._har_lock:
+            pending = list(self._har_inflight.values())
+            self._har_inflight.clear()
+            self._har_writer = None
+        for item in pending:
+            writer.write_entry(build_har_entry(item["request"], item.get("response"),
+                                               error_text="incomplete"))
+        writer.close()
+        return {"path": str(writer.path), "entries": writer.count, "incomplete": len(pending)}
+
+    def _on_har_request(self, **event) -> None:
+        from .har_writer import build_har_entry
+
+        request_id = event.get("requestId")
+        writer = self._har_writer
+        if writer is None:
+            return
+        finished = []
+        with self._har_lock:
+            previous = self._har_inflight.pop(request_id, None)
+            if previous is not None and event.get("redirectResponse"):
+                # 重定向沿用同一个 requestId，上一跳在此完成
+                finished.append((previous, event, event["redirectResponse"]))
+            self._har_inflight[request_id] = {"request": event}
+            while len(self._har_inflight) > self._har_max_inflight:
+                oldest = self._har_inflight.pop(next(iter(self._har_inflight)))
+                finished.append((oldest, None, None))
+        for item, finish_event, redirect_response in finished:
+            writer.write_entry(build_har_entry(
+                item["request"], item.get("response"), finish_event, redirect_response,
+                error_text=None if redirect_response else "incomplete"
+            ))
+
+    def _on_har_response(self, **event) -> None:
+        with self._har_lock:
+            item = self._har_inflight.get(event.get("requestId"))
+            if item is not None:
+                item["response"] = event
+
+    def _on_har_finished(self, **event) -> None:
+        self._complete_har_entry(event)
+
+    def _on_har_failed(self, **event) -> None:
+        self._complete_har_entry(event, event.get("errorText") or "failed")
+
+    def _complete_har_entry(self, event: Dict[str, Any], error_text: Optional[str] = None) -> None:
+        from .har_writer import build_har_entry
+
+        writer = self._har_writer
+        with self._har_lock:
+            item = self._har_inflight.pop(event.get("requestId"), None)
+        if item is not None and writer is not None:
+            writer.write_entry(build_har_entry(item["request"], item.get("response"), event,
+                                               error_text=error_text))
+
     def enable_network_domain(self) -> str:
         """启用网络域
         
@@ -249,7 +967,8 @@ class NetworkListener:
             str: 启用结果
         """
         try:
-            self.tab.run_cdp("Network.enable")
+            self.domains.acquire("Network", "network:domain")
+            self._enable_stats()
             return "网络域启用成功"
         except Exception as e:
             return f"启用网络域失败: {str(e)}"
@@ -261,7 +980,10 @@ class NetworkListener:
             str: 禁用结果
         """
         try:
-            self.tab.run_cdp("Network.disable")
+            self.domains.release("Network", "network:domain")
+            owners = self.domains.owners("Network")
+            if owners:
+                return f"网络域仍被其他功能使用，保持启用: {sorted(owners)}"
             return "网络域禁用成功"
         except Exception as e:
             return f"禁用网络域失败: {str(e)}"
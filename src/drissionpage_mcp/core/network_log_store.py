@@ -0,0 +1,280 @@
+# -*- coding: utf-8 -*-
+"""网络日志存储模块
+
+将网络响应记录持久化到WAL模式的SQLite数据库，由独立写入线程批量插入，
+并提供带过滤、字段投影和分页的查询接口。
+"""
+
+import queue
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+
+class NetworkLogStore:
+    """网络日志存储
+
+    回调线程只把记录放入队列，写入线程按批次（batch_size 条或 flush_interval 秒）
+    合并成一个事务提交；查询使用独立的只读连接，WAL模式下读写互不阻塞。
+    """
+
+    # 可查询/投影的字段，顺序即默认返回顺序
+    COLUMNS = ("id", "tab_id", "request_id", "url", "host", "status", "mime_type",
+               "resource_type", "timestamp", "timing", "size", "recorded_at")
+
+    def __init__(self,
+                 db_path: Optional[Path] = None,
+                 batch_size: Optional[int] = None,
+                 flush_interval: Optional[float] = None,
+                 max_queue: int = 100000):
+        from ..config.settings import get_config_value, get_network_directory
+
+        self.db_path = Path(db_path) if db_path else get_network_directory() / "network_logs.db"
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size or get_config_value('network.log_batch_size', 200)
+        self.flush_interval = flush_interval or get_config_value('network.log_flush_interval', 0.5)
+
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self._read_lock = threading.Lock()
+        self._written = 0
+        self._dropped = 0
+        self._closed = False
+
+        self._write_conn = self._connect()
+        self._write_conn.executescript('''
+            CREATE TABLE IF NOT EXISTS requests (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                tab_id TEXT,
+                request_id TEXT,
+                url TEXT NOT NULL,
+                host TEXT,
+                status INTEGER,
+                mime_type TEXT,
+                resource_type TEXT,
+                timestamp REAL,
+                timing REAL,
+                size INTEGER,
+                recorded_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_requests_host ON requests (host);
+            CREATE INDEX IF NOT EXISTS idx_requests_mime_type ON requests (mime_type);
+            CREATE INDEX IF NOT EXISTS idx_requests_status ON requests (status);
+            CREATE INDEX IF NOT EXISTS idx_requests_timestamp ON requests (timestamp);
+        ''')
+        self._write_conn.commit()
+        self._read_conn = self._connect()
+
+        self._writer = threading.Thread(target=self._write_loop, name="network-log-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def add(self, record: Any, tab_id: Optional[str] = None) -> bool:
+        """追加一条响应记录（非阻塞，队列已满时丢弃）
+
+        Args:
+            record: ResponseRecord 对象
+            tab_id: 记录所属标签页ID
+
+        Returns:
+            bool: 是否成功入队
+        """
+        if self._closed:
+            return False
+        row = (tab_id, record.request_id, record.url, urlsplit(record.url).hostname or "",
+               record.status, record.mime_type, record.resource_type, record.timestamp,
+               record.timing, record.size, time.time())
+        try:
+            self._queue.put_nowait(row)
+            return True
+        except queue.Full:
+            self._dropped += 1
+            return False
+
+    def _write_loop(self) -> None:
+        """写入线程：合并批次后在单个事务中插入"""
+        while True:
+            item = self._queue.get()
+            batch: List[Tuple] = []
+            waiters: List[threading.Event] = []
+            stop = False
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                if item is None:
+                    stop = True
+                elif isinstance(item, threading.Event):
+                    waiters.append(item)
+                else:
+                    batch.append(item)
+                if stop or waiters or len(batch) >= self.batch_size:
+                    break
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+
+            if batch:
+                try:
+                    self._write_conn.executemany(
+                        'INSERT INTO requests (tab_id, request_id, url, host, status, mime_type, '
+                        'resource_type, timestamp, timing, size, recorded_at) '
+                        'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                        batch
+                    )
+                    self._write_conn.commit()
+                    self._written += len(batch)
+                except sqlite3.Error:
+                    self._dropped += len(batch)
+            for waiter in waiters:
+                waiter.set()
+            if stop:
+                self._write_conn.close()
+                return
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """等待队列中已有的记录全部写入
+
+        Args:
+            timeout: 最长等待时间（秒）
+
+        Returns:
+            bool: 是否在超时前完成
+        """
+        if self._closed:
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def _build_where(self, filters: Dict[str, Any]) -> Tuple[str, List[Any]]:
+        """根据过滤条件构造WHERE子句"""
+        clauses: List[str] = []
+        params: List[Any] = []
+
+        if filters.get("host"):
+            clauses.append("host = ?")
+            params.append(filters["host"].lower())
+        mime_type = filters.get("mime_type")
+        if mime_type:
+            if mime_type.endswith("/*") or mime_type.endswith("/"):
+                # 前缀匹配改写为范围查询，仍可使用索引
+                prefix = mime_type.rstrip("*")
+                clauses.append("mime_type >= ? AND mime_type < ?")
+                params += [prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)]
+            else:
+                clauses.append("mime_type = ?")
+                params.append(mime_type)
+        if filters.get("status") is not None:
+            clauses.append("status = ?")
+            params.append(filters["status"])
+        if filters.get("status_min") is not None:
+            clauses.append("status >= ?")
+            params.append(filters["status_min"])
+        if filters.get("status_max") is not None:
+            clauses.append("status <= ?")
+            params.append(filters["status_max"])
+        if filters.get("since") is not None:
+            clauses.append("timestamp >= ?")
+            params.append(filters["since"])
+        if filters.get("until") is not None:
+            clauses.append("timestamp <= ?")
+            params.append(filters["until"])
+        if filters.get("resource_type"):
+            clauses.append("resource_type = ?")
+            params.append(filters["resource_type"])
+        if filters.get("tab_id"):
+            clauses.append("tab_id = ?")
+            params.append(filters["tab_id"])
+        if filters.get("url_contains"):
+            clauses.append("instr(url, ?) > 0")
+            params.append(filters["url_contains"])
+
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def query(self,
+              filters: Optional[Dict[str, Any]] = None,
+              fields: Optional[List[str]] = None,
+              limit: int = 50,
+              offset: int = 0,
+              newest_first: bool = True) -> Dict[str, Any]:
+        """按条件查询网络日志
+
+        Args:
+            filters: 过滤条件，支持 host、mime_type（可用 "image/*" 前缀）、status、
+                status_min、status_max、since、until、resource_type、tab_id、url_contains
+            fields: 返回字段列表，默认返回全部字段
+            limit: 单页条数
+            offset: 偏移量
+            newest_first: 是否按时间倒序
+
+        Returns:
+            dict: 匹配总数、当前页记录和分页信息
+        """
+        fields = [f for f in (fields or self.COLUMNS) if f in self.COLUMNS] or list(self.COLUMNS)
+        where, params = self._build_where(filters or {})
+        order = "DESC" if newest_first else "ASC"
+        limit = max(0, min(int(limit), 1000))
+
+        self.flush()
+        with self._read_lock:
+            total = self._read_conn.execute(f'SELECT COUNT(*) FROM requests{where}', params).fetchone()[0]
+            rows = self._read_conn.execute(
+                f'SELECT {", ".join(fields)} FROM requests{where} ORDER BY id {order} LIMIT ? OFFSET ?',
+                params + [limit, max(0, int(offset))]
+            ).fetchall()
+
+        return {
+            "total": total,
+            "offset": offset,
+            "limit": limit,
+            "fields": fields,
+            "rows": [dict(zip(fields, row)) for row in rows]
+        }
+
+    def clear(self) -> str:
+        """清空所有网络日志
+
+        Returns:
+            str: 清空结果
+        """
+        self.flush()
+        with self._read_lock:
+            self._read_conn.execute('DELETE FROM requests')
+            self._read_conn.commit()
+        return "网络日志数据库已清空"
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取存储统计信息
+
+        Returns:
+            dict: 统计信息
+        """
+        with self._read_lock:
+            count = self._read_conn.execute('SELECT COUNT(*) FROM requests').fetchone()[0]
+        return {
+            "database": str(self.db_path),
+            "row_count": count,
+            "written": self._written,
+            "pending": self._queue.qsize(),
+            "dropped": self._dropped
+        }
+
+    def close(self) -> None:
+        """写完剩余记录后关闭数据库"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._writer.join(timeout=5)
+        with self._read_lock:
+            self._read_conn.close()
@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+"""网络录制回放模块
+
+录制模式下保存经过浏览器的响应（以 方法+URL+请求体哈希 为键），
+回放模式下通过 Fetch.fulfillRequest 直接从本地缓存返回匹配的响应，不访问网络。
+"""
+
+import base64
+import hashlib
+import json
+import re
+import threading
+import weakref
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+
+# 回放时不应原样返回的响应头（缓存中保存的是解码后的响应体）
+_DROP_HEADERS = frozenset(("content-encoding", "content-length", "transfer-encoding"))
+
+
+def request_key(method: str, url: str, body: Optional[str] = None) -> str:
+    """计算请求缓存键：sha256(方法 + URL + 请求体哈希)"""
+    body_hash = hashlib.sha256((body or "").encode("utf-8")).hexdigest()
+    return hashlib.sha256(f"{method.upper()}\n{url}\n{body_hash}".encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """本地响应缓存
+
+    每个响应保存为 <键>.json（状态码、响应头等元数据）和 <键>.body（响应体原始字节），
+    按键前两位分目录。
+    """
+
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def _paths(self, key: str):
+        folder = self.cache_dir / key[:2]
+        return folder / f"{key}.json", folder / f"{key}.body"
+
+    def put(self, key: str, meta: Dict[str, Any], body: bytes) -> None:
+        """保存一个响应（先写响应体，再写元数据，元数据存在即表示条目完整）"""
+        meta_path, body_path = self._paths(key)
+        meta_path.parent.mkdir(parents=True, exist_ok=True)
+        body_path.write_bytes(body)
+        tmp_path = meta_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+        tmp_path.replace(meta_path)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """读取一个响应，不存在时返回 None"""
+        meta_path, body_path = self._paths(key)
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            meta["body"] = body_path.read_bytes()
+            return meta
+        except (OSError, ValueError):
+            return None
+
+    def count(self) -> int:
+        """缓存条目数"""
+        return sum(1 for _ in self.cache_dir.glob("*/*.json"))
+
+
+class NetworkReplay:
+    """网络录制回放控制器
+
+    record 模式在响应阶段暂停请求，读取响应体写入缓存后放行；
+    replay 模式在请求阶段暂停请求，命中缓存则直接返回缓存响应，
+    未命中时按 offline 设置决定访问网络还是返回失败。
+    通过 NetworkReplay.for_tab(tab, network_listener) 获取时每个标签页一个实例。
+    """
+
+    MODES = ("off", "record", "replay")
+
+    _controllers: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+    _controllers_lock = threading.Lock()
+
+    def __init__(self, tab, network_listener):
+        """
+        初始化录制回放控制器
+
+        Args:
+            tab: 标签页对象
+            network_listener: NetworkListener，用于订阅 Fetch 事件
+        """
+        self.tab = tab
+        self.network_listener = network_listener
+        self.mode = "off"
+        self.offline = False
+        self.cache: Optional[ResponseCache] = None
+        self.max_body_bytes = 20 * 1024 * 1024
+        self._lock = threading.Lock()
+        self._stats = {"recorded": 0, "hits": 0, "misses": 0, "errors": 0, "skipped_too_large": 0}
+
+    @classmethod
+    def for_tab(cls, tab, network_listener) -> "NetworkReplay":
+        """获取标签页对应的录制回放控制器，不存在时创建"""
+        driver = tab.driver
+        with cls._controllers_lock:
+            controller = cls._controllers.get(driver)
+            if controller is None:
+                controller = cls._controllers[driver] = cls(tab, network_listener)
+                return controller
+        controller.tab = tab
+        controller.network_listener = network_listener
+        return controller
+
+    @property
+    def active(self) -> bool:
+        return self.mode != "off"
+
+    def set_mode(self, mode: str, cache_name: str = "default", offline: bool = False) -> str:
+        """切换录制回放模式
+
+        Args:
+            mode: off / record / replay
+            cache_name: 缓存名称（对应缓存目录名）
+            offline: 回放时未命中缓存的请求是否直接失败（不访问网络）
+
+        Returns:
+            str: 切换结果
+        """
+        from ..config.settings import get_network_directory
+
+        if mode not in self.MODES:
+            return f"不支持的模式: {mode}，可选: {', '.join(self.MODES)}"
+        if not re.fullmatch(r"[\w.-]+", cache_name or ""):
+            return f"缓存名称只能包含字母、数字、下划线、点和连字符: {cache_name}"
+
+        try:
+            if mode == "off":
+                self.network_listener.domains.release("Fetch", "replay")
+                self.network_listener.unsubscribe("Fetch.requestPaused", "replay")
+                self.mode = "off"
+                return f"网络录制回放已关闭，统计: {self.get_stats()}"
+
+            self.cache = ResponseCache(get_network_directory() / "replay" / cache_name)
+            self.offline = offline
+            with self._lock:
+                self._stats = {key: 0 for key in self._stats}
+            stage = "Response" if mode == "record" else "Request"
+            self.network_listener.subscribe("Fetch.requestPaused", "replay", self._on_request_paused)
+            self.network_listener.domains.acquire("Fetch", "replay",
+                                                  patterns=[{"urlPattern": "*", "requestStage": stage}])
+            self.mode = mode
+
+            if mode == "record":
+                return f"网络录制已开始，缓存目录: {self.cache.cache_dir}"
+            return (f"网络回放已开始，缓存目录: {self.cache.cache_dir}（{self.cache.count()} 条），"
+                    f"未命中时{'直接失败' if offline else '访问网络'}")
+        except Exception as e:
+            return f"切换网络录制回放模式失败: {str(e)}"
+
+    def _on_request_paused(self, **event) -> None:
+        request = event.get("request", {})
+        key = request_key(request.get("method", "GET"), request.get("url", ""), request.get("postData"))
+        request_id = event.get("requestId")
+        try:
+            # 响应阶段的暂停事件带有 responseStatusCode 或 responseErrorReason
+            if "responseStatusCode" in event or "responseErrorReason" in event:
+                self._record(request_id, key, request, event)
+            elif self.mode == "replay":
+                self._replay(request_id, key)
+            else:
+                self.tab.run_cdp("Fetch.continueRequest", requestId=request_id)
+        except Exception:
+            self._bump("errors")
+            try:
+                self.tab.run_cdp("Fetch.continueRequest", requestId=request_id)
+            except Exception:
+                pass
+
+    def _record(self, request_id: str, key: str, request: Dict[str, Any], event: Dict[str, Any]) -> None:
+        status = event.get("responseStatusCode")
+        if status is not None and self.cache is not None:
+            body = b""
+            # 重定向响应没有响应体
+            if not 300 <= status < 400:
+                result = self.tab.run_cdp("Fetch.getResponseBody", requestId=request_id)
+                data = result.get("body", "")
+                body = base64.b64decode(data) if result.get("base64Encoded") else data.encode("utf-8")
+            if len(body) <= self.max_body_bytes:
+                self.cache.put(key, {
+                    "method": request.get("method", "GET"),
+                    "url": request.get("url", ""),
+                    "status": status,
+                    "status_text": event.get("responseStatusText", ""),
+                    "headers": [h for h in event.get("responseHeaders", [])
+                                if h.get("name", "").lower() not in _DROP_HEADERS],
+                    "resource_type": event.get("resourceType", "")
+                }, body)
+                self._bump("recorded")
+            else:
+                self._bump("skipped_too_large")
+        self.tab.run_cdp("Fetch.continueRequest", requestId=request_id)
+
+    def _replay(self, request_id: str, key: str) -> None:
+        entry = self.cache.get(key) if self.cache is not None else None
+        if entry is not None:
+            self.tab.run_cdp(
+                "Fetch.fulfillRequest",
+                requestId=request_id,
+                responseCode=entry["status"],
+                responseHeaders=entry["headers"],
+                body=base64.b64encode(entry["body"]).decode("ascii"),
+                **({"responsePhrase": entry["status_text"]} if entry.get("status_text") else {})
+            )
+            self._bump("hits")
+            return
+
+        self._bump("misses")
+        if self.offline:
+            self.tab.run_cdp("Fetch.failRequest", requestId=request_id, errorReason="InternetDisconnected")
+        else:
+            self.tab.run_cdp("Fetch.continueRequest", requestId=request_id)
+
+    def _bump(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取录制回放统计
+
+        Returns:
+            dict: 模式、缓存目录以及录制/命中/未命中计数
+        """
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+        stats["mode"] = self.mode
+        stats["offline"] = self.offline
+        stats["cache_dir"] = str(self.cache.cache_dir) if self.cache is not None else None
+        return stats
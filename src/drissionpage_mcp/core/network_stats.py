@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+"""网络统计模块
+
+按主机和资源类型维护流式聚合统计（请求数、字节数、TTFB/总耗时分位数），
+每个 loadingFinished 事件以 O(1) 代价更新，不保存单条请求。
+"""
+
+import math
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+
+class LogHistogram:
+    """对数分桶直方图（HDR直方图思路）
+
+    桶边界按 (1 + precision) 等比增长，分位数的相对误差不超过 precision / 2，
+    记录一个值只需一次对数运算和一次字典更新。
+    """
+
+    __slots__ = ("precision", "_log_base", "_buckets", "count", "total", "min", "max")
+
+    def __init__(self, precision: float = 0.02):
+        self.precision = precision
+        self._log_base = math.log1p(precision)
+        self._buckets: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def record(self, value: float) -> None:
+        """记录一个非负值"""
+        value = max(float(value), 0.0)
+        # 小于 0.01 的值归入同一个桶
+        index = int(math.log(max(value, 0.01) / 0.01) / self._log_base)
+        self._buckets[index] = self._buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, p: float) -> Optional[float]:
+        """估算分位数
+
+        Args:
+            p: 分位（0-100）
+
+        Returns:
+            float: 估算值，无数据时返回 None
+        """
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(self.count * p / 100))
+        seen = 0
+        for index in sorted(self._buckets):
+            seen += self._buckets[index]
+            if seen >= rank:
+                # 取桶的几何中点，并限制在实际最小/最大值之间
+                value = 0.01 * math.exp((index + 0.5) * self._log_base)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.total / self.count if self.count else None
+
+
+class _Aggregate:
+    """单个分组（主机或资源类型）的聚合数据"""
+
+    __slots__ = ("count", "failed", "bytes", "ttfb", "duration")
+
+    def __init__(self):
+        self.count = 0
+        self.failed = 0
+        self.bytes = 0
+        self.ttfb = LogHistogram()
+        self.duration = LogHistogram()
+
+
+class NetworkStats:
+    """按主机和资源类型聚合的网络统计
+
+    在 responseReceived 时记录请求的主机、类型、起始时间和TTFB，
+    在 loadingFinished / loadingFailed 时合入聚合数据并丢弃该请求的临时状态。
+    """
+
+    GROUPS = ("host", "resource_type")
+
+    def __init__(self, max_inflight: int = 10000):
+        self.max_inflight = max_inflight
+        self._inflight: Dict[str, Tuple[str, str, float, Optional[float]]] = {}
+        self._groups: Dict[str, Dict[str, _Aggregate]] = {group: {} for group in self.GROUPS}
+        self._lock = threading.Lock()
+
+    def on_response(self, **event) -> None:
+        """处理 Network.responseReceived 事件"""
+        response = event.get("response", {})
+        timing = response.get("timing") or {}
+        host = urlsplit(response.get("url", "")).hostname or "(none)"
+        start = timing.get("requestTime", event.get("timestamp", 0.0))
+        ttfb = timing.get("receiveHeadersEnd")
+        with self._lock:
+            if len(self._inflight) >= self.max_inflight:
+                self._inflight.pop(next(iter(self._inflight)))
+            self._inflight[event.get("requestId")] = (host, event.get("type", "Other"), start, ttfb)
+
+    def on_finished(self, **event) -> None:
+        """处理 Network.loadingFinished 事件"""
+        with self._lock:
+            pending = self._inflight.pop(event.get("requestId"), None)
+            if pending is None:
+                return
+            host, resource_type, start, ttfb = pending
+            duration = max(0.0, (event.get("timestamp", start) - start) * 1000)
+            size = event.get("encodedDataLength", 0) or 0
+            for group, key in (("host", host), ("resource_type", resource_type)):
+                aggregate = self._groups[group].get(key)
+                if aggregate is None:
+                    aggregate = self._groups[group][key] = _Aggregate()
+                aggregate.count += 1
+                aggregate.bytes += size
+                aggregate.duration.record(duration)
+                if ttfb is not None and ttfb >= 0:
+                    aggregate.ttfb.record(ttfb)
+
+    def on_failed(self, **event) -> None:
+        """处理 Network.loadingFailed 事件"""
+        with self._lock:
+            pending = self._inflight.pop(event.get("requestId"), None)
+            if pending is None:
+                return
+            for group, key in (("host", pending[0]), ("resource_type", pending[1])):
+                aggregate = self._groups[group].get(key)
+                if aggregate is None:
+                    aggregate = self._groups[group][key] = _Aggregate()
+                aggregate.failed += 1
+
+    def get_table(self, group_by: str = "host", sort_by: str = "p95_ms", limit: int = 20) -> List[Dict[str, Any]]:
+        """获取聚合统计表
+
+        Args:
+            group_by: 分组方式，host 或 resource_type
+            sort_by: 排序字段（count、bytes_kb、ttfb_p50_ms、ttfb_p95_ms、p50_ms、p95_ms、max_ms），降序
+            limit: 返回行数
+
+        Returns:
+            list: 统计行
+        """
+        if group_by not in self._groups:
+            raise ValueError(f"不支持的分组方式: {group_by}，可选: {', '.join(self.GROUPS)}")
+
+        def ms(value: Optional[float]) -> Optional[float]:
+            return round(value, 1) if value is not None else None
+
+        with self._lock:
+            rows = [{
+                group_by: key,
+                "count": aggregate.count,
+                "failed": aggregate.failed,
+                "bytes_kb": round(aggregate.bytes / 1024, 1),
+                "ttfb_p50_ms": ms(aggregate.ttfb.percentile(50)),
+                "ttfb_p95_ms": ms(aggregate.ttfb.percentile(95)),
+                "p50_ms": ms(aggregate.duration.percentile(50)),
+                "p95_ms": ms(aggregate.duration.percentile(95)),
+                "max_ms": ms(aggregate.duration.max if aggregate.duration.count else None)
+            } for key, aggregate in self._groups[group_by].items()]
+
+        rows.sort(key=lambda row: row.get(sort_by) or 0, reverse=True)
+        return rows[:max(0, limit)]
+
+    def get_bytes_by(self, group_by: str = "resource_type") -> Dict[str, int]:
+        """获取各分组累计字节数"""
+        with self._lock:
+            return {key: aggregate.bytes for key, aggregate in self._groups[group_by].items()}
+
+    def get_average_bytes(self, key: str, group_by: str = "resource_type") -> Optional[float]:
+        """获取某个分组的平均响应大小（字节），无数据时返回 None"""
+        with self._lock:
+            aggregate = self._groups[group_by].get(key)
+            if aggregate is None or not aggregate.count:
+                return None
+            return aggregate.bytes / aggregate.count
+
+    def summary(self) -> Dict[str, Any]:
+        """获取总体摘要"""
+        with self._lock:
+            types = self._groups["resource_type"].values()
+            return {
+                "requests": sum(a.count for a in types),
+                "failed": sum(a.failed for a in types),
+                "bytes_kb": round(sum(a.bytes for a in types) / 1024, 1),
+                "hosts": len(self._groups["host"]),
+                "inflight": len(self._inflight)
+            }
+
+    def clear(self) -> None:
+        """清空统计"""
+        with self._lock:
+            self._inflight.clear()
+            for group in self._groups.values():
+                group.clear()
@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+"""页面性能指标模块
+
+在文档开始时安装 PerformanceObserver，记录 LCP、CLS、INP、FCP 和长任务，
+采集时与导航计时、资源计时以及 Performance.getMetrics（JS堆、节点数、布局次数）
+合并成一条精简的单次导航指标记录。
+"""
+
+import json
+import threading
+import time
+import weakref
+from typing import Dict, Any, Optional
+from urllib.parse import urlsplit
+
+from .domain_manager import CDPDomainManager
+from .throttling import ThrottlingManager
+
+
+class PageMetricsCollector:
+    """页面性能指标采集器
+
+    install() 通过 Page.addScriptToEvaluateOnNewDocument 让之后每次导航都在文档开始时
+    安装观察器，并立即在当前文档中补装（观察器使用 buffered 模式，已发生的条目同样能取到）。
+    通过 PageMetricsCollector.for_tab(tab) 获取，每个标签页一个实例，
+    重新初始化服务后仍记得已注册的脚本，不会重复注册，也能移除。
+    """
+
+    _KEY = "page_metrics"
+    _collectors: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+    _collectors_lock = threading.Lock()
+
+    # 在页面中运行的观察器脚本，重复执行时不会重复安装
+    VITALS_INIT_SCRIPT = """
+    (() => {
+        if (window.__mcpVitals) return;
+        const state = {lcp: null, lcpTarget: null, fcp: null, cls: 0, clsWindow: 0, clsStart: 0, clsLast: 0,
+                       interactions: new Map(), longTasks: 0, tbt: 0, longestTask: 0};
+        const observe = (type, onEntry, options) => {
+            try {
+                new PerformanceObserver(list => list.getEntries().forEach(onEntry))
+                    .observe(Object.assign({type: type, buffered: true}, options || {}));
+            } catch (e) {}
+        };
+        try { performance.setResourceTimingBufferSize(5000); } catch (e) {}
+        observe('paint', e => { if (e.name === 'first-contentful-paint') state.fcp = e.startTime; });
+        observe('largest-contentful-paint', e => {
+            state.lcp = e.renderTime || e.loadTime || e.startTime;
+            state.lcpTarget = e.url || (e.element ? e.element.tagName.toLowerCase() : null);
+        });
+        observe('layout-shift', e => {
+            if (e.hadRecentInput) return;
+            // 会话窗口：间隔小于1秒且总长不超过5秒的偏移累加，CLS 取最大窗口
+            if (state.clsWindow && e.startTime - state.clsLast < 1000 && e.startTime - state.clsStart < 5000) {
+                state.clsWindow += e.value;
+            } else {
+                state.clsWindow = e.value;
+                state.clsStart = e.startTime;
+            }
+            state.clsLast = e.startTime;
+            state.cls = Math.max(state.cls, state.clsWindow);
+        });
+        observe('event', e => {
+            if (!e.interactionId) return;
+            state.interactions.set(e.interactionId, Math.max(state.interactions.get(e.interactionId) || 0, e.duration));
+        }, {durationThreshold: 16});
+        observe('first-input', e => {
+            if (e.interactionId) {
+                state.interactions.set(e.interactionId, Math.max(state.interactions.get(e.interactionId) || 0, e.duration));
+            }
+        });
+        observe('longtask', e => {
+            state.longTasks += 1;
+            state.tbt += Math.max(0, e.duration - 50);
+            state.longestTask = Math.max(state.longestTask, e.duration);
+        });
+        window.__mcpVitals = state;
+    })();
+    """
+
+    SNAPSHOT_SCRIPT = """
+    function(maxSlowest) {
+        const state = window.__mcpVitals;
+        const round = v => v == null ? null : Math.round(v * 10) / 10;
+        const nav = performance.getEntriesByType('navigation')[0];
+        let inp = null;
+        if (state && state.interactions.size) {
+            // 交互次数较多时取第98百分位，忽略偶发的极端值
+            const durations = Array.from(state.interactions.values()).sort((a, b) => b - a);
+            inp = durations[Math.min(Math.floor(durations.length / 50), durations.length - 1)];
+        }
+        const byType = {};
+        const resources = performance.getEntriesByType('resource');
+        let transfer = 0;
+        for (const r of resources) {
+            const t = byType[r.initiatorType] || (byType[r.initiatorType] = {count: 0, kb: 0});
+            t.count += 1;
+            t.kb += (r.transferSize || 0) / 1024;
+            transfer += r.transferSize || 0;
+        }
+        for (const t of Object.values(byType)) t.kb = round(t.kb);
+        const slowest = resources.slice().sort((a, b) => b.duration - a.duration).slice(0, maxSlowest)
+            .map(r => ({url: r.name.slice(0, 200), type: r.initiatorType, ms: round(r.duration)}));
+        return JSON.stringify({
+            installed: !!state,
+            url: location.href,
+            lcp_ms: state ? round(state.lcp) : null,
+            lcp_target: state ? state.lcpTarget : null,
+            fcp_ms: state ? round(state.fcp) : null,
+            cls: state ? Math.round(state.cls * 10000) / 10000 : null,
+            inp_ms: round(inp),
+            interactions: state ? state.interactions.size : 0,
+            long_tasks: state ? state.longTasks : null,
+            tbt_ms: state ? round(state.tbt) : null,
+            longest_task_ms: state ? round(state.longestTask) : null,
+            navigation: nav ? {
+                type: nav.type,
+                ttfb_ms: round(nav.responseStart),
+                dom_content_loaded_ms: round(nav.domContentLoadedEventEnd),
+                load_ms: round(nav.loadEventEnd),
+                transfer_kb: round((nav.transferSize || 0) / 1024),
+                redirects: nav.redirectCount
+            } : null,
+            resources: {count: resources.length, transfer_kb: round(transfer / 1024), by_type: byType, slowest: slowest}
+        });
+    }
+    """
+
+    # 从 Performance.getMetrics 中保留的指标及其输出名称
+    CDP_METRICS = {
+        "JSHeapUsedSize": "js_heap_used_mb",
+        "JSHeapTotalSize": "js_heap_total_mb",
+        "Nodes": "nodes",
+        "LayoutCount": "layout_count",
+        "RecalcStyleCount": "recalc_style_count",
+        "LayoutDuration": "layout_duration_ms",
+        "ScriptDuration": "script_duration_ms",
+        "TaskDuration": "task_duration_ms",
+    }
+
+    def __init__(self, tab):
+        self.tab = tab
+        self.domains = CDPDomainManager.for_tab(tab)
+        self.script_id: Optional[str] = None
+
+    @classmethod
+    def for_tab(cls, tab) -> "PageMetricsCollector":
+        """获取标签页对应的指标采集器，不存在时创建"""
+        driver = tab.driver
+        with cls._collectors_lock:
+            collector = cls._collectors.get(driver)
+            if collector is None:
+                collector = cls._collectors[driver] = cls(tab)
+                return collector
+        collector.tab = tab
+        return collector
+
+    @property
+    def installed(self) -> bool:
+        return self.script_id is not None
+
+    def install(self) -> str:
+        """在当前文档和之后的每次导航中安装观察器
+
+        Returns:
+            str: 安装结果
+        """
+        if self.script_id is not None:
+            return "页面性能观察器已安装"
+        try:
+            result = self.tab.run_cdp("Page.addScriptToEvaluateOnNewDocument", source=self.VITALS_INIT_SCRIPT)
+            self.script_id = result.get("identifier")
+            self.tab.run_js(self.VITALS_INIT_SCRIPT)
+            return "页面性能观察器已安装，之后的导航会在文档开始时记录 LCP、CLS、INP 和长任务"
+        except Exception as e:
+            return f"安装页面性能观察器失败: {str(e)}"
+
+    def uninstall(self) -> str:
+        """停止在新文档中安装观察器（当前文档中已安装的观察器保留到下次导航）"""
+        if self.script_id is None:
+            return "页面性能观察器未安装"
+        try:
+            self.tab.run_cdp("Page.removeScriptToEvaluateOnNewDocument", identifier=self.script_id)
+        except Exception:
+            pass
+        self.script_id = None
+        self.domains.release("Performance", self._KEY)
+        return "页面性能观察器已移除"
+
+    def _cdp_metrics(self) -> Dict[str, Any]:
+        """读取 Performance.getMetrics 中的关键指标"""
+        self.domains.acquire("Performance", self._KEY)
+        result = self.tab.run_cdp("Performance.getMetrics")
+        metrics: Dict[str, Any] = {}
+        for item in result.get("metrics", []):
+            name = self.CDP_METRICS.get(item.get("name"))
+            if name is None:
+                continue
+            value = item.get("value", 0)
+            if name.endswith("_mb"):
+                value = round(value / 1024 / 1024, 2)
+            elif name.endswith("_ms"):
+                # getMetrics 的耗时单位为秒
+                value = round(value * 1000, 1)
+            else:
+                value = int(value)
+            metrics[name] = value
+        return metrics
+
+    def collect(self, max_slowest: int = 5) -> Dict[str, Any]:
+        """采集当前页面的指标记录
+
+        Args:
+            max_slowest: 记录耗时最长的资源数量
+
+        Returns:
+            dict: 单次导航的指标记录
+
+        Raises:
+            Exception: 页面脚本执行失败时抛出
+        """
+        record = json.loads(self.tab.run_js(self.SNAPSHOT_SCRIPT, max_slowest))
+        try:
+            record["cdp"] = self._cdp_metrics()
+        except Exception as e:
+            record["cdp"] = {"error": str(e)}
+        # 记录采集时生效的限速方案，不同条件下的指标不能直接比较
+        record["throttling"] = ThrottlingManager.for_tab(self.tab).active_name
+        record["host"] = urlsplit(record.get("url", "")).hostname or ""
+        record["title"] = self.tab.title
+        record["collected_at"] = time.time()
+        return record
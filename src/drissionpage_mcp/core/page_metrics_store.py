@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+"""页面性能指标存储模块
+
+将每次采集的页面指标记录追加到SQLite时间序列表中，
+支持按URL、主机和运行标签查询，并将最新一次与历史基线对比找出退化的指标。
+"""
+
+import json
+import sqlite3
+import statistics
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+
+class PageMetricsStore:
+    """页面性能指标时间序列存储
+
+    采集频率很低（每次导航一条），直接在调用线程中同步写入。
+    """
+
+    # 单独成列、可用于对比的指标：列名 -> 从记录中取值的路径；所有指标都是越小越好
+    METRIC_COLUMNS = {
+        "lcp_ms": ("lcp_ms",),
+        "fcp_ms": ("fcp_ms",),
+        "cls": ("cls",),
+        "inp_ms": ("inp_ms",),
+        "tbt_ms": ("tbt_ms",),
+        "long_tasks": ("long_tasks",),
+        "ttfb_ms": ("navigation", "ttfb_ms"),
+        "dom_content_loaded_ms": ("navigation", "dom_content_loaded_ms"),
+        "load_ms": ("navigation", "load_ms"),
+        "resources": ("resources", "count"),
+        "transfer_kb": ("resources", "transfer_kb"),
+        "js_heap_used_mb": ("cdp", "js_heap_used_mb"),
+        "nodes": ("cdp", "nodes"),
+        "layout_count": ("cdp", "layout_count"),
+    }
+
+    # 查询条件中表示“未限速”的限速方案值
+    NO_THROTTLING = "none"
+
+    def __init__(self, db_path: Optional[Path] = None):
+        from ..config.settings import get_metrics_directory
+
+        self.db_path = Path(db_path) if db_path else get_metrics_directory() / "page_metrics.db"
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        metric_columns = ",\n".join(f"                {name} REAL" for name in self.METRIC_COLUMNS)
+        self._conn.executescript(f'''
+            CREATE TABLE IF NOT EXISTS page_metrics (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                recorded_at REAL NOT NULL,
+                url TEXT NOT NULL,
+                host TEXT,
+                title TEXT,
+                label TEXT,
+                throttling TEXT,
+{metric_columns},
+                record TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_page_metrics_url ON page_metrics (url, recorded_at);
+            CREATE INDEX IF NOT EXISTS idx_page_metrics_host ON page_metrics (host, recorded_at);
+        ''')
+        # 早期版本创建的表没有限速方案列
+        columns = {row[1] for row in self._conn.execute('PRAGMA table_info(page_metrics)')}
+        if "throttling" not in columns:
+            self._conn.execute('ALTER TABLE page_metrics ADD COLUMN throttling TEXT')
+        self._conn.commit()
+
+    @classmethod
+    def _metric(cls, record: Dict[str, Any], path: Tuple[str, ...]) -> Optional[float]:
+        value: Any = record
+        for key in path:
+            if not isinstance(value, dict):
+                return None
+            value = value.get(key)
+        return value if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+
+    def add(self, record: Dict[str, Any], label: Optional[str] = None) -> int:
+        """追加一条指标记录
+
+        Args:
+            record: PageMetricsCollector.collect() 返回的记录
+            label: 运行标签（如版本号、分支名），用于区分不同批次
+
+        Returns:
+            int: 记录ID
+        """
+        columns = ["recorded_at", "url", "host", "title", "label", "throttling", *self.METRIC_COLUMNS, "record"]
+        values = [record.get("collected_at") or time.time(), record.get("url", ""), record.get("host", ""),
+                  record.get("title"), label, record.get("throttling"),
+                  *(self._metric(record, path) for path in self.METRIC_COLUMNS.values()),
+                  json.dumps(record, ensure_ascii=False)]
+        with self._lock:
+            cursor = self._conn.execute(
+                f'INSERT INTO page_metrics ({", ".join(columns)}) VALUES ({", ".join("?" * len(columns))})',
+                values
+            )
+            self._conn.commit()
+            return cursor.lastrowid
+
+    def _build_where(self, url: Optional[str], host: Optional[str], label: Optional[str],
+                     url_contains: Optional[str] = None, since: Optional[float] = None,
+                     throttling: Optional[str] = None) -> Tuple[str, List[Any]]:
+        clauses: List[str] = []
+        params: List[Any] = []
+        if throttling == self.NO_THROTTLING:
+            clauses.append("throttling IS NULL")
+        elif throttling:
+            clauses.append("throttling = ?")
+            params.append(throttling)
+        if url:
+            clauses.append("url = ?")
+            params.append(url)
+        if url_contains:
+            clauses.append("instr(url, ?) > 0")
+            params.append(url_contains)
+        if host:
+            clauses.append("host = ?")
+            params.append(host.lower())
+        if label:
+            clauses.append("label = ?")
+            params.append(label)
+        if since is not None:
+            clauses.append("recorded_at >= ?")
+            params.append(since)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def query(self,
+              url: Optional[str] = None,
+              url_contains: Optional[str] = None,
+              host: Optional[str] = None,
+              label: Optional[str] = None,
+              since: Optional[float] = None,
+              limit: int = 50,
+              include_details: bool = False,
+              throttling: Optional[str] = None) -> List[Dict[str, Any]]:
+        """按时间倒序查询指标记录
+
+        Args:
+            url: 完整URL
+            url_contains: URL包含的子串
+            host: 主机名
+            label: 运行标签
+            since: 起始时间（Unix时间戳）
+            limit: 返回数量上限
+            include_details: 是否附带完整记录（资源分类、最慢资源等）
+            throttling: 限速方案名称，"none" 表示只查询未限速的记录
+
+        Returns:
+            list: 记录列表
+        """
+        where, params = self._build_where(url, host, label, url_contains, since, throttling)
+        columns = ["id", "recorded_at", "url", "host", "title", "label", "throttling", *self.METRIC_COLUMNS]
+        if include_details:
+            columns.append("record")
+        with self._lock:
+            rows = self._conn.execute(
+                f'SELECT {", ".join(columns)} FROM page_metrics{where} ORDER BY recorded_at DESC, id DESC LIMIT ?',
+                params + [max(0, int(limit))]
+            ).fetchall()
+        results = []
+        for row in rows:
+            item = dict(zip(columns, row))
+            if include_details:
+                item["record"] = json.loads(item["record"]) if item["record"] else None
+            results.append(item)
+        return results
+
+    def compare(self,
+                url: Optional[str] = None,
+                host: Optional[str] = None,
+                label: Optional[str] = None,
+                baseline_runs: int = 10,
+                regression_pct: float = 20,
+                throttling: Optional[str] = None) -> Dict[str, Any]:
+        """将最新一条记录与同一URL、同一限速方案之前若干次的中位数对比
+
+        Args:
+            url: 完整URL，为空时取满足其他条件的最新记录的URL
+            host: 主机名
+            label: 只在该运行标签内对比
+            baseline_runs: 基线使用的历史记录数
+            regression_pct: 比基线差超过该百分比的指标视为退化
+            throttling: 只对比该限速方案下的记录，"none" 表示未限速，为空时取最新记录的方案
+
+        Returns:
+            dict: 最新记录、基线记录数、每个指标的基线中位数与变化百分比，以及退化的指标列表
+        """
+        latest = self.query(url=url, host=host, label=label, limit=1, throttling=throttling)
+        if not latest:
+            return {"error": "没有匹配的指标记录"}
+        latest = latest[0]
+        # 不同限速条件下的指标不可比，基线只取与最新记录相同条件的记录
+        history = [row for row in self.query(url=latest["url"], label=label, limit=baseline_runs + 1,
+                                             throttling=latest["throttling"] or self.NO_THROTTLING)
+                   if row["id"] != latest["id"]][:baseline_runs]
+
+        metrics: Dict[str, Dict[str, Any]] = {}
+        regressions: List[str] = []
+        for name in self.METRIC_COLUMNS:
+            current = latest[name]
+            values = [row[name] for row in history if row[name] is not None]
+            if current is None or not values:
+                continue
+            baseline = statistics.median(values)
+            change_pct = round((current - baseline) / baseline * 100, 1) if baseline else None
+            metrics[name] = {"current": current, "baseline": baseline, "change_pct": change_pct}
+            if change_pct is not None and change_pct > regression_pct:
+                regressions.append(name)
+        return {
+            "latest": latest,
+            "baseline_runs": len(history),
+            "metrics": metrics,
+            "regressions": regressions
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+"""请求拦截模块
+
+按预设方案（只保留文本、不加载媒体、屏蔽第三方等）或自定义URL模式拦截请求，
+减少抓取时不需要的图片、字体、媒体和统计脚本流量，并统计拦截数量和节省的流量。
+"""
+
+import threading
+import weakref
+from typing import Dict, Any, List, Optional
+from urllib.parse import urlsplit
+
+
+# 按资源类型拦截的方案（Fetch域 resourceType）
+TYPE_PROFILES: Dict[str, List[str]] = {
+    "text-only": ["Image", "Media", "Font", "Stylesheet"],
+    "no-media": ["Image", "Media", "Font"],
+    "no-images": ["Image"]
+}
+
+# 常见统计与广告脚本的URL模式（由浏览器端 Network.setBlockedURLs 直接拦截，无需往返）
+TRACKER_PATTERNS: List[str] = [
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*googlesyndication.com*", "*adservice.google.*", "*connect.facebook.net*",
+    "*hotjar.com*", "*segment.io*", "*cdn.segment.com*", "*mixpanel.com*",
+    "*hm.baidu.com*", "*cnzz.com*", "*scorecardresearch.com*", "*criteo.*",
+    "*taboola.com*", "*outbrain.com*", "*amazon-adsystem.com*", "*clarity.ms*"
+]
+
+PROFILES = sorted(list(TYPE_PROFILES) + ["no-third-party", "no-trackers"])
+
+# 尚未观测到该类型响应时使用的平均大小估计（字节）
+DEFAULT_TYPE_BYTES: Dict[str, int] = {
+    "Image": 30 * 1024,
+    "Media": 500 * 1024,
+    "Font": 40 * 1024,
+    "Stylesheet": 15 * 1024,
+    "Script": 25 * 1024,
+    "XHR": 5 * 1024,
+    "Fetch": 5 * 1024
+}
+
+
+def site_of(host: str) -> str:
+    """估算主机名的可注册域名（example.com、example.co.uk、example.com.cn）"""
+    labels = (host or "").lower().strip(".").split(".")
+    if len(labels) <= 2:
+        return ".".join(labels)
+    if len(labels[-1]) == 2 and len(labels[-2]) <= 3:
+        return ".".join(labels[-3:])
+    return ".".join(labels[-2:])
+
+
+class RequestBlocker:
+    """请求拦截器
+
+    按资源类型和第三方判断的方案使用 Fetch 域暂停匹配的请求并决定放行或拦截；
+    自定义URL模式和统计脚本方案使用 Network.setBlockedURLs 在浏览器端直接拦截。
+    通过 RequestBlocker.for_tab(tab, network_listener) 获取时每个标签页一个实例，
+    重新初始化服务后仍能关闭之前启用的拦截。
+    """
+
+    _blockers: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+    _blockers_lock = threading.Lock()
+
+    def __init__(self, tab, network_listener):
+        """
+        初始化请求拦截器
+
+        Args:
+            tab: 标签页对象
+            network_listener: NetworkListener，用于订阅事件和估算节省的流量
+        """
+        self.tab = tab
+        self.network_listener = network_listener
+        self.profiles: List[str] = []
+        self.url_patterns: List[str] = []
+        self._blocked_types = frozenset()
+        self._block_third_party = False
+        self._first_party: Optional[str] = None
+        self._fetch_enabled = False
+        self._lock = threading.Lock()
+        self._stats = {"blocked": 0, "bytes_saved": 0.0, "by_type": {}, "by_rule": {}}
+
+    @classmethod
+    def for_tab(cls, tab, network_listener) -> "RequestBlocker":
+        """获取标签页对应的请求拦截器，不存在时创建"""
+        driver = tab.driver
+        with cls._blockers_lock:
+            blocker = cls._blockers.get(driver)
+            if blocker is None:
+                blocker = cls._blockers[driver] = cls(tab, network_listener)
+                return blocker
+        blocker.tab = tab
+        blocker.network_listener = network_listener
+        return blocker
+
+    @property
+    def active(self) -> bool:
+        return bool(self.profiles or self.url_patterns)
+
+    @property
+    def uses_fetch(self) -> bool:
+        """当前设置是否占用 Fetch 域（与网络录制回放互斥）"""
+        return self._fetch_enabled
+
+    def apply(self, profiles: Optional[List[str]] = None, url_patterns: Optional[List[str]] = None) -> str:
+        """设置拦截方案，替换之前的设置；两者都为空时关闭拦截
+
+        Args:
+            profiles: 方案列表，可选 text-only、no-media、no-images、no-third-party、no-trackers
+            url_patterns: 自定义URL通配模式列表（如 "*.mp4"、"*ads.example.com*"）
+
+        Returns:
+            str: 设置结果
+        """
+        profiles = list(profiles or [])
+        url_patterns = list(url_patterns or [])
+        unknown = [p for p in profiles if p not in PROFILES]
+        if unknown:
+            return f"未知的拦截方案: {unknown}，可选: {PROFILES}"
+
+        blocked_types = set()
+        for profile in profiles:
+            blocked_types.update(TYPE_PROFILES.get(profile, []))
+        blocked_urls = url_patterns + (TRACKER_PATTERNS if "no-trackers" in profiles else [])
+
+        domains = self.network_listener.domains
+        try:
+            if blocked_urls:
+                domains.acquire("Network", "blocker")
+            self.tab.run_cdp("Network.setBlockedURLs", urls=blocked_urls)
+            if not blocked_urls and "blocker" in domains.owners("Network"):
+                # 只释放自己登记过的引用，避免禁用由其他途径（如原始CDP命令）启用的 Network 域
+                domains.release("Network", "blocker")
+
+            self._blocked_types = frozenset(blocked_types)
+            self._block_third_party = "no-third-party" in profiles
+            if self._block_third_party:
+                self._first_party = site_of(urlsplit(self.tab.url or "").hostname or "") or None
+                patterns = [{"urlPattern": "*", "requestStage": "Request"}]
+            else:
+                patterns = [{"resourceType": t, "requestStage": "Request"} for t in sorted(blocked_types)]
+
+            if patterns:
+                self.network_listener.subscribe("Fetch.requestPaused", "blocker", self._on_request_paused)
+                domains.acquire("Fetch", "blocker", patterns=patterns)
+                self._fetch_enabled = True
+            elif self._fetch_enabled:
+                domains.release("Fetch", "blocker")
+                self.network_listener.unsubscribe("Fetch.requestPaused", "blocker")
+                self._fetch_enabled = False
+
+            if blocked_urls:
+                self.network_listener.subscribe("Network.loadingFailed", "blocker", self._on_loading_failed)
+            else:
+                self.network_listener.unsubscribe("Network.loadingFailed", "blocker")
+
+            self.profiles = profiles
+            self.url_patterns = url_patterns
+            if not self.active:
+                return "请求拦截已关闭"
+            return f"请求拦截已启用，方案: {profiles or '无'}，自定义URL模式: {len(url_patterns)} 个"
+        except Exception as e:
+            return f"设置请求拦截失败: {str(e)}"
+
+    def disable(self) -> str:
+        """关闭请求拦截
+
+        Returns:
+            str: 关闭结果
+        """
+        return self.apply()
+
+    def _is_third_party(self, url: str, resource_type: str, frame_id: str) -> bool:
+        host = urlsplit(url).hostname or ""
+        if resource_type == "Document" and frame_id == getattr(self.tab, "tab_id", None):
+            # 主框架导航：更新第一方站点，自身总是放行
+            self._first_party = site_of(host) or self._first_party
+            return False
+        if not self._first_party or not host:
+            return False
+        return site_of(host) != self._first_party
+
+    def _on_request_paused(self, **event) -> None:
+        request_id = event.get("requestId")
+        resource_type = event.get("resourceType", "Other")
+        url = event.get("request", {}).get("url", "")
+
+        rule = None
+        if resource_type in self._blocked_types:
+            rule = f"type:{resource_type}"
+        elif self._block_third_party and self._is_third_party(url, resource_type, event.get("frameId")):
+            rule = "no-third-party"
+
+        try:
+            if rule:
+                self.tab.run_cdp("Fetch.failRequest", requestId=request_id, errorReason="BlockedByClient")
+                self._count(resource_type, rule)
+            else:
+                self.tab.run_cdp("Fetch.continueRequest", requestId=request_id)
+        except Exception:
+            pass
+
+    def _on_loading_failed(self, **event) -> None:
+        # setBlockedURLs 拦截的请求 blockedReason 为 inspector
+        if event.get("blockedReason") == "inspector":
+            self._count(event.get("type", "Other"), "url-pattern")
+
+    def _count(self, resource_type: str, rule: str) -> None:
+        average = self.network_listener.stats.get_average_bytes(resource_type)
+        if average is None:
+            average = DEFAULT_TYPE_BYTES.get(resource_type, 2 * 1024)
+        with self._lock:
+            self._stats["blocked"] += 1
+            self._stats["bytes_saved"] += average
+            self._stats["by_type"][resource_type] = self._stats["by_type"].get(resource_type, 0) + 1
+            self._stats["by_rule"][rule] = self._stats["by_rule"].get(rule, 0) + 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取拦截统计
+
+        节省流量按该资源类型已完成请求的平均大小估算，尚无数据时使用经验值。
+
+        Returns:
+            dict: 统计信息
+        """
+        with self._lock:
+            return {
+                "profiles": self.profiles,
+                "url_patterns": self.url_patterns,
+                "first_party": self._first_party if self._block_third_party else None,
+                "blocked_requests": self._stats["blocked"],
+                "estimated_kb_saved": round(self._stats["bytes_saved"] / 1024, 1),
+                "by_type": dict(self._stats["by_type"]),
+                "by_rule": dict(self._stats["by_rule"])
+            }
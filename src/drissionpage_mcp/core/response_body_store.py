@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+"""响应体存储模块
+
+保存通过 Network.getResponseBody 捕获的响应体：小响应体压缩后保存在内存，
+超过阈值的响应体按内容哈希写入磁盘（相同内容只保存一份）。
+"""
+
+import hashlib
+import threading
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+
+# 按文本返回的mimeType关键字
+TEXT_MIME_KEYWORDS = ("text/", "json", "javascript", "xml", "x-www-form-urlencoded", "graphql")
+
+
+class ResponseBodyStore:
+    """响应体存储
+
+    以 requestId 为键，条目数超过 max_entries 时淘汰最早的条目；
+    磁盘文件按 sha256 命名并做引用计数，无引用时删除。
+    """
+
+    def __init__(self,
+                 spill_dir: Optional[Path] = None,
+                 inline_max_bytes: Optional[int] = None,
+                 max_entries: Optional[int] = None):
+        from ..config.settings import get_config_value, get_network_directory
+
+        self.spill_dir = Path(spill_dir) if spill_dir else get_network_directory() / "bodies"
+        self.inline_max_bytes = (inline_max_bytes if inline_max_bytes is not None
+                                 else get_config_value('network.body_inline_max_kb', 64) * 1024)
+        self.max_entries = max_entries or get_config_value('network.body_max_entries', 500)
+
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._file_refs: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._memory_bytes = 0
+        self._evicted = 0
+
+    def put(self, request_id: str, body: bytes, url: str = "", mime_type: str = "") -> Dict[str, Any]:
+        """保存一个响应体
+
+        Args:
+            request_id: CDP请求ID
+            body: 响应体原始字节
+            url: 请求URL
+            mime_type: 响应mimeType
+
+        Returns:
+            dict: 条目元数据
+        """
+        entry: Dict[str, Any] = {
+            "request_id": request_id,
+            "url": url,
+            "mime_type": mime_type,
+            "size": len(body)
+        }
+        if len(body) > self.inline_max_bytes:
+            digest = hashlib.sha256(body).hexdigest()
+            path = self.spill_dir / digest[:2] / digest
+            if not path.exists():
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = path.with_suffix(".tmp")
+                tmp_path.write_bytes(body)
+                tmp_path.replace(path)
+            entry["sha256"] = digest
+            entry["path"] = str(path)
+        else:
+            entry["data"] = zlib.compress(body, 6)
+
+        with self._lock:
+            self._discard(request_id)
+            self._entries[request_id] = entry
+            if "sha256" in entry:
+                self._file_refs[entry["sha256"]] = self._file_refs.get(entry["sha256"], 0) + 1
+            else:
+                self._memory_bytes += len(entry["data"])
+            while len(self._entries) > self.max_entries:
+                self._discard(next(iter(self._entries)))
+                self._evicted += 1
+
+        return {key: value for key, value in entry.items() if key != "data"}
+
+    def _discard(self, request_id: str) -> None:
+        """移除条目并释放内存或磁盘文件（调用方需持有锁）"""
+        entry = self._entries.pop(request_id, None)
+        if not entry:
+            return
+        if "data" in entry:
+            self._memory_bytes -= len(entry["data"])
+            return
+        refs = self._file_refs.get(entry["sha256"], 1) - 1
+        if refs > 0:
+            self._file_refs[entry["sha256"]] = refs
+            return
+        self._file_refs.pop(entry["sha256"], None)
+        try:
+            Path(entry["path"]).unlink()
+        except OSError:
+            pass
+
+    def get(self, request_id: str) -> Optional[Dict[str, Any]]:
+        """读取响应体
+
+        Args:
+            request_id: CDP请求ID
+
+        Returns:
+            dict: 条目元数据及 body（原始字节），不存在时返回 None
+        """
+        with self._lock:
+            entry = self._entries.get(request_id)
+            if entry is None:
+                return None
+            entry = dict(entry)
+
+        if "data" in entry:
+            entry["body"] = zlib.decompress(entry.pop("data"))
+            entry["stored"] = "memory"
+        else:
+            try:
+                entry["body"] = Path(entry["path"]).read_bytes()
+            except OSError:
+                return None
+            entry["stored"] = "disk"
+        return entry
+
+    def has(self, request_id: str) -> bool:
+        """判断是否已保存该请求的响应体"""
+        with self._lock:
+            return request_id in self._entries
+
+    def clear(self) -> None:
+        """清空所有响应体"""
+        with self._lock:
+            for request_id in list(self._entries):
+                self._discard(request_id)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取存储统计信息
+
+        Returns:
+            dict: 统计信息
+        """
+        with self._lock:
+            on_disk = sum(1 for entry in self._entries.values() if "sha256" in entry)
+            return {
+                "entries": len(self._entries),
+                "in_memory": len(self._entries) - on_disk,
+                "on_disk": on_disk,
+                "memory_compressed_kb": round(self._memory_bytes / 1024, 1),
+                "spill_dir": str(self.spill_dir),
+                "evicted": self._evicted
+            }
+
+
+def is_text_mime(mime_type: str) -> bool:
+    """判断mimeType是否按文本处理"""
+    mime_type = (mime_type or "").lower()
+    return any(keyword in mime_type for keyword in TEXT_MIME_KEYWORDS)
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""流式消息存储模块
+
+按连接（WebSocket / EventSource）保存收发的消息帧，每个连接一个定长环形缓冲区，
+帧带有全局递增序号，可用一个游标增量读取所有连接的新消息。
+"""
+
+import heapq
+import threading
+from typing import Dict, Any, List, Optional
+
+from ..utils.ring_buffer import RingBuffer
+
+
+def _frame_seq(frame: Dict[str, Any]) -> int:
+    return frame["seq"]
+
+
+class StreamConnection:
+    """单个流式连接及其消息缓冲区"""
+
+    __slots__ = ("connection_id", "kind", "url", "created", "closed", "frames",
+                 "received", "sent", "errors", "filtered_out")
+
+    def __init__(self, connection_id: str, kind: str, url: str, created: float, max_frames: int):
+        self.connection_id = connection_id
+        self.kind = kind
+        self.url = url
+        self.created = created
+        self.closed: Optional[float] = None
+        self.frames = RingBuffer(max_frames)
+        self.received = 0
+        self.sent = 0
+        self.errors = 0
+        self.filtered_out = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "connection_id": self.connection_id,
+            "type": self.kind,
+            "url": self.url,
+            "created": self.created,
+            "closed": self.closed,
+            "received": self.received,
+            "sent": self.sent,
+            "errors": self.errors,
+            "filtered_out": self.filtered_out,
+            "buffer": self.frames.stats()
+        }
+
+
+class StreamFrameStore:
+    """流式消息存储
+
+    连接数超过上限时优先淘汰最早关闭的连接，没有已关闭的连接时淘汰最早创建的连接。
+    """
+
+    def __init__(self, max_connections: int = 100, max_frames: int = 500):
+        self.max_connections = max_connections
+        self.max_frames = max_frames
+        self._connections: Dict[str, StreamConnection] = {}
+        self._next_seq = 0
+        self._lock = threading.Lock()
+
+    def open(self, connection_id: str, kind: str, url: str = "", timestamp: float = 0.0) -> StreamConnection:
+        """登记连接，已存在时补全URL"""
+        with self._lock:
+            connection = self._connections.get(connection_id)
+            if connection is None:
+                if len(self._connections) >= self.max_connections:
+                    self._evict()
+                connection = self._connections[connection_id] = StreamConnection(
+                    connection_id, kind, url, timestamp, self.max_frames
+                )
+            elif url and not connection.url:
+                connection.url = url
+            return connection
+
+    def _evict(self) -> None:
+        """淘汰一个连接（调用方需持有锁）"""
+        closed = [c for c in self._connections.values() if c.closed is not None]
+        victim = min(closed or self._connections.values(), key=lambda c: c.closed or c.created)
+        del self._connections[victim.connection_id]
+
+    def get(self, connection_id: str) -> Optional[StreamConnection]:
+        return self._connections.get(connection_id)
+
+    def close(self, connection_id: str, timestamp: float) -> None:
+        connection = self._connections.get(connection_id)
+        if connection is not None:
+            connection.closed = timestamp
+
+    def append(self, connection: StreamConnection, frame: Dict[str, Any]) -> int:
+        """写入一帧，返回其全局序号"""
+        # 分配序号和写入在同一把锁内完成，读取方不会跳过尚未写入的序号
+        with self._lock:
+            seq = frame["seq"] = self._next_seq
+            self._next_seq = seq + 1
+            connection.frames.append(frame)
+        return seq
+
+    def since(self, cursor: int = 0, limit: int = 100, connection_id: Optional[str] = None) -> Dict[str, Any]:
+        """按全局游标增量读取消息
+
+        Args:
+            cursor: 上次读取返回的游标，首次读取传 0
+            limit: 单次读取条数上限
+            connection_id: 只读取该连接的消息
+
+        Returns:
+            dict: 消息列表（按序号升序）和下次读取使用的游标
+        """
+        if limit <= 0:
+            return {"frames": [], "cursor": cursor}
+        with self._lock:
+            end = self._next_seq
+            if connection_id is not None:
+                connection = self._connections.get(connection_id)
+                connections = [connection] if connection is not None else []
+            else:
+                connections = list(self._connections.values())
+
+        # 原因：原先复制每个连接的全部帧后再按游标过滤，每次读取为 O(总帧数)；
+        # 改为在各连接内二分定位游标，最多取 limit 帧，副作用：无，回滚策略：还原为 tail() 后过滤
+        # 每个连接内的帧已按序号递增，多路归并后截取
+        streams = [connection.frames.from_key(cursor, _frame_seq, limit) for connection in connections]
+        frames: List[Dict[str, Any]] = []
+        for frame in heapq.merge(*streams, key=_frame_seq):
+            if frame["seq"] >= end:
+                break
+            frames.append(frame)
+            if len(frames) >= limit:
+                end = frame["seq"] + 1
+                break
+        return {"frames": frames, "cursor": max(end, cursor)}
+
+    def connections(self) -> List[Dict[str, Any]]:
+        """列出连接摘要"""
+        with self._lock:
+            connections = list(self._connections.values())
+        return [connection.to_dict() for connection in connections]
+
+    def clear(self) -> None:
+        """清空全部连接和消息（序号继续递增，已有游标仍然有效）"""
+        with self._lock:
+            self._connections.clear()
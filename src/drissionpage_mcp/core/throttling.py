@@ -0,0 +1,264 @@
+# -*- coding: utf-8 -*-
+"""网络与CPU限速模块
+
+按预设方案（slow-3g、fast-3g、4倍CPU降速等）同时设置 Network.emulateNetworkConditions
+和 Emulation.setCPUThrottlingRate，按标签页记录当前方案，可限时或在操作结束后自动恢复。
+"""
+
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, Optional
+
+from .domain_manager import CDPDomainManager
+
+
+# 网络条件（与 Chrome DevTools 预设一致）：延迟毫秒，上下行速率 kbps
+NETWORK_PRESETS: Dict[str, Dict[str, Any]] = {
+    "slow-3g": {"latency_ms": 2000, "download_kbps": 400, "upload_kbps": 400},
+    "fast-3g": {"latency_ms": 562.5, "download_kbps": 1440, "upload_kbps": 675},
+    "fast-4g": {"latency_ms": 165, "download_kbps": 8100, "upload_kbps": 1350},
+    "offline": {"offline": True},
+}
+
+# 限速方案：network 为网络条件，cpu_rate 为CPU降速倍数
+THROTTLING_PROFILES: Dict[str, Dict[str, Any]] = {
+    "slow-3g": {"network": NETWORK_PRESETS["slow-3g"]},
+    "fast-3g": {"network": NETWORK_PRESETS["fast-3g"]},
+    "fast-4g": {"network": NETWORK_PRESETS["fast-4g"]},
+    "offline": {"network": NETWORK_PRESETS["offline"]},
+    "cpu-2x": {"cpu_rate": 2},
+    "cpu-4x": {"cpu_rate": 4},
+    "cpu-6x": {"cpu_rate": 6},
+    # Lighthouse 移动端默认条件
+    "mobile": {"network": NETWORK_PRESETS["fast-3g"], "cpu_rate": 4},
+    "low-end-mobile": {"network": NETWORK_PRESETS["slow-3g"], "cpu_rate": 6},
+}
+
+
+class ThrottlingManager:
+    """每个标签页一个的限速管理器
+
+    通过 ThrottlingManager.for_tab(tab) 获取，CDP服务和指标采集共享同一份状态，
+    采集的指标可以记录当时生效的方案。
+    """
+
+    _managers: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+    _managers_lock = threading.Lock()
+    _KEY = "throttling"
+
+    def __init__(self, tab):
+        self.tab = tab
+        self.domains = CDPDomainManager.for_tab(tab)
+        # 当前生效的设置：profile、network、cpu_rate、applied_at、expires_at
+        self._active: Optional[Dict[str, Any]] = None
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.RLock()
+
+    @classmethod
+    def for_tab(cls, tab) -> "ThrottlingManager":
+        """获取标签页对应的限速管理器，不存在时创建"""
+        driver = tab.driver
+        with cls._managers_lock:
+            manager = cls._managers.get(driver)
+            if manager is None:
+                manager = cls._managers[driver] = cls(tab)
+            return manager
+
+    @classmethod
+    def restore_all(cls) -> int:
+        """恢复所有标签页的限速（服务退出时调用，避免共享的浏览器保持降速状态）
+
+        Returns:
+            int: 恢复的标签页数量
+        """
+        with cls._managers_lock:
+            managers = list(cls._managers.values())
+        restored = 0
+        for manager in managers:
+            if manager.active_name is not None:
+                manager.restore()
+                restored += 1
+        return restored
+
+    @property
+    def active_name(self) -> Optional[str]:
+        """当前生效的方案名称，未限速时为 None"""
+        active = self._active
+        return active["profile"] if active else None
+
+    @staticmethod
+    def build_settings(profile: Optional[str] = None,
+                       latency_ms: Optional[float] = None,
+                       download_kbps: Optional[float] = None,
+                       upload_kbps: Optional[float] = None,
+                       cpu_rate: Optional[float] = None) -> Dict[str, Any]:
+        """按方案和自定义参数生成限速设置
+
+        Raises:
+            ValueError: 方案不存在或参数无效
+        """
+        if profile is not None and profile not in THROTTLING_PROFILES:
+            raise ValueError(f"未知的限速方案: {profile}，可选: {sorted(THROTTLING_PROFILES)}")
+        base = THROTTLING_PROFILES.get(profile, {})
+        network = dict(base["network"]) if base.get("network") else None
+        overrides = {"latency_ms": latency_ms, "download_kbps": download_kbps, "upload_kbps": upload_kbps}
+        if any(value is not None for value in overrides.values()):
+            network = network or {}
+            network.update({key: value for key, value in overrides.items() if value is not None})
+        if cpu_rate is None:
+            cpu_rate = base.get("cpu_rate")
+        if cpu_rate is not None and cpu_rate < 1:
+            raise ValueError(f"CPU降速倍数不能小于 1: {cpu_rate}")
+        if network is None and cpu_rate is None:
+            raise ValueError("请指定限速方案或自定义参数")
+        customized = any(value is not None for value in overrides.values()) or (
+            cpu_rate is not None and cpu_rate != base.get("cpu_rate"))
+        name = profile if profile and not customized else (f"{profile}+custom" if profile else "custom")
+        return {"profile": name, "network": network, "cpu_rate": cpu_rate}
+
+    def _send_network(self, network: Optional[Dict[str, Any]]) -> None:
+        if network is None:
+            # 速率 -1 表示不限速
+            self.tab.run_cdp("Network.emulateNetworkConditions", offline=False, latency=0,
+                             downloadThroughput=-1, uploadThroughput=-1)
+            return
+
+        def to_bytes(kbps: Optional[float]) -> float:
+            return kbps * 1000 / 8 if kbps is not None else -1
+
+        self.tab.run_cdp("Network.emulateNetworkConditions",
+                         offline=bool(network.get("offline")),
+                         latency=network.get("latency_ms", 0),
+                         downloadThroughput=to_bytes(network.get("download_kbps")),
+                         uploadThroughput=to_bytes(network.get("upload_kbps")))
+
+    def _apply_settings(self, settings: Optional[Dict[str, Any]], duration: Optional[float] = None) -> None:
+        """切换到指定设置（None 表示恢复），只发送有变化的部分（调用方需持有锁）"""
+        previous = self._active or {"network": None, "cpu_rate": None}
+        target = settings or {"network": None, "cpu_rate": None}
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        if target["network"] is not None:
+            self.domains.acquire("Network", self._KEY)
+        # 原因：恢复时发送命令失败会跳过释放，"throttling" 一直占用 Network 域，
+        # 副作用：恢复失败后同样释放引用，回滚策略：去掉 try/finally
+        try:
+            if target["network"] != previous["network"]:
+                self._send_network(target["network"])
+        finally:
+            if target["network"] is None and previous["network"] is not None:
+                self.domains.release("Network", self._KEY)
+        if target["cpu_rate"] != previous["cpu_rate"]:
+            self.tab.run_cdp("Emulation.setCPUThrottlingRate", rate=target["cpu_rate"] or 1)
+
+        if settings is None:
+            self._active = None
+            return
+        self._active = {**settings, "applied_at": time.time(),
+                        "expires_at": time.time() + duration if duration else None}
+        if duration:
+            self._timer = threading.Timer(duration, self.restore)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def apply(self, profile: Optional[str] = None,
+              latency_ms: Optional[float] = None,
+              download_kbps: Optional[float] = None,
+              upload_kbps: Optional[float] = None,
+              cpu_rate: Optional[float] = None,
+              duration: Optional[float] = None) -> str:
+        """应用限速方案，替换当前设置
+
+        Args:
+            profile: 方案名称，见 THROTTLING_PROFILES
+            latency_ms: 自定义网络延迟（毫秒），覆盖方案中的值
+            download_kbps: 自定义下行速率（kbps）
+            upload_kbps: 自定义上行速率（kbps）
+            cpu_rate: CPU降速倍数（1 表示不降速）
+            duration: 自动恢复前的持续时间（秒），为空时一直生效直到恢复
+
+        Returns:
+            str: 操作结果
+        """
+        try:
+            settings = self.build_settings(profile, latency_ms, download_kbps, upload_kbps, cpu_rate)
+        except ValueError as e:
+            return f"设置限速失败: {str(e)}"
+        try:
+            with self._lock:
+                self._apply_settings(settings, duration)
+            suffix = f"，{duration} 秒后自动恢复" if duration else ""
+            return f"已应用限速方案 {settings['profile']}: {self._describe_settings(settings)}{suffix}"
+        except Exception as e:
+            return f"设置限速失败: {str(e)}"
+
+    def restore(self) -> str:
+        """恢复为不限速"""
+        with self._lock:
+            if self._active is None:
+                return "当前未限速"
+            name = self._active["profile"]
+            try:
+                self._apply_settings(None)
+            except Exception as e:
+                self._active = None
+                return f"恢复限速失败: {str(e)}"
+        return f"已恢复不限速（原方案 {name}）"
+
+    @contextmanager
+    def applied(self, profile: Optional[str] = None, **overrides) -> Iterator[Dict[str, Any]]:
+        """在代码块内应用限速方案，结束后恢复为之前的设置
+
+        Raises:
+            ValueError: 方案不存在或参数无效
+        """
+        settings = self.build_settings(profile, **overrides)
+        with self._lock:
+            previous = dict(self._active) if self._active else None
+            self._apply_settings(settings)
+        try:
+            yield settings
+        finally:
+            with self._lock:
+                if previous is not None:
+                    remaining = previous["expires_at"] - time.time() if previous.get("expires_at") else None
+                    if remaining is not None and remaining <= 0:
+                        self._apply_settings(None)
+                    else:
+                        self._apply_settings(previous, remaining)
+                else:
+                    self._apply_settings(None)
+
+    @staticmethod
+    def _describe_settings(settings: Dict[str, Any]) -> str:
+        parts = []
+        network = settings.get("network")
+        if network:
+            if network.get("offline"):
+                parts.append("离线")
+            else:
+                def rate(kbps: Optional[float]) -> str:
+                    return f"{kbps}kbps" if kbps is not None else "不限"
+
+                parts.append(f"延迟 {network.get('latency_ms', 0)}ms，下行 {rate(network.get('download_kbps'))}，"
+                             f"上行 {rate(network.get('upload_kbps'))}")
+        if settings.get("cpu_rate"):
+            parts.append(f"CPU {settings['cpu_rate']}x 降速")
+        return "；".join(parts)
+
+    def describe(self) -> Optional[Dict[str, Any]]:
+        """当前生效的设置，未限速时为 None"""
+        active = self._active
+        if active is None:
+            return None
+        return {
+            "profile": active["profile"],
+            "network": active["network"],
+            "cpu_rate": active["cpu_rate"],
+            "applied_at": active["applied_at"],
+            "expires_at": active["expires_at"]
+        }
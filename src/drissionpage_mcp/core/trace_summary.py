@@ -0,0 +1,291 @@
+# -*- coding: utf-8 -*-
+"""性能追踪文件摘要模块
+
+以流式方式逐条解析 Chrome 追踪文件（JSON，可为 gzip 压缩），
+统计长任务、脚本执行耗时和布局/样式/绘制耗时，内存占用与文件大小无关。
+"""
+
+import codecs
+import heapq
+import json
+import zlib
+from contextlib import closing
+from pathlib import Path
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+
+# 事件名称 -> 统计分类
+EVENT_CATEGORIES = {
+    "EvaluateScript": "script",
+    "v8.evaluateModule": "script",
+    "FunctionCall": "script",
+    "v8.compile": "compile",
+    "v8.compileModule": "compile",
+    "V8.CompileCode": "compile",
+    "Layout": "layout",
+    "UpdateLayoutTree": "style",
+    "RecalculateStyles": "style",
+    "PrePaint": "paint",
+    "Paint": "paint",
+    "Layerize": "paint",
+    "UpdateLayer": "paint",
+    "MinorGC": "gc",
+    "MajorGC": "gc",
+}
+
+# 顶层任务事件，超过阈值的视为长任务
+TASK_EVENTS = frozenset(("RunTask", "ThreadControllerImpl::RunTask"))
+
+_DECODER = json.JSONDecoder()
+
+
+def _iter_text(path: Path, block_size: int = 64 * 1024) -> Iterator[str]:
+    """按块读取追踪文件文本，.gz 文件边读边解压
+
+    不使用 gzip.open：截断的 gzip 文件（如读取追踪数据中途超时）在 gzip.open 中会在最后一次读取时
+    抛出 EOFError 并丢掉整块数据，这里逐块解压，已写入部分都能读出。
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    inflater = zlib.decompressobj(wbits=31) if path.suffix == ".gz" else None
+    with open(path, "rb") as file:
+        while True:
+            raw = file.read(block_size)
+            if not raw:
+                break
+            if inflater is not None:
+                data = inflater.decompress(raw)
+                # 多个 gzip 成员首尾相接时继续解压下一个成员
+                while inflater.eof and inflater.unused_data:
+                    rest = inflater.unused_data
+                    inflater = zlib.decompressobj(wbits=31)
+                    data += inflater.decompress(rest)
+                raw = data
+            text = decoder.decode(raw)
+            if text:
+                yield text
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+def iter_trace_events(path: Path, chunk_size: int = 1024 * 1024) -> Iterator[Dict[str, Any]]:
+    """逐条读取追踪文件中的事件
+
+    支持 {"traceEvents": [...]} 对象格式和直接的事件数组格式，
+    按块读取文件，单个事件跨块时自动补读；截断的文件解析到最后一个完整事件为止。
+
+    Args:
+        path: 追踪文件路径，以 .gz 结尾时按 gzip 解压
+        chunk_size: 每次读取的字节数上限，已解析部分超过该长度时从缓冲区移除
+
+    Yields:
+        dict: 追踪事件
+    """
+    path = Path(path)
+    with closing(_iter_text(path, min(chunk_size, 64 * 1024))) as chunks:
+        buffer = ""
+        eof = False
+
+        def fill() -> bool:
+            nonlocal buffer, eof
+            if eof:
+                return False
+            chunk = next(chunks, "")
+            if not chunk:
+                eof = True
+                return False
+            buffer += chunk
+            return True
+
+        # 定位事件数组的起点
+        pos = -1
+        while pos < 0:
+            stripped = buffer.lstrip()
+            if stripped.startswith("["):
+                pos = buffer.index("[") + 1
+                break
+            key = buffer.find('"traceEvents"')
+            if key >= 0:
+                bracket = buffer.find("[", key)
+                if bracket >= 0:
+                    pos = bracket + 1
+                    break
+            if not fill():
+                return
+
+        while True:
+            # 跳过分隔符
+            while True:
+                while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                    pos += 1
+                if pos < len(buffer) or not fill():
+                    break
+            if pos >= len(buffer) or buffer[pos] == "]":
+                return
+            try:
+                event, end = _DECODER.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # 事件尚未读完整：丢弃已解析部分后补读
+                buffer = buffer[pos:]
+                pos = 0
+                if not fill():
+                    return
+                continue
+            pos = end
+            if isinstance(event, dict):
+                yield event
+            if pos > chunk_size:
+                buffer = buffer[pos:]
+                pos = 0
+
+
+class TraceSummarizer:
+    """追踪事件聚合器
+
+    按线程分别累计各分类耗时和最长的若干任务，结束时优先只汇总渲染主线程
+    （CrRendererMain）；追踪中没有线程名称元数据时汇总全部线程。
+    """
+
+    def __init__(self, top: int = 10, long_task_ms: float = 50):
+        self.top = top
+        self.long_task_us = long_task_ms * 1000
+        self.event_count = 0
+        self.first_ts: Optional[float] = None
+        self.last_ts: Optional[float] = None
+        self.thread_names: Dict[Tuple[Any, Any], str] = {}
+        # (pid, tid) -> 分类 -> [次数, 微秒]
+        self._categories: Dict[Tuple[Any, Any], Dict[str, List[float]]] = {}
+        # (pid, tid) -> 长任务最小堆 (时长, 序号, 任务)
+        self._long_tasks: Dict[Tuple[Any, Any], List[Tuple[float, int, Dict[str, Any]]]] = {}
+        self._long_task_counts: Dict[Tuple[Any, Any], int] = {}
+        # (pid, tid) -> 脚本URL -> 微秒
+        self._scripts: Dict[Tuple[Any, Any], Dict[str, float]] = {}
+        # 未配对的 B 事件栈：(pid, tid) -> [(名称, 开始时间, 参数)]
+        self._open: Dict[Tuple[Any, Any], List[Tuple[str, float, Dict[str, Any]]]] = {}
+        self._seq = 0
+
+    def feed(self, event: Dict[str, Any]) -> None:
+        """处理一个追踪事件"""
+        self.event_count += 1
+        phase = event.get("ph")
+        thread = (event.get("pid"), event.get("tid"))
+        name = event.get("name", "")
+
+        if phase == "M":
+            if name == "thread_name":
+                self.thread_names[thread] = event.get("args", {}).get("name", "")
+            return
+
+        ts = event.get("ts")
+        if isinstance(ts, (int, float)) and ts > 0:
+            if self.first_ts is None or ts < self.first_ts:
+                self.first_ts = ts
+            end = ts + (event.get("dur") or 0)
+            if self.last_ts is None or end > self.last_ts:
+                self.last_ts = end
+
+        if phase == "X":
+            self._complete(thread, name, ts, event.get("dur"), event.get("args"))
+        elif phase == "B":
+            if name in EVENT_CATEGORIES or name in TASK_EVENTS:
+                self._open.setdefault(thread, []).append((name, ts, event.get("args") or {}))
+        elif phase == "E":
+            stack = self._open.get(thread)
+            if stack:
+                # E 事件可能不带名称，与最近的同名（或最近的）B 事件配对
+                for index in range(len(stack) - 1, -1, -1):
+                    if not name or stack[index][0] == name:
+                        begin_name, begin_ts, args = stack.pop(index)
+                        if isinstance(ts, (int, float)) and isinstance(begin_ts, (int, float)):
+                            self._complete(thread, begin_name, begin_ts, ts - begin_ts, args)
+                        break
+
+    def _complete(self, thread, name: str, ts, dur, args) -> None:
+        if not isinstance(dur, (int, float)):
+            return
+        category = EVENT_CATEGORIES.get(name)
+        if category is not None:
+            entry = self._categories.setdefault(thread, {}).setdefault(category, [0, 0.0])
+            entry[0] += 1
+            entry[1] += dur
+            if category == "script":
+                url = ((args or {}).get("data") or {}).get("url") or "(inline)"
+                scripts = self._scripts.setdefault(thread, {})
+                scripts[url] = scripts.get(url, 0.0) + dur
+        elif name in TASK_EVENTS and dur >= self.long_task_us:
+            self._long_task_counts[thread] = self._long_task_counts.get(thread, 0) + 1
+            heap = self._long_tasks.setdefault(thread, [])
+            self._seq += 1
+            item = (dur, self._seq, {"ts": ts, "dur": dur})
+            if len(heap) < self.top:
+                heapq.heappush(heap, item)
+            elif dur > heap[0][0]:
+                heapq.heapreplace(heap, item)
+
+    def summary(self) -> Dict[str, Any]:
+        """生成摘要
+
+        Returns:
+            dict: 追踪时长、各分类耗时、最长任务和耗时最多的脚本（时间单位为毫秒）
+        """
+        main_threads = [thread for thread, name in self.thread_names.items() if name == "CrRendererMain"]
+        threads = main_threads or list(set(self._categories) | set(self._long_tasks))
+
+        categories: Dict[str, Dict[str, Any]] = {}
+        scripts: Dict[str, float] = {}
+        long_tasks: List[Tuple[float, int, Dict[str, Any]]] = []
+        long_task_count = 0
+        for thread in threads:
+            for category, (count, total) in self._categories.get(thread, {}).items():
+                entry = categories.setdefault(category, {"count": 0, "total_ms": 0.0})
+                entry["count"] += int(count)
+                entry["total_ms"] += total / 1000
+            for url, total in self._scripts.get(thread, {}).items():
+                scripts[url] = scripts.get(url, 0.0) + total
+            long_tasks.extend(self._long_tasks.get(thread, []))
+            long_task_count += self._long_task_counts.get(thread, 0)
+        for entry in categories.values():
+            entry["total_ms"] = round(entry["total_ms"], 2)
+
+        start = self.first_ts or 0
+        top_tasks = [{
+            "start_ms": round((task["ts"] - start) / 1000, 2) if isinstance(task["ts"], (int, float)) else None,
+            "duration_ms": round(task["dur"] / 1000, 2),
+            "blocking_ms": round(max(0.0, task["dur"] - self.long_task_us) / 1000, 2)
+        } for _, _, task in heapq.nlargest(self.top, long_tasks)]
+        return {
+            "events": self.event_count,
+            "duration_ms": round((self.last_ts - self.first_ts) / 1000, 2) if self.first_ts is not None else 0,
+            "main_threads": len(main_threads),
+            "long_tasks": {
+                "count": long_task_count,
+                "threshold_ms": self.long_task_us / 1000,
+                "top": top_tasks
+            },
+            "script_ms": categories.get("script", {}).get("total_ms", 0.0),
+            "compile_ms": categories.get("compile", {}).get("total_ms", 0.0),
+            "layout_ms": categories.get("layout", {}).get("total_ms", 0.0),
+            "style_ms": categories.get("style", {}).get("total_ms", 0.0),
+            "paint_ms": categories.get("paint", {}).get("total_ms", 0.0),
+            "gc_ms": categories.get("gc", {}).get("total_ms", 0.0),
+            "categories": categories,
+            "top_scripts": [{"url": url, "total_ms": round(total / 1000, 2)}
+                            for url, total in heapq.nlargest(self.top, scripts.items(), key=lambda item: item[1])]
+        }
+
+
+def summarize_trace_file(path: Path, top: int = 10, long_task_ms: float = 50) -> Dict[str, Any]:
+    """流式读取追踪文件并生成摘要
+
+    Args:
+        path: 追踪文件路径（.json 或 .json.gz）
+        top: 最长任务和脚本的返回数量
+        long_task_ms: 长任务阈值（毫秒）
+
+    Returns:
+        dict: 摘要，见 TraceSummarizer.summary
+    """
+    summarizer = TraceSummarizer(top, long_task_ms)
+    for event in iter_trace_events(path):
+        summarizer.feed(event)
+    return summarizer.summary()
@@ -5,7 +5,10 @@
 """
 
 import asyncio
+import base64
+import json
 import logging
+from contextlib import nullcontext
 from typing import Dict, Any, List, Optional
 from pathlib import Path
 
@@ -17,11 +20,20 @@ from mcp.types import Resource, Tool, TextContent, ImageContent, EmbeddedResourc
 from .core.browser_manager import BrowserManager
 from .core.element_handler import ElementHandler
 from .core.network_listener import NetworkListener
+from .core.network_log_store import NetworkLogStore
+from .core.request_blocker import RequestBlocker
+from .core.network_replay import NetworkReplay
+from .core.browser_network_monitor import BrowserNetworkMonitor
+from .core.page_metrics import PageMetricsCollector
+from .core.page_metrics_store import PageMetricsStore
+from .core.throttling import ThrottlingManager
 from .core.file_handler import FileHandler
+from .core.cdp_profiler import profiler as cdp_profiler, profile_tool
 
 # 服务模块
 from .services.dom_service import DOMService
 from .services.screenshot_service import ScreenshotService
+from .services.screenshot_retention import ScreenshotRetention
 from .services.cdp_service import CDPService
 
 # 配置和工具
@@ -53,15 +65,28 @@ class DrissionPageMCP:
         self.browser_manager = None
         self.element_handler = None
         self.network_listener = None
+        self.network_log_store = None
+        self.response_body_store = None
+        self.request_blocker = None
+        self.network_replay = None
+        self.browser_monitor = None
         self.file_handler = None
         self.dom_service = None
         self.screenshot_service = None
+        self.screenshot_retention = None
         self.cdp_service = None
+        self.page_metrics = None
+        self.page_metrics_store = None
         
         # 初始化配置
         self.config = DEFAULT_CONFIG.copy()
         self.config.update(get_env_config())
         
+        # 原因：CDP耗时分析需要知道每次CDP调用由哪个工具触发，副作用：每次工具调用多一次上下文变量设置，回滚策略：移除此调用
+        self._wrap_tool_registration()
+        if get_config_value('cdp.profile_on_start', False):
+            cdp_profiler.enable(get_config_value('cdp.profile_payloads', True))
+        
         # 注册所有工具
         self._register_tools()
         
@@ -71,6 +96,16 @@ class DrissionPageMCP:
         # 注册资源
         self._register_resources()
     
+    def _wrap_tool_registration(self):
+        """让通过 self.app.tool() 注册的工具在调用期间标记工具名称"""
+        register = self.app.tool
+
+        def tool(*args, **kwargs):
+            decorator = register(*args, **kwargs)
+            return lambda func: decorator(profile_tool(func))
+
+        self.app.tool = tool
+
     def _register_tools(self):
         """注册所有MCP工具"""
         
@@ -84,7 +119,8 @@ class DrissionPageMCP:
                 
                 config = {
                     "debug_port": port,
-                    "headless": headless
+                    "headless": headless,
+                    "extensions": get_config_value('browser.extensions', [])
                 }
                 if user_data_dir:
                     config["user_data_dir"] = user_data_dir
@@ -120,17 +156,39 @@ class DrissionPageMCP:
                 return f"创建标签页失败: {str(e)}"
         
         @self.app.tool()
-        async def navigate(url: str) -> str:
-            """导航到指定URL"""
+        async def navigate(url: str, collect_metrics: bool = False, throttling: str = None) -> str:
+            """导航到指定URL
+            
+            Args:
+                url: 目标URL
+                collect_metrics: 是否在导航后采集页面性能指标（LCP、CLS、INP、TTFB、JS堆等）并追加到本地时间序列库
+                throttling: 本次导航使用的限速方案（如 slow-3g、mobile），导航和指标采集结束后恢复原设置
+            """
             try:
                 if not self.browser_manager:
                     return "请先连接浏览器"
                 
                 if not validate_url(url):
                     return f"无效的URL: {url}"
+                # 限速依赖CDP服务，缺失时直接报错而不是静默地不限速导航
+                if throttling and not self.cdp_service:
+                    return "请先连接浏览器后再使用限速方案"
                 
-                result = await self.browser_manager.get(url)
-                return f"导航成功: {result['title']} - {result['url']}"
+                # 原因：导航结果只有标题和URL，无法发现性能退化；可选在导航后附带一条指标记录，
+                # 副作用：开启时导航前会安装文档开始脚本，回滚策略：移除 collect_metrics 分支
+                collect_metrics = collect_metrics or get_config_value('metrics.collect_on_navigate', False)
+                if collect_metrics and self.page_metrics and not self.page_metrics.installed:
+                    self.page_metrics.install()
+                scope = self.cdp_service.throttling.applied(throttling) if throttling else nullcontext()
+                with scope as applied:
+                    result = await self.browser_manager.get(url)
+                    message = f"导航成功: {result['title']} - {result['url']}"
+                    if collect_metrics and self.page_metrics:
+                        record = await asyncio.to_thread(self._collect_page_metrics)
+                        message += "\n页面性能指标: " + json.dumps(self._compact_metrics(record), ensure_ascii=False)
+                if applied:
+                    message += f"\n限速方案 {throttling} 已恢复"
+                return message
             except Exception as e:
                 logger.error(f"导航失败: {e}")
                 return f"导航失败: {str(e)}"
@@ -347,7 +405,157 @@ class DrissionPageMCP:
             except Exception as e:
                 logger.error(f"获取截图数据失败: {e}")
                 raise Exception(f"获取截图数据失败: {str(e)}")
-        
+
+        # 原因：返回值不加类型注解，避免FastMCP把base64图片再序列化一份到结构化输出，副作用：无，回滚策略：补回注解
+        @self.app.tool()
+        async def get_screenshot_image(max_dimension: int = None, image_format: str = None,
+                                       quality: int = None, grayscale: bool = None,
+                                       full_page: bool = False, element_selector: str = None):
+            """获取面向多模态模型优化的截图（直接返回图片内容）
+
+            截图在服务端缩放并重新编码为 WebP/JPEG，体积通常只有原始PNG的几分之一到几十分之一。
+
+            Args:
+                max_dimension: 最长边像素上限（默认1280，0表示不缩放）
+                image_format: 输出格式 auto/webp/jpeg/png（auto优先webp）
+                quality: 压缩质量1-100（默认取配置 screenshot.quality）
+                grayscale: 是否转为灰度图（文字类页面可进一步减小体积）
+                full_page: 是否截取完整页面
+                element_selector: 仅截取特定元素（XPath，可选）
+
+            Returns:
+                ImageContent: 图片内容，附带尺寸与体积说明文本
+            """
+            try:
+                if not self.screenshot_service:
+                    return "请先连接浏览器"
+
+                result = self.screenshot_service.get_llm_screenshot(
+                    max_dimension, image_format, quality, grayscale, full_page, element_selector
+                )
+                summary = (
+                    f"截图 {result['width']}x{result['height']} {result['format']} "
+                    f"{result['size_bytes']} 字节（原始 {result['original_width']}x{result['original_height']}, "
+                    f"{result['original_size_bytes']} 字节）"
+                )
+                return [
+                    ImageContent(
+                        type="image",
+                        data=base64.b64encode(result["data"]).decode("ascii"),
+                        mimeType=result["mime_type"]
+                    ),
+                    TextContent(type="text", text=summary)
+                ]
+            except Exception as e:
+                logger.error(f"获取优化截图失败: {e}")
+                return f"获取优化截图失败: {str(e)}"
+
+        @self.app.tool()
+        async def get_screenshot_diff(block_size: int = 16, threshold: int = 24,
+                                      return_crops: bool = False, max_regions: int = 8):
+            """比较当前视口与上一次截图，只返回发生变化的区域
+
+            适合在点击、输入等操作后确认页面发生了哪些变化，无需重新查看整张截图。
+            每个标签页首次调用只记录基准帧。
+
+            Args:
+                block_size: 分块边长（像素），越小定位越精细
+                threshold: 像素差阈值（0-255），越大越不敏感
+                return_crops: 是否同时返回变化区域的裁剪图
+                max_regions: 最多返回的区域数量（按面积排序）
+
+            Returns:
+                str/list: 变化区域JSON，return_crops=True 时附带各区域图片
+            """
+            try:
+                if not self.screenshot_service:
+                    return "请先连接浏览器"
+
+                result = self.screenshot_service.capture_diff(
+                    block_size, threshold, return_crops, max_regions
+                )
+                crops = result.pop("crops")
+                summary = json.dumps(result, ensure_ascii=False)
+                if not crops:
+                    return summary
+
+                contents = [TextContent(type="text", text=summary)]
+                for crop in crops:
+                    contents.append(ImageContent(
+                        type="image",
+                        data=base64.b64encode(crop["data"]).decode("ascii"),
+                        mimeType=crop["mime_type"]
+                    ))
+                return contents
+            except Exception as e:
+                logger.error(f"截图差异比较失败: {e}")
+                return f"截图差异比较失败: {str(e)}"
+
+        @self.app.tool()
+        async def get_annotated_screenshot(max_elements: int = 60, max_dimension: int = None):
+            """获取标注了可交互元素编号的截图（set-of-marks）
+
+            一次调用同时返回标注截图和「编号 → 选择器」对照表，
+            无需再单独调用 find_elements() 或 get_dom_tree() 将画面与选择器对应。
+            选择器为 "xpath:" 前缀的定位符，可直接传给 click_element()、input_text()、get_element_text()。
+
+            Args:
+                max_elements: 最多标注的元素数量
+                max_dimension: 图片最长边像素上限（默认取配置 screenshot.llm_max_dimension）
+
+            Returns:
+                list: 标注截图 + 对照表文本（每行：编号 | 标签 | 选择器 | 文本）
+            """
+            try:
+                if not self.screenshot_service:
+                    return "请先连接浏览器"
+
+                result = self.screenshot_service.capture_annotated(max_elements, max_dimension)
+                lines = [f"共标注 {len(result['elements'])} 个元素（编号 | 标签 | 选择器 | 文本）"]
+                for element in result["elements"]:
+                    tag = element["tag"] + (f"[{element['type']}]" if element["type"] else "")
+                    lines.append(f"{element['ref']} | {tag} | {element['selector']} | {element['text']}")
+
+                return [
+                    ImageContent(
+                        type="image",
+                        data=base64.b64encode(result["data"]).decode("ascii"),
+                        mimeType=result["mime_type"]
+                    ),
+                    TextContent(type="text", text="\n".join(lines))
+                ]
+            except Exception as e:
+                logger.error(f"标注截图失败: {e}")
+                return f"标注截图失败: {str(e)}"
+
+        @self.app.tool()
+        async def take_scroll_screenshots(stitch: bool = True, max_frames: int = 20,
+                                          keep_frames: bool = False, quiet_ms: int = 300) -> str:
+            """滚动截取长页面（等待页面稳定后截图，可拼接为一张长图）
+
+            每一步等待资源请求静默和页面绘制完成后再截图，懒加载内容导致的页面增高会被重新测量。
+
+            Args:
+                stitch: 是否拼接为一张长图（自动处理重叠区域和固定页头/页脚）
+                max_frames: 最大截图帧数
+                keep_frames: 拼接时是否保留各帧文件
+                quiet_ms: 判定页面稳定所需的资源请求静默时长（毫秒）
+
+            Returns:
+                str: 截图文件路径列表（拼接长图位于最后）
+            """
+            try:
+                if not self.screenshot_service:
+                    return "请先连接浏览器"
+
+                paths = self.screenshot_service.capture_scroll_sequence(
+                    None, "scroll", max_frames, stitch, keep_frames, quiet_ms
+                )
+                return "\n".join(paths)
+            except Exception as e:
+                logger.error(f"滚动截图失败: {e}")
+                return f"滚动截图失败: {str(e)}"
+
         # DOM操作工具
         @self.app.tool()
         async def get_dom_tree(selector: str = "body", max_depth: int = 10) -> str:
@@ -451,11 +659,19 @@ class DrissionPageMCP:
         
         # 网络监控工具
         @self.app.tool()
-        async def enable_network_monitoring(filter_types: List[str] = None) -> str:
+        async def enable_network_monitoring(filter_types: List[str] = None, persist: bool = False,
+                                            hosts: List[str] = None, url_patterns: List[str] = None,
+                                            status_ranges: List[str] = None,
+                                            resource_types: List[str] = None) -> str:
             """启用网络监控
             
             Args:
-                filter_types: 需要监听的mimeType类型列表
+                filter_types: 需要监听的mimeType类型列表（如 "application/json"、"image/*"、"json"）
+                persist: 是否将响应记录持久化到SQLite，之后可用 query_network_logs() 查询
+                hosts: 只记录这些域名及其子域名的响应
+                url_patterns: URL正则表达式列表，匹配任一即可
+                status_ranges: 状态码条件，如 ["2xx", "404", "500-599"]
+                resource_types: 资源类型，如 ["XHR", "Fetch", "Document"]
                 
             Returns:
                 str: 启用结果
@@ -465,9 +681,25 @@ class DrissionPageMCP:
                 if not self.network_listener:
                     return "请先连接浏览器"
                 
+                extra_filters = {
+                    "hosts": hosts,
+                    "url_patterns": url_patterns,
+                    "status_ranges": status_ranges,
+                    "resource_types": resource_types
+                }
+                if persist:
+                    store = self._get_network_log_store()
+                    if store is None:
+                        return "网络日志数据库初始化失败"
+                    self.network_listener.log_store = store
+                    # 持久化时未指定类型则记录全部响应
+                    return self.network_listener.setup_multi_filter_listener(filter_types or ["*/*"],
+                                                                             **extra_filters)
+
                 # 使用多过滤器监听接口
-                if filter_types:
-                    return self.network_listener.setup_multi_filter_listener(filter_types)
+                if filter_types or any(extra_filters.values()):
+                    return self.network_listener.setup_multi_filter_listener(filter_types or ["*/*"],
+                                                                             **extra_filters)
                 else:
                     return self.network_listener.enable_network_domain()
             except Exception as e:
@@ -475,26 +707,426 @@ class DrissionPageMCP:
                 return f"启用网络监控失败: {str(e)}"
         
         @self.app.tool()
-        async def get_network_logs(limit: int = 50) -> str:
+        async def get_network_logs(limit: int = 50, cursor: int = None) -> str:
             """获取网络请求日志
             
             Args:
                 limit: 返回日志的最大数量
+                cursor: 增量读取的游标，首次传 0，之后传上次返回的 cursor；为空时返回最近的 limit 条
                 
             Returns:
-                str: 网络日志数据
+                str: 网络日志数据；指定 cursor 时为JSON（records、cursor、missed）
             """
             # 原因：使用新的限制数量接口，简化逻辑并提供更好的性能，副作用：无，回滚策略：还原原始逻辑
             try:
                 if not self.network_listener:
                     return "请先连接浏览器"
                 
+                if cursor is not None:
+                    result = self.network_listener.get_response_listener_data_since(cursor, limit)
+                    return json.dumps(result, ensure_ascii=False)
+
                 # 使用新的限制数量接口
                 limited_data = self.network_listener.get_response_listener_data_limited(limit)
                 return str(limited_data)
             except Exception as e:
                 logger.error(f"获取网络日志失败: {e}")
                 return f"获取网络日志失败: {str(e)}"
+
+        @self.app.tool()
+        async def wait_for_network_idle(idle_ms: int = 500, max_inflight: int = 0, timeout: float = 30) -> str:
+            """等待网络空闲
+            
+            在导航、点击等操作后使用：进行中的请求数不超过 max_inflight 且持续 idle_ms 毫秒即返回，
+            页面实际安静下来就结束等待，而不是固定等待若干秒。
+            
+            Args:
+                idle_ms: 需要保持空闲的时长（毫秒）
+                max_inflight: 允许的进行中请求数，页面有轮询请求时可设为 2
+                timeout: 最长等待时间（秒）
+                
+            Returns:
+                str: JSON格式的结果（idle、waited_ms、inflight、pending_urls）
+            """
+            try:
+                if not self.network_listener:
+                    return "请先连接浏览器"
+                # 等待会阻塞，放到线程中执行以免阻塞事件循环
+                result = await asyncio.to_thread(
+                    self.network_listener.wait_for_network_idle, idle_ms, max_inflight, timeout
+                )
+                return json.dumps(result, ensure_ascii=False)
+            except Exception as e:
+                logger.error(f"等待网络空闲失败: {e}")
+                return f"等待网络空闲失败: {str(e)}"
+
+        @self.app.tool()
+        async def set_request_blocking(profiles: List[str] = None, url_patterns: List[str] = None) -> str:
+            """设置请求拦截，减少抓取时不需要的资源下载
+            
+            新设置会替换之前的设置，profiles 和 url_patterns 都为空时关闭拦截。
+            
+            Args:
+                profiles: 拦截方案，可组合使用：
+                    text-only（拦截图片、媒体、字体、样式表）、no-media（拦截图片、媒体、字体）、
+                    no-images（只拦截图片）、no-third-party（拦截第三方站点的子资源）、
+                    no-trackers（拦截常见统计与广告脚本）
+                url_patterns: 自定义URL通配模式，如 ["*.mp4", "*ads.example.com*"]
+                
+            Returns:
+                str: 设置结果
+            """
+            try:
+                if not self.request_blocker:
+                    return "请先连接浏览器"
+                # 按类型/第三方拦截需要 Fetch 域，与网络录制回放互斥
+                fetch_profiles = [p for p in (profiles or []) if p not in ("no-trackers",)]
+                if fetch_profiles and self.network_replay and self.network_replay.active:
+                    return "网络录制回放进行中，请先调用 set_network_replay_mode('off')，或只使用 url_patterns / no-trackers"
+                return self.request_blocker.apply(profiles, url_patterns)
+            except Exception as e:
+                logger.error(f"设置请求拦截失败: {e}")
+                return f"设置请求拦截失败: {str(e)}"
+
+        @self.app.tool()
+        async def set_network_replay_mode(mode: str, cache_name: str = "default", offline: bool = False) -> str:
+            """切换网络录制回放模式
+            
+            record: 保存经过浏览器的所有响应（以 方法+URL+请求体哈希 为键）到本地缓存目录；
+            replay: 匹配的请求直接从缓存返回，不访问网络，重复运行时内容可复现、速度接近本地磁盘；
+            off: 关闭并返回统计。
+            
+            Args:
+                mode: off / record / replay
+                cache_name: 缓存名称，对应 ~/drissionpage_mcp/network/replay/<cache_name>
+                offline: 回放时未命中缓存的请求是否直接失败（True 为完全离线）
+                
+            Returns:
+                str: 切换结果
+            """
+            try:
+                if not self.network_replay:
+                    return "请先连接浏览器"
+                if mode != "off" and self.request_blocker and self.request_blocker.uses_fetch:
+                    return "按资源类型或第三方的请求拦截进行中，请先调用 set_request_blocking() 关闭"
+                return self.network_replay.set_mode(mode, cache_name, offline)
+            except Exception as e:
+                logger.error(f"切换网络录制回放模式失败: {e}")
+                return f"切换网络录制回放模式失败: {str(e)}"
+
+        @self.app.tool()
+        async def get_request_blocking_stats() -> str:
+            """获取请求拦截统计（拦截数量、按类型/规则分布、估算节省的流量）
+            
+            Returns:
+                str: JSON格式的统计信息
+            """
+            try:
+                if not self.request_blocker:
+                    return "请先连接浏览器"
+                return json.dumps(self.request_blocker.get_stats(), ensure_ascii=False)
+            except Exception as e:
+                logger.error(f"获取请求拦截统计失败: {e}")
+                return f"获取请求拦截统计失败: {str(e)}"
+
+        @self.app.tool()
+        async def get_network_stats(group_by: str = "host", sort_by: str = "p95_ms", limit: int = 20) -> str:
+            """获取按主机或资源类型聚合的网络统计
+            
+            统计在启用网络监控后持续更新，包括请求数、失败数、传输字节数、
+            TTFB 与总耗时的 p50/p95 分位数，可快速定位拖慢页面加载的第三方主机。
+            
+            Args:
+                group_by: 分组方式，host 或 resource_type
+                sort_by: 排序字段（count、bytes_kb、ttfb_p95_ms、p50_ms、p95_ms、max_ms），降序
+                limit: 返回行数
+                
+            Returns:
+                str: 统计表，每行：分组 | 请求数 | 失败 | KB | TTFB p50/p95 | 耗时 p50/p95/max（毫秒）
+            """
+            try:
+                if not self.network_listener:
+                    return "请先连接浏览器"
+
+                stats = self.network_listener.stats
+                rows = stats.get_table(group_by, sort_by, limit)
+                summary = stats.summary()
+                lines = [
+                    f"共 {summary['requests']} 个请求（失败 {summary['failed']}），{summary['bytes_kb']} KB，"
+                    f"{summary['hosts']} 个主机",
+                    f"{group_by} | 请求数 | 失败 | KB | TTFB p50/p95 | 耗时 p50/p95/max (ms)"
+                ]
+                for row in rows:
+                    lines.append(
+                        f"{row[group_by]} | {row['count']} | {row['failed']} | {row['bytes_kb']} | "
+                        f"{row['ttfb_p50_ms']}/{row['ttfb_p95_ms']} | {row['p50_ms']}/{row['p95_ms']}/{row['max_ms']}"
+                    )
+                return "\n".join(lines)
+            except Exception as e:
+                logger.error(f"获取网络统计失败: {e}")
+                return f"获取网络统计失败: {str(e)}"
+
+        @self.app.tool()
+        async def enable_response_body_capture(mime_types: List[str] = None, url_pattern: str = None,
+                                               enabled: bool = True) -> str:
+            """启用或停止响应体捕获
+            
+            只捕获匹配条件的响应，加载完成后在后台获取响应体；小响应体压缩保存在内存，
+            大响应体按内容哈希写入磁盘。之后用 get_response_body(request_id) 按需读取，
+            可直接获取接口返回的结构化数据，无需从页面DOM中抓取。
+            
+            Args:
+                mime_types: 需要捕获的mimeType关键字列表，默认 ["json"]
+                url_pattern: URL正则表达式，默认不限制
+                enabled: False 表示停止捕获（已捕获的数据保留）
+                
+            Returns:
+                str: 操作结果
+            """
+            try:
+                if not self.network_listener:
+                    return "请先连接浏览器"
+                if not enabled:
+                    return self.network_listener.disable_body_capture()
+
+                result = self.network_listener.enable_body_capture(mime_types, url_pattern)
+                # 响应体存储跨标签页复用
+                self.response_body_store = self.network_listener.body_store
+                return result
+            except Exception as e:
+                logger.error(f"设置响应体捕获失败: {e}")
+                return f"设置响应体捕获失败: {str(e)}"
+
+        @self.app.tool()
+        async def get_response_body(request_id: str, max_chars: int = 20000) -> str:
+            """按请求ID获取已捕获的响应体
+            
+            Args:
+                request_id: 请求ID（见 get_network_logs() 或 query_network_logs() 中的 request_id）
+                max_chars: 返回文本的最大字符数
+                
+            Returns:
+                str: JSON格式的响应体信息（url、mime_type、size、body 等）
+            """
+            try:
+                if not self.network_listener:
+                    return "请先连接浏览器"
+
+                entry = self.network_listener.get_response_body(request_id, max_chars)
+                if entry is None:
+                    return f"未捕获请求 {request_id} 的响应体，请确认已调用 enable_response_body_capture() 且过滤条件匹配"
+                return json.dumps(entry, ensure_ascii=False)
+            except Exception as e:
+                logger.error(f"获取响应体失败: {e}")
+                return f"获取响应体失败: {str(e)}"
+
+        @self.app.tool()
+        async def start_har_recording(file_path: str = None) -> str:
+            """开始录制HAR文件
+            
+            请求完成后立即以流的方式写入文件，适合长时间抓取后做离线分析。
+            调用 stop_har_recording() 结束录制并补全文件。
+            
+            Args:
+                file_path: HAR文件路径，默认保存到 ~/drissionpage_mcp/network/har/
+                
+            Returns:
+                str: 开始结果
+            """
+            try:
+                if not self.network_listener:
+                    return "请先连接浏览器"
+                return self.network_listener.start_har_recording(file_path)
+            except Exception as e:
+                logger.error(f"开始HAR录制失败: {e}")
+                return f"开始HAR录制失败: {str(e)}"
+
+        @self.app.tool()
+        async def stop_har_recording() -> str:
+            """停止录制HAR文件
+            
+            Returns:
+                str: JSON格式的结果（文件路径、条目数、未完成的请求数）
+            """
+            try:
+                if not self.network_listener:
+                    return "请先连接浏览器"
+                return json.dumps(self.network_listener.stop_har_recording(), ensure_ascii=False)
+            except Exception as e:
+                logger.error(f"停止HAR录制失败: {e}")
+                return f"停止HAR录制失败: {str(e)}"
+
+        @self.app.tool()
+        async def enable_stream_capture(url_pattern: str = None, opcodes: List[str] = None,
+                                        decode_json: bool = False, enabled: bool = True) -> str:
+            """启用或停止 WebSocket / EventSource 消息捕获
+            
+            页面通过 WebSocket 或 EventSource 推送的实时数据会按连接保存在定长缓冲区中，
+            之后用 get_stream_frames() 按游标读取新消息，无需反复抓取页面DOM。
+            建议在页面建立连接之前启用。
+            
+            Args:
+                url_pattern: 连接URL正则表达式，默认不限制
+                opcodes: 帧类型，可选 text、binary、close、ping、pong，默认 ["text", "binary"]
+                decode_json: 是否将文本消息解析为JSON
+                enabled: False 表示停止捕获（已捕获的消息保留）
+                
+            Returns:
+                str: 操作结果
+            """
+            try:
+                if not self.network_listener:
+                    return "请先连接浏览器"
+                if not enabled:
+                    return self.network_listener.disable_stream_capture()
+                return self.network_listener.enable_stream_capture(url_pattern, opcodes, decode_json)
+            except Exception as e:
+                logger.error(f"设置流式消息捕获失败: {e}")
+                return f"设置流式消息捕获失败: {str(e)}"
+
+        @self.app.tool()
+        async def get_stream_frames(cursor: int = 0, limit: int = 100, connection_id: str = None,
+                                    include_connections: bool = False) -> str:
+            """按游标增量获取 WebSocket / EventSource 消息
+            
+            Args:
+                cursor: 上次调用返回的游标，首次调用传 0
+                limit: 返回消息的最大数量
+                connection_id: 只返回该连接的消息
+                include_connections: 是否附带连接列表（URL、收发数量、是否关闭等）
+                
+            Returns:
+                str: JSON格式的结果（frames、cursor，可选 connections）
+            """
+            try:
+                if not self.network_listener:
+                    return "请先连接浏览器"
+                result = self.network_listener.get_stream_frames(cursor, limit, connection_id, include_connections)
+                return json.dumps(result, ensure_ascii=False)
+            except Exception as e:
+                logger.error(f"获取流式消息失败: {e}")
+                return f"获取流式消息失败: {str(e)}"
+
+        @self.app.tool()
+        async def query_network_logs(host: str = None, mime_type: str = None,
+                                     status_min: int = None, status_max: int = None,
+                                     url_contains: str = None, resource_type: str = None,
+                                     fields: List[str] = None, limit: int = 50, offset: int = 0,
+                                     tab_id: str = None) -> str:
+            """按条件查询已持久化的网络日志
+            
+            需要先调用 enable_network_monitoring(persist=True)。只返回匹配的行和指定字段，
+            适合在长时间抓取后按主机、类型、状态码筛选请求。
+            
+            Args:
+                host: 主机名（精确匹配，如 api.example.com）
+                mime_type: mimeType，支持 "image/*" 形式的前缀匹配
+                status_min: 最小状态码（如 400 查询失败请求）
+                status_max: 最大状态码
+                url_contains: URL包含的关键字
+                resource_type: 资源类型（如 XHR、Fetch、Document、Image）
+                fields: 返回字段，可选 id、tab_id、request_id、url、host、status、mime_type、
+                    resource_type、timestamp、timing、size、recorded_at，默认全部
+                limit: 每页条数（最多1000）
+                offset: 偏移量
+                tab_id: 标签页/目标ID（浏览器级监听记录的 target_id）
+                
+            Returns:
+                str: JSON格式的查询结果（total、rows 等）
+            """
+            try:
+                if not self.network_log_store:
+                    return "网络日志未持久化，请先调用 enable_network_monitoring(persist=True)"
+
+                filters = {
+                    "host": host,
+                    "mime_type": mime_type,
+                    "status_min": status_min,
+                    "status_max": status_max,
+                    "url_contains": url_contains,
+                    "resource_type": resource_type,
+                    "tab_id": tab_id
+                }
+                result = self.network_log_store.query(filters, fields, limit, offset)
+                return json.dumps(result, ensure_ascii=False)
+            except Exception as e:
+                logger.error(f"查询网络日志失败: {e}")
+                return f"查询网络日志失败: {str(e)}"
+
+        @self.app.tool()
+        async def start_browser_network_monitor(filter_types: List[str] = None, persist: bool = False,
+                                                hosts: List[str] = None, url_patterns: List[str] = None,
+                                                status_ranges: List[str] = None,
+                                                resource_types: List[str] = None) -> str:
+            """启动浏览器级网络监听
+            
+            监听所有标签页、弹窗以及跨进程iframe和worker的请求，每条记录带 target_id，
+            新打开的标签页自动加入，切换标签页后仍然有效。已在监听时调用会替换过滤条件。
+            
+            Args:
+                filter_types: mimeType 类型列表，为空时记录全部响应
+                persist: 是否同时写入网络日志数据库（可用 query_network_logs(tab_id=...) 按目标查询）
+                hosts: 只记录这些域名及其子域名的响应
+                url_patterns: URL正则表达式列表，匹配任一即可
+                status_ranges: 状态码条件，如 ["2xx", "404", "500-599"]
+                resource_types: 资源类型，如 ["XHR", "Fetch", "Document"]
+                
+            Returns:
+                str: 启动结果
+            """
+            try:
+                browser = self.browser_manager.browser if self.browser_manager else None
+                if not browser:
+                    return "请先连接浏览器"
+
+                # 浏览器重新连接后需要新的监听器
+                if self.browser_monitor is not None and self.browser_monitor.browser is not browser:
+                    self.browser_monitor.stop()
+                    self.browser_monitor = None
+                if self.browser_monitor is None:
+                    self.browser_monitor = BrowserNetworkMonitor(browser)
+                if persist:
+                    store = self._get_network_log_store()
+                    if store is None:
+                        return "网络日志数据库初始化失败"
+                    self.browser_monitor.log_store = store
+                return self.browser_monitor.start(filter_types, hosts, url_patterns, status_ranges, resource_types)
+            except Exception as e:
+                logger.error(f"启动浏览器级网络监听失败: {e}")
+                return f"启动浏览器级网络监听失败: {str(e)}"
+
+        @self.app.tool()
+        async def stop_browser_network_monitor() -> str:
+            """停止浏览器级网络监听，已收集的记录保留"""
+            if not self.browser_monitor:
+                return "浏览器级网络监听未启动"
+            return self.browser_monitor.stop()
+
+        @self.app.tool()
+        async def get_browser_network_logs(cursor: int = 0, limit: int = 50, target_id: str = None,
+                                           include_stats: bool = False) -> str:
+            """按游标增量获取浏览器级网络监听记录
+            
+            Args:
+                cursor: 上次调用返回的游标，首次调用传 0
+                limit: 返回数据的最大数量
+                target_id: 只返回该目标（标签页/弹窗）的记录
+                include_stats: 是否附带已附加的目标列表和按主机统计
+                
+            Returns:
+                str: JSON格式的结果（records、cursor、dropped，可选 stats）
+            """
+            try:
+                if not self.browser_monitor:
+                    return "浏览器级网络监听未启动，请先调用 start_browser_network_monitor()"
+
+                result = self.browser_monitor.get_records(cursor, limit, target_id)
+                if include_stats:
+                    result["stats"] = self.browser_monitor.get_stats()
+                return json.dumps(result, ensure_ascii=False)
+            except Exception as e:
+                logger.error(f"获取浏览器级网络记录失败: {e}")
+                return f"获取浏览器级网络记录失败: {str(e)}"
         
         # 文件操作工具
         @self.app.tool()
@@ -551,6 +1183,437 @@ class DrissionPageMCP:
             except Exception as e:
                 logger.error(f"执行CDP命令失败: {e}")
                 return f"执行CDP命令失败: {str(e)}"
+
+        @self.app.tool()
+        async def run_cdp_commands(commands: List[Dict[str, Any]], timeout: float = 10) -> str:
+            """批量执行多个CDP命令
+            
+            例如一次获取性能指标、Cookie、框架树和布局信息，减少工具调用次数。
+            命令按顺序逐条发送（驱动不支持多线程同时发送），单条命令失败或超时不影响其他命令。
+            
+            Args:
+                commands: 命令列表，如 [{"command": "Performance.getMetrics"},
+                    {"command": "Network.getCookies", "params": {"urls": ["https://example.com"]}, "timeout": 5}]
+                timeout: 默认的单条命令超时时间（秒）
+                
+            Returns:
+                str: JSON格式的结果（results 与输入顺序一致，total_ms）
+            """
+            try:
+                if not self.cdp_service:
+                    return "请先连接浏览器"
+                
+                result = await asyncio.to_thread(self.cdp_service.run_commands, commands, timeout)
+                return json.dumps(result, ensure_ascii=False, default=str)
+            except Exception as e:
+                logger.error(f"批量执行CDP命令失败: {e}")
+                return f"批量执行CDP命令失败: {str(e)}"
+
+        @self.app.tool()
+        async def get_cdp_domain_status() -> str:
+            """获取当前标签页CDP域的启用状态和使用者
+            
+            各功能按引用计数启用 Network、Fetch 等域，最后一个使用者释放时才禁用。
+            
+            Returns:
+                str: JSON格式的域状态（enabled、owners）和 enable/disable 命令统计
+            """
+            if not self.cdp_service:
+                return "请先连接浏览器"
+            return json.dumps(self.cdp_service.domains.get_stats(), ensure_ascii=False)
+
+        @self.app.tool()
+        async def listen_cdp_events(event_name: str, capacity: int = None, sample_rate: float = None,
+                                    spill: bool = None) -> str:
+            """收集指定的CDP事件
+            
+            内存中只保留最新的 capacity 条；高频事件可设置采样比例，需要完整记录时可开启落盘
+            （gzip压缩的JSONL分段文件）。对已在收集的事件再次调用会按新参数重建收集器。
+            
+            Args:
+                event_name: CDP事件名称（如 Runtime.consoleAPICalled、Network.dataReceived）
+                capacity: 内存中保留的事件数，默认 1000
+                sample_rate: 采样比例（0-1），如 0.1 表示每10条保留1条，默认 1
+                spill: 是否将保留的事件写入磁盘，之后可用 get_cdp_events() 读取超出内存容量的旧事件
+                
+            Returns:
+                str: 操作结果
+            """
+            try:
+                if not self.cdp_service:
+                    return "请先连接浏览器"
+                # 事件所属的域需要启用才会产生事件；没有 enable 命令的域忽略错误
+                try:
+                    self.cdp_service.domains.acquire(event_name.split(".")[0], "cdp_events")
+                except Exception:
+                    pass
+                return self.cdp_service.add_event_listener(event_name, capacity=capacity,
+                                                           sample_rate=sample_rate, spill=spill)
+            except Exception as e:
+                logger.error(f"收集CDP事件失败: {e}")
+                return f"收集CDP事件失败: {str(e)}"
+
+        @self.app.tool()
+        async def get_cdp_events(event_name: str, cursor: int = 0, limit: int = 100) -> str:
+            """按游标增量读取已收集的CDP事件
+            
+            Args:
+                event_name: CDP事件名称
+                cursor: 上次调用返回的游标，首次调用传 0
+                limit: 返回事件的最大数量
+                
+            Returns:
+                str: JSON格式的结果（events、cursor、missed）
+            """
+            try:
+                if not self.cdp_service:
+                    return "请先连接浏览器"
+                result = await asyncio.to_thread(self.cdp_service.get_events_since, event_name, cursor, limit)
+                return json.dumps(result, ensure_ascii=False, default=str)
+            except Exception as e:
+                logger.error(f"读取CDP事件失败: {e}")
+                return f"读取CDP事件失败: {str(e)}"
+
+        @self.app.tool()
+        async def set_cdp_profiling(enabled: bool = True, measure_payloads: bool = True, reset: bool = False) -> str:
+            """开启或关闭CDP往返耗时分析
+            
+            开启后记录每条CDP命令（包括 run_js 等内部调用）的耗时和请求/响应大小，
+            并归属到触发它的工具调用。关闭后已记录的数据保留。
+            
+            Args:
+                enabled: 是否开启
+                measure_payloads: 是否统计请求/响应的JSON大小（需要额外序列化一次）
+                reset: 是否清空已记录的数据
+                
+            Returns:
+                str: 操作结果
+            """
+            try:
+                if reset:
+                    cdp_profiler.reset()
+                if enabled:
+                    cdp_profiler.enable(measure_payloads)
+                    return "CDP耗时分析已开启" + ("，已清空旧数据" if reset else "")
+                cdp_profiler.disable()
+                return "CDP耗时分析已关闭" + ("，已清空旧数据" if reset else "")
+            except Exception as e:
+                logger.error(f"设置CDP耗时分析失败: {e}")
+                return f"设置CDP耗时分析失败: {str(e)}"
+
+        @self.app.tool()
+        async def get_cdp_profile(sort_by: str = "total_ms", limit: int = 30) -> str:
+            """获取CDP往返耗时分析报告
+            
+            Args:
+                sort_by: 方法表排序字段（count、total_ms、p95_ms、response_kb）
+                limit: 方法表和工具表的最大行数
+                
+            Returns:
+                str: JSON格式的报告（methods：按CDP方法的次数、耗时分位数和数据量；
+                    tools：按工具的调用次数、CDP往返次数与耗时及耗时最多的方法）
+            """
+            return json.dumps(cdp_profiler.get_report(sort_by, limit), ensure_ascii=False)
+
+        @self.app.tool()
+        async def dump_cdp_profile(file_path: str = None) -> str:
+            """将完整的CDP耗时分析报告保存为JSON文件
+            
+            Args:
+                file_path: 文件路径，默认保存到 ~/drissionpage_mcp/cdp/profiles/
+                
+            Returns:
+                str: 保存结果
+            """
+            try:
+                path = await asyncio.to_thread(cdp_profiler.dump, file_path)
+                return f"CDP耗时分析报告已保存: {path}"
+            except Exception as e:
+                logger.error(f"保存CDP耗时分析报告失败: {e}")
+                return f"保存CDP耗时分析报告失败: {str(e)}"
+
+        @self.app.tool()
+        async def start_tracing(categories: List[str] = None) -> str:
+            """开始性能追踪
+            
+            追踪期间进行需要分析的页面操作，然后调用 stop_tracing() 保存并查看摘要。
+            
+            Args:
+                categories: 追踪类别列表（如 ["devtools.timeline", "v8.execute"]），默认使用配置中的类别
+                
+            Returns:
+                str: 操作结果
+            """
+            try:
+                if not self.cdp_service:
+                    return "请先连接浏览器"
+                return self.cdp_service.start_tracing(categories)
+            except Exception as e:
+                logger.error(f"开始性能追踪失败: {e}")
+                return f"开始性能追踪失败: {str(e)}"
+
+        @self.app.tool()
+        async def stop_tracing(file_path: str = None, top: int = 10) -> str:
+            """结束性能追踪，保存追踪文件并生成摘要
+            
+            追踪数据分块读取并直接写入 gzip 文件，可在 Chrome DevTools 的 Performance 面板中加载。
+            
+            Args:
+                file_path: 保存路径（.json.gz），默认保存到 ~/drissionpage_mcp/cdp/traces/
+                top: 摘要中最长任务和脚本的数量
+                
+            Returns:
+                str: JSON格式的结果（file、size_mb、data_loss、truncated、summary：长任务、脚本执行、布局/样式/绘制耗时）
+            """
+            try:
+                if not self.cdp_service:
+                    return "请先连接浏览器"
+                result = await asyncio.to_thread(self.cdp_service.stop_tracing, file_path, top)
+                return json.dumps(result, ensure_ascii=False)
+            except Exception as e:
+                logger.error(f"结束性能追踪失败: {e}")
+                return f"结束性能追踪失败: {str(e)}"
+
+        @self.app.tool()
+        async def summarize_trace(file_path: str, top: int = 10) -> str:
+            """生成已有追踪文件的摘要
+            
+            Args:
+                file_path: 追踪文件路径（.json 或 .json.gz）
+                top: 最长任务和脚本的数量
+                
+            Returns:
+                str: JSON格式的摘要
+            """
+            try:
+                from .core.trace_summary import summarize_trace_file
+                result = await asyncio.to_thread(summarize_trace_file, file_path, top,
+                                                 get_config_value('cdp.long_task_ms', 50))
+                return json.dumps(result, ensure_ascii=False)
+            except Exception as e:
+                logger.error(f"生成追踪摘要失败: {e}")
+                return f"生成追踪摘要失败: {str(e)}"
+
+        # 覆盖率工具
+        @self.app.tool()
+        async def start_coverage(js: bool = True, css: bool = True) -> str:
+            """开始采集JS/CSS覆盖率
+            
+            之后执行需要分析的导航或操作序列，再调用 stop_coverage() 生成报告。
+            
+            Args:
+                js: 是否采集脚本的块级覆盖率
+                css: 是否采集样式规则使用情况
+                
+            Returns:
+                str: 操作结果
+            """
+            try:
+                if not self.cdp_service:
+                    return "请先连接浏览器"
+                return self.cdp_service.start_coverage(js, css)
+            except Exception as e:
+                logger.error(f"开始覆盖率采集失败: {e}")
+                return f"开始覆盖率采集失败: {str(e)}"
+
+        @self.app.tool()
+        async def stop_coverage(top: int = 20, include_anonymous: bool = False) -> str:
+            """结束覆盖率采集，返回未使用字节最多的脚本和样式表
+            
+            Args:
+                top: 返回的资源数量
+                include_anonymous: 是否包含没有URL的脚本（eval、扩展注入等）
+                
+            Returns:
+                str: JSON格式的报告（totals：按类型总计；resources：按未使用字节排序的资源，
+                    含 total_bytes、used_bytes、unused_bytes、unused_pct 和最大的未使用区间）
+            """
+            try:
+                if not self.cdp_service:
+                    return "请先连接浏览器"
+                result = await asyncio.to_thread(self.cdp_service.stop_coverage, top, include_anonymous)
+                return json.dumps(result, ensure_ascii=False)
+            except Exception as e:
+                logger.error(f"结束覆盖率采集失败: {e}")
+                return f"结束覆盖率采集失败: {str(e)}"
+
+        @self.app.tool()
+        async def collect_coverage(url: str = None, top: int = 20, throttling: str = None) -> str:
+            """采集一次页面加载的JS/CSS覆盖率
+            
+            开始采集后打开指定URL（为空时刷新当前页面），加载完成后结束采集并生成报告。
+            
+            Args:
+                url: 要打开的URL，为空时刷新当前页面
+                top: 返回的资源数量
+                throttling: 本次加载使用的限速方案，结束后恢复原设置
+                
+            Returns:
+                str: JSON格式的报告，格式同 stop_coverage()
+            """
+            try:
+                if not self.cdp_service:
+                    return "请先连接浏览器"
+                if url and not validate_url(url):
+                    return f"无效的URL: {url}"
+                scope = self.cdp_service.throttling.applied(throttling) if throttling else nullcontext()
+                with scope:
+                    message = self.cdp_service.start_coverage()
+                    if not message.startswith("覆盖率采集已开始"):
+                        return message
+                    tab = self.cdp_service.tab
+                    try:
+                        if url:
+                            await asyncio.to_thread(tab.get, url)
+                        else:
+                            await asyncio.to_thread(tab.refresh)
+                    finally:
+                        result = await asyncio.to_thread(self.cdp_service.stop_coverage, top)
+                return json.dumps(result, ensure_ascii=False)
+            except Exception as e:
+                logger.error(f"采集覆盖率失败: {e}")
+                return f"采集覆盖率失败: {str(e)}"
+
+        # 限速工具
+        @self.app.tool()
+        async def set_throttling(profile: str = None, latency_ms: float = None, download_kbps: float = None,
+                                 upload_kbps: float = None, cpu_rate: float = None, duration: float = None) -> str:
+            """对当前标签页同时设置网络与CPU限速，模拟慢速用户环境
+            
+            可用方案：slow-3g、fast-3g、fast-4g、offline、cpu-2x、cpu-4x、cpu-6x、
+            mobile（fast-3g + 4倍CPU降速）、low-end-mobile（slow-3g + 6倍CPU降速）。
+            限速只作用于当前标签页，新的设置替换旧设置；之后采集的指标、追踪和覆盖率报告会记录当前方案。
+            
+            Args:
+                profile: 方案名称
+                latency_ms: 自定义网络延迟（毫秒），覆盖方案中的值
+                download_kbps: 自定义下行速率（kbps）
+                upload_kbps: 自定义上行速率（kbps）
+                cpu_rate: CPU降速倍数（1 表示不降速）
+                duration: 自动恢复前的持续时间（秒），为空时一直生效直到调用 clear_throttling()
+                
+            Returns:
+                str: 操作结果
+            """
+            if not self.cdp_service:
+                return "请先连接浏览器"
+            return self.cdp_service.apply_throttling(profile, latency_ms, download_kbps, upload_kbps,
+                                                     cpu_rate, duration)
+
+        @self.app.tool()
+        async def clear_throttling() -> str:
+            """恢复当前标签页为不限速
+            
+            Returns:
+                str: 操作结果
+            """
+            if not self.cdp_service:
+                return "请先连接浏览器"
+            return self.cdp_service.clear_throttling()
+
+        @self.app.tool()
+        async def get_throttling_status() -> str:
+            """获取当前标签页的限速设置和可用方案
+            
+            Returns:
+                str: JSON格式的结果（active：当前设置，未限速时为 null；profiles：可用方案）
+            """
+            if not self.cdp_service:
+                return "请先连接浏览器"
+            return json.dumps(self.cdp_service.get_throttling_status(), ensure_ascii=False)
+
+        # 页面性能指标工具
+        @self.app.tool()
+        async def enable_page_metrics() -> str:
+            """在当前标签页安装页面性能观察器
+            
+            之后的每次导航都会在文档开始时记录 LCP、CLS、INP、FCP 和长任务；
+            当前页面会立即补装（已发生的 LCP、CLS 等条目同样能取到）。
+            
+            Returns:
+                str: 操作结果
+            """
+            if not self.page_metrics:
+                return "请先连接浏览器"
+            return self.page_metrics.install()
+
+        @self.app.tool()
+        async def collect_page_metrics(label: str = None, store: bool = True) -> str:
+            """采集当前页面的性能指标记录
+            
+            合并 Web Vitals（LCP、CLS、INP、FCP、长任务/TBT）、导航计时（TTFB、DOMContentLoaded、load）、
+            资源计时摘要和 Performance.getMetrics（JS堆、节点数、布局次数）。
+            
+            Args:
+                label: 运行标签（如版本号、分支名），用于区分不同批次
+                store: 是否追加到本地时间序列库
+                
+            Returns:
+                str: JSON格式的指标记录
+            """
+            try:
+                if not self.page_metrics:
+                    return "请先连接浏览器"
+                if not self.page_metrics.installed:
+                    self.page_metrics.install()
+                record = await asyncio.to_thread(self._collect_page_metrics, label, store)
+                return json.dumps(record, ensure_ascii=False)
+            except Exception as e:
+                logger.error(f"采集页面性能指标失败: {e}")
+                return f"采集页面性能指标失败: {str(e)}"
+
+        @self.app.tool()
+        async def query_page_metrics(url_contains: str = None, host: str = None, label: str = None,
+                                     limit: int = 20, throttling: str = None) -> str:
+            """按时间倒序查询已保存的页面性能指标
+            
+            Args:
+                url_contains: URL包含的子串
+                host: 主机名
+                label: 运行标签
+                limit: 返回数量上限
+                throttling: 限速方案名称，"none" 表示只查询未限速的记录
+                
+            Returns:
+                str: JSON格式的记录列表
+            """
+            try:
+                store = self._get_page_metrics_store()
+                if store is None:
+                    return "页面性能指标库不可用"
+                rows = store.query(url_contains=url_contains, host=host, label=label, limit=limit,
+                                   throttling=throttling)
+                return json.dumps(rows, ensure_ascii=False)
+            except Exception as e:
+                logger.error(f"查询页面性能指标失败: {e}")
+                return f"查询页面性能指标失败: {str(e)}"
+
+        @self.app.tool()
+        async def compare_page_metrics(url: str = None, host: str = None, label: str = None,
+                                       baseline_runs: int = None, throttling: str = None) -> str:
+            """将最新一次指标与同一URL、同一限速方案的历史中位数对比
+            
+            Args:
+                url: 完整URL，为空时取最新记录的URL
+                host: 主机名
+                label: 只在该运行标签内对比
+                baseline_runs: 基线使用的历史记录数，默认读取配置 metrics.baseline_runs
+                throttling: 只对比该限速方案下的记录（"none" 表示未限速），为空时取最新记录的方案
+                
+            Returns:
+                str: JSON格式的对比结果（metrics：current、baseline、change_pct；regressions：退化的指标）
+            """
+            try:
+                store = self._get_page_metrics_store()
+                if store is None:
+                    return "页面性能指标库不可用"
+                result = store.compare(url, host, label,
+                                       baseline_runs or get_config_value('metrics.baseline_runs', 10),
+                                       get_config_value('metrics.regression_pct', 20), throttling)
+                return json.dumps(result, ensure_ascii=False)
+            except Exception as e:
+                logger.error(f"对比页面性能指标失败: {e}")
+                return f"对比页面性能指标失败: {str(e)}"
     
     def _register_global_prompt(self):
         """注册全局提示词"""
@@ -605,6 +1668,18 @@ class DrissionPageMCP:
             
             import json
             return json.dumps(status, indent=2, ensure_ascii=False)
+
+        @self.app.resource("status://screenshots")
+        async def get_screenshot_status() -> str:
+            """获取截图保留策略与占用统计"""
+            if not self.screenshot_retention:
+                return "截图索引未初始化"
+            return json.dumps(self.screenshot_retention.get_stats(), indent=2, ensure_ascii=False)
+
+        @self.app.resource("status://cdp_profile")
+        async def get_cdp_profile_status() -> str:
+            """获取CDP往返耗时分析报告"""
+            return json.dumps(cdp_profiler.get_report(), indent=2, ensure_ascii=False)
     
     def _initialize_services(self):
         """初始化所有服务模块"""
@@ -616,16 +1691,82 @@ class DrissionPageMCP:
         # 初始化核心服务
         # 原因：修复新标签页切换bug，传入browser_manager以支持标签页自动切换，副作用：无，回滚策略：移除browser_manager参数
         self.element_handler = ElementHandler(tab, self.browser_manager)
-        self.network_listener = NetworkListener(tab)
+        # 网络日志数据库为全局资源，跨标签页复用
+        if self.network_log_store is None and get_config_value('network.persist_logs', False):
+            self._get_network_log_store()
+        # 原因：每次连接或新建标签页都会重新创建监听器，进行中的HAR录制、响应体和流式消息捕获无法再停止，
+        # HAR文件缺少结尾；改为按标签页复用，副作用：切回标签页时沿用其监听状态，回滚策略：还原为直接创建
+        self.network_listener = NetworkListener.for_tab(tab, self.network_log_store, self.response_body_store)
+        # 原因：重新创建的拦截器不知道标签页上已启用的 Fetch 拦截和事件订阅，拦截无法再关闭；
+        # 改为按标签页复用，副作用：切回标签页时沿用其拦截设置，回滚策略：还原为直接创建
+        self.request_blocker = RequestBlocker.for_tab(tab, self.network_listener)
+        self.network_replay = NetworkReplay.for_tab(tab, self.network_listener)
+        # 只在标签页尚未设置拦截时自动启用，不覆盖用户已有的设置
+        if get_config_value('browser.disable_images', False) and not self.request_blocker.active:
+            logger.info(self.request_blocker.apply(profiles=["no-images"]))
         self.file_handler = FileHandler(tab)
         
         # 初始化业务服务
         self.dom_service = DOMService(tab)
-        self.screenshot_service = ScreenshotService(tab)
+        # 截图索引与截图目录同为全局资源，跨标签页复用
+        if self.screenshot_retention is None:
+            try:
+                self.screenshot_retention = ScreenshotRetention()
+            except Exception as e:
+                logger.warning(f"截图索引初始化失败，将不做自动清理: {e}")
+        self.screenshot_service = ScreenshotService(tab, self.screenshot_retention, self.network_listener)
         self.cdp_service = CDPService(tab)
+        # 原因：重新创建的采集器丢失已注册脚本的 identifier，会重复注册且无法移除；改为按标签页复用，
+        # 副作用：无，回滚策略：还原为直接创建
+        self.page_metrics = PageMetricsCollector.for_tab(tab)
         
         logger.info("所有服务模块初始化完成")
     
+    def _get_network_log_store(self) -> Optional[NetworkLogStore]:
+        """获取网络日志数据库，首次使用时创建"""
+        if self.network_log_store is None:
+            try:
+                self.network_log_store = NetworkLogStore()
+            except Exception as e:
+                logger.warning(f"网络日志数据库初始化失败: {e}")
+        return self.network_log_store
+
+    def _get_page_metrics_store(self) -> Optional[PageMetricsStore]:
+        """获取页面性能指标库，首次使用时创建"""
+        if self.page_metrics_store is None:
+            try:
+                self.page_metrics_store = PageMetricsStore()
+            except Exception as e:
+                logger.warning(f"页面性能指标库初始化失败: {e}")
+        return self.page_metrics_store
+
+    def _collect_page_metrics(self, label: Optional[str] = None, store: bool = True) -> Dict[str, Any]:
+        """采集当前页面的指标记录，按配置追加到时间序列库"""
+        record = self.page_metrics.collect(get_config_value('metrics.max_slowest_resources', 5))
+        if store and get_config_value('metrics.persist', True):
+            metrics_store = self._get_page_metrics_store()
+            if metrics_store is not None:
+                record["id"] = metrics_store.add(record, label)
+        return record
+
+    @staticmethod
+    def _compact_metrics(record: Dict[str, Any]) -> Dict[str, Any]:
+        """导航结果中附带的精简指标"""
+        navigation = record.get("navigation") or {}
+        cdp = record.get("cdp") or {}
+        return {
+            "throttling": record.get("throttling"),
+            "lcp_ms": record.get("lcp_ms"),
+            "cls": record.get("cls"),
+            "inp_ms": record.get("inp_ms"),
+            "tbt_ms": record.get("tbt_ms"),
+            "ttfb_ms": navigation.get("ttfb_ms"),
+            "load_ms": navigation.get("load_ms"),
+            "resources": (record.get("resources") or {}).get("count"),
+            "js_heap_used_mb": cdp.get("js_heap_used_mb"),
+            "nodes": cdp.get("nodes")
+        }
+
     def run(self):
         """运行MCP服务器"""
         try:
@@ -636,6 +1777,17 @@ class DrissionPageMCP:
             logger.info("服务器已停止")
         except Exception as e:
             logger.error(f"服务器运行错误: {e}")
+        finally:
+            # 原因：连接的可能是用户自己的浏览器，退出后不应保持降速状态，副作用：无，回滚策略：移除此调用
+            try:
+                ThrottlingManager.restore_all()
+            except Exception:
+                pass
+            # 进行中的HAR录制写出结尾，避免留下无效的JSON文件
+            try:
+                NetworkListener.close_all()
+            except Exception:
+                pass
 
 
 def main():
@@ -3,10 +3,12 @@
 
 from .dom_service import DOMService
 from .screenshot_service import ScreenshotService
+from .screenshot_retention import ScreenshotRetention
 from .cdp_service import CDPService
 
 __all__ = [
     "DOMService",
     "ScreenshotService",
+    "ScreenshotRetention",
     "CDPService"
 ]
\ No newline at end of file
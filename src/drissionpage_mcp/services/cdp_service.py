@@ -4,8 +4,18 @@
 负责Chrome DevTools Protocol相关功能。
 """
 
+import base64
+import gzip
+import threading
+import time
 from typing import Dict, Any, List, Optional, Callable
 from DrissionPage import Chromium
+from ..core.domain_manager import CDPDomainManager
+from ..core.event_collector import EventCollector
+from ..core.coverage import build_coverage_report, css_used_ranges, js_used_ranges, resource_usage
+from ..core.event_bus import CDPEventBus
+from ..core.throttling import ThrottlingManager, THROTTLING_PROFILES
+from ..core.trace_summary import summarize_trace_file
 
 
 class CDPService:
@@ -16,8 +26,22 @@ class CDPService:
     
     def __init__(self, tab):
         self.tab = tab
+        # 与网络监听等组件共享标签页的事件总线，添加监听器不会覆盖其他组件的回调
+        self.event_bus = CDPEventBus.for_tab(tab)
+        # 域的启用状态按标签页缓存并引用计数，与网络监听等组件共享
+        self.domains = CDPDomainManager.for_tab(tab)
+        # 限速状态按标签页保存，切换标签页后重新创建服务不会丢失
+        self.throttling = ThrottlingManager.for_tab(tab)
         self.event_listeners: Dict[str, List[Callable]] = {}
-        self.collected_events: Dict[str, List[Dict[str, Any]]] = {}
+        # 原因：原先每个事件一个无限增长的列表，高频事件会持续占用内存；改为定长收集器，
+        # 副作用：超出容量的旧事件只能从落盘分段读取（未落盘时丢弃），回滚策略：还原为列表
+        self.collected_events: Dict[str, EventCollector] = {}
+        self._spill_root = None
+        self._collector_generation = 0
+        # 进行中的性能追踪：categories、started、complete（threading.Event）、stream、data_loss
+        self._tracing: Optional[Dict[str, Any]] = None
+        # 进行中的覆盖率采集：js、css、started、sheets（样式表ID -> 头信息）
+        self._coverage: Optional[Dict[str, Any]] = None
     
     def run_command(self, command: str, **params) -> Any:
         """执行CDP命令
@@ -31,10 +55,47 @@ class CDPService:
         """
         try:
             result = self.tab.run_cdp(command, **params)
+            # 直接发送的 enable/disable 命令同步到域状态缓存
+            self.domains.note_command(command)
             return result
         except Exception as e:
             return {"error": f"CDP命令执行失败: {str(e)}"}
     
+    def run_commands(self, commands: List[Dict[str, Any]], timeout: float = 10) -> Dict[str, Any]:
+        """批量执行多个CDP命令
+
+        一次调用执行多条命令，减少工具调用往返；单条命令失败或超时不影响其他命令。
+        命令按顺序逐条发送：DrissionPage 驱动分配请求ID（_cur_id += 1）不是原子操作，
+        多个线程同时发送可能得到相同的ID，导致结果串号或一直等到超时，因此不在线程池中并发发送，
+        总耗时为各条命令耗时之和。
+
+        Args:
+            commands: 命令列表，每项为 {"command": 名称, "params": 参数, "timeout": 超时秒数}，
+                params 和 timeout 可省略
+            timeout: 默认的单条命令超时时间（秒）
+
+        Returns:
+            dict: results（与输入顺序一致，每项含 command、ok、result 或 error、elapsed_ms）和 total_ms
+        """
+        started = time.perf_counter()
+        results = []
+        for item in commands:
+            command = item.get("command") or item.get("method")
+            if not command:
+                results.append({"command": None, "ok": False, "error": "缺少 command 字段"})
+                continue
+            begin = time.perf_counter()
+            try:
+                # _timeout 由 DrissionPage 驱动解析，超时后返回错误而不是一直等待
+                result = self.tab.run_cdp(command, _timeout=float(item.get("timeout") or timeout),
+                                          **dict(item.get("params") or {}))
+                results.append({"command": command, "ok": True, "result": result,
+                                "elapsed_ms": round((time.perf_counter() - begin) * 1000, 1)})
+            except Exception as e:
+                results.append({"command": command, "ok": False, "error": str(e),
+                                "elapsed_ms": round((time.perf_counter() - begin) * 1000, 1)})
+        return {"results": results, "total_ms": round((time.perf_counter() - started) * 1000, 1)}
+
     def enable_domain(self, domain: str) -> str:
         """启用CDP域
         
@@ -44,8 +105,10 @@ class CDPService:
         Returns:
             str: 启用结果
         """
+        # 原因：重复启用会产生多余的往返，改由域管理器引用计数并跳过已启用的域，
+        # 副作用：无，回滚策略：还原为直接发送 enable 命令
         try:
-            self.run_command(f"{domain}.enable")
+            self.domains.acquire(domain, "cdp_service")
             return f"{domain} 域启用成功"
         except Exception as e:
             return f"启用 {domain} 域失败: {str(e)}"
@@ -59,60 +122,128 @@ class CDPService:
         Returns:
             str: 禁用结果
         """
+        # 原因：直接禁用会中断仍在使用该域的其他功能（如网络监听），改为释放引用，
+        # 副作用：其他功能仍在使用时域保持启用，回滚策略：还原为直接发送 disable 命令
         try:
-            self.run_command(f"{domain}.disable")
+            self.domains.release(domain, "cdp_service")
+            owners = self.domains.owners(domain)
+            if owners:
+                return f"{domain} 域仍被其他功能使用，保持启用: {sorted(owners)}"
+            # 域管理器只禁用自己登记过的域；没有使用者但已启用（如通过 run_cdp_command 直接启用）时直接禁用
+            if self.domains.is_enabled(domain):
+                self.tab.run_cdp(f"{domain}.disable")
+                self.domains.note_command(f"{domain}.disable")
             return f"{domain} 域禁用成功"
         except Exception as e:
             return f"禁用 {domain} 域失败: {str(e)}"
     
-    def add_event_listener(self, event_name: str, callback: Optional[Callable] = None) -> str:
+    def add_event_listener(self, event_name: str, callback: Optional[Callable] = None,
+                           capacity: Optional[int] = None, sample_rate: Optional[float] = None,
+                           spill: Optional[bool] = None) -> str:
         """添加事件监听器
         
         Args:
             event_name: 事件名称
             callback: 回调函数，如果不提供则使用默认收集器
+            capacity: 默认收集器在内存中保留的事件数
+            sample_rate: 默认收集器的采样比例（0-1）
+            spill: 默认收集器是否将事件写入磁盘（gzip JSONL 分段）
             
         Returns:
             str: 添加结果
         """
         try:
             if callback is None:
-                # 使用默认收集器
+                # 同一事件只注册一个默认收集器，再次调用时按新参数重建收集器
+                subscribed = event_name in self.collected_events
+                self._create_collector(event_name, capacity, sample_rate, spill)
+                if subscribed:
+                    return f"事件收集器 {event_name} 已更新"
+
                 def default_callback(**event_data):
-                    if event_name not in self.collected_events:
-                        self.collected_events[event_name] = []
-                    self.collected_events[event_name].append({
-                        "timestamp": event_data.get("timestamp", ""),
-                        "data": event_data
-                    })
+                    collector = self.collected_events.get(event_name)
+                    if collector is not None:
+                        collector.add(event_data)
                 callback = default_callback
             
-            # 注册回调
-            self.tab.driver.set_callback(event_name, callback)
-            
             # 记录监听器
             if event_name not in self.event_listeners:
                 self.event_listeners[event_name] = []
             self.event_listeners[event_name].append(callback)
+
+            # 通过事件总线注册，同一事件的多个监听器都会收到事件；在独立线程中处理
+            key = f"cdp_service:{event_name}:{len(self.event_listeners[event_name])}"
+            self.event_bus.subscribe(event_name, callback, key, queue_size=10000)
             
             return f"事件监听器 {event_name} 添加成功"
         except Exception as e:
             return f"添加事件监听器失败: {str(e)}"
     
-    def get_collected_events(self, event_name: Optional[str] = None) -> Dict[str, Any]:
-        """获取收集到的事件数据
+    def _create_collector(self, event_name: str, capacity: Optional[int],
+                          sample_rate: Optional[float], spill: Optional[bool]) -> EventCollector:
+        """创建（或按新参数替换）事件收集器，未指定的参数沿用原收集器或配置"""
+        from datetime import datetime
+        from ..config.settings import get_config_value, get_cdp_directory
+
+        old = self.collected_events.get(event_name)
+        if old is not None and capacity is None and sample_rate is None and spill is None:
+            return old
+        if capacity is None:
+            capacity = old.buffer.capacity if old else get_config_value('cdp.event_capacity', 1000)
+        if sample_rate is None:
+            sample_rate = old.sample_rate if old else 1.0
+        if spill is None:
+            spill = old is not None and old.spill_dir is not None
+
+        spill_dir = None
+        if spill:
+            if self._spill_root is None:
+                self._spill_root = get_cdp_directory() / "events" / datetime.now().strftime("%Y%m%d_%H%M%S")
+            # 每个收集器一个子目录，重建收集器后序号从 0 开始也不会覆盖旧分段
+            self._collector_generation += 1
+            spill_dir = self._spill_root / f"{event_name}.{self._collector_generation}"
+        collector = EventCollector(
+            event_name, capacity, sample_rate, spill_dir,
+            segment_events=get_config_value('cdp.event_segment_events', 10000),
+            max_spill_mb=get_config_value('cdp.event_spill_max_mb', 200)
+        )
+        self.collected_events[event_name] = collector
+        if old is not None:
+            old.close()
+        return collector
+
+    def get_collected_events(self, event_name: Optional[str] = None, limit: Optional[int] = None) -> Dict[str, Any]:
+        """获取收集到的事件数据（内存中最新的部分）
         
         Args:
             event_name: 事件名称，如果不指定则返回所有事件
+            limit: 每个事件返回的最大条数
             
         Returns:
             dict: 事件数据
         """
         if event_name:
+            collector = self.collected_events.get(event_name)
             return {
-                event_name: self.collected_events.get(event_name, [])
+                event_name: collector.tail(limit) if collector is not None else []
             }
-        return self.collected_events
+        return {name: collector.tail(limit) for name, collector in self.collected_events.items()}
+
+    def get_events_since(self, event_name: str, cursor: int = 0, limit: int = 100) -> Dict[str, Any]:
+        """按游标增量读取某个事件的收集数据（早于内存缓冲区的部分从落盘分段读取）
+        
+        Args:
+            event_name: 事件名称
+            cursor: 上次调用返回的游标，首次调用传 0
+            limit: 返回事件的最大数量
+            
+        Returns:
+            dict: 事件列表、下次调用使用的游标和无法读取（已丢弃）的条数
+        """
+        collector = self.collected_events.get(event_name)
+        if collector is None:
+            return {"events": [], "cursor": cursor, "missed": 0, "error": f"事件 {event_name} 未在收集"}
+        return collector.since(cursor, limit)
     
     def clear_collected_events(self, event_name: Optional[str] = None) -> str:
         """清空收集到的事件数据
@@ -123,14 +254,16 @@ class CDPService:
         Returns:
             str: 清空结果
         """
+        # 只清空内存缓冲区，收集器和落盘分段保留，已有游标仍然有效
         if event_name:
             if event_name in self.collected_events:
-                del self.collected_events[event_name]
+                self.collected_events[event_name].clear()
                 return f"事件 {event_name} 的数据已清空"
             else:
                 return f"事件 {event_name} 不存在"
         else:
-            self.collected_events.clear()
+            for collector in self.collected_events.values():
+                collector.clear()
             return "所有事件数据已清空"
     
     def get_event_stats(self) -> Dict[str, Any]:
@@ -142,14 +275,288 @@ class CDPService:
         stats = {
             "total_events": len(self.collected_events),
             "event_counts": {},
-            "active_listeners": list(self.event_listeners.keys())
+            "active_listeners": list(self.event_listeners.keys()),
+            "event_bus": self.event_bus.get_stats(),
+            "collectors": {}
         }
         
-        for event_name, events in self.collected_events.items():
-            stats["event_counts"][event_name] = len(events)
+        for event_name, collector in self.collected_events.items():
+            stats["event_counts"][event_name] = len(collector.buffer)
+            stats["collectors"][event_name] = collector.get_stats()
         
         return stats
     
+    # Tracing 域相关方法
+    def start_tracing(self, categories: Optional[List[str]] = None) -> str:
+        """开始性能追踪
+
+        追踪数据保存在浏览器端，结束时以流的方式返回，不经过事件传输。
+
+        Args:
+            categories: 追踪类别列表，默认使用配置 cdp.trace_categories
+
+        Returns:
+            str: 启动结果
+        """
+        from ..config.settings import get_config_value
+
+        if self._tracing is not None:
+            return "性能追踪已在进行中，请先调用 stop_tracing()"
+        categories = list(categories or get_config_value('cdp.trace_categories', []))
+        tracing = {"categories": categories, "started": time.time(), "complete": threading.Event(),
+                   "stream": None, "data_loss": False, "throttling": self.throttling.active_name}
+
+        def on_complete(**event):
+            tracing["stream"] = event.get("stream")
+            tracing["data_loss"] = bool(event.get("dataLossOccurred"))
+            tracing["complete"].set()
+            if tracing.get("abandoned"):
+                # stop_tracing 已超时返回，迟到的数据流不再读取，关闭浏览器端的句柄
+                self._discard_trace_stream(tracing)
+
+        try:
+            self.event_bus.subscribe("Tracing.tracingComplete", on_complete, "cdp_service:tracing")
+            self.tab.run_cdp("Tracing.start",
+                             traceConfig={"recordMode": "recordAsMuchAsPossible",
+                                          "includedCategories": categories},
+                             transferMode="ReturnAsStream", streamFormat="json", streamCompression="gzip")
+            self._tracing = tracing
+            return f"性能追踪已开始，类别: {', '.join(categories) or '默认'}"
+        except Exception as e:
+            self.event_bus.unsubscribe("Tracing.tracingComplete", "cdp_service:tracing")
+            return f"开始性能追踪失败: {str(e)}"
+
+    def stop_tracing(self, file_path: Optional[str] = None, top: int = 10,
+                     timeout: float = 60) -> Dict[str, Any]:
+        """结束性能追踪，将追踪数据分块写入 gzip 文件并生成摘要
+
+        Args:
+            file_path: 保存路径，默认保存到CDP数据目录的 traces 子目录
+            top: 摘要中最长任务和脚本的数量
+            timeout: 等待浏览器完成追踪数据收集的超时时间（秒）
+
+        Returns:
+            dict: 文件路径、大小、是否有数据丢失、是否被截断和摘要；
+                读取数据流中途失败时保留已写入的部分并标记 truncated
+        """
+        from datetime import datetime
+        from pathlib import Path
+        from ..config.settings import get_config_value, get_cdp_directory
+
+        tracing = self._tracing
+        if tracing is None:
+            return {"error": "没有进行中的性能追踪"}
+        self._tracing = None
+        # 原因：等待超时后取消订阅，浏览器稍后返回的数据流句柄无人关闭；改为保留订阅，
+        # 数据流到达时关闭句柄，副作用：无，回滚策略：恢复在 finally 中取消订阅
+        try:
+            self.tab.run_cdp("Tracing.end")
+            if not tracing["complete"].wait(timeout):
+                tracing["abandoned"] = True
+                if tracing["complete"].is_set():
+                    self._discard_trace_stream(tracing)
+                return {"error": f"等待追踪数据超时（{timeout}秒），数据到达后将被丢弃"}
+        except Exception as e:
+            self.event_bus.unsubscribe("Tracing.tracingComplete", "cdp_service:tracing")
+            return {"error": f"结束性能追踪失败: {str(e)}"}
+        self.event_bus.unsubscribe("Tracing.tracingComplete", "cdp_service:tracing")
+        if not tracing["stream"]:
+            return {"error": "浏览器未返回追踪数据流"}
+
+        if not file_path:
+            file_path = get_cdp_directory() / "traces" / f"trace_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json.gz"
+        path = Path(file_path)
+        if not path.name.endswith(".gz"):
+            path = path.with_name(path.name + ".gz")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            truncated = self._read_stream_to_file(tracing["stream"], path,
+                                                  int(get_config_value('cdp.trace_chunk_kb', 1024)) * 1024)
+            if truncated and not path.exists():
+                return {"error": f"保存追踪数据失败: {truncated}"}
+            # 截断的文件同样可以解析，摘要只包含已读取部分
+            summary = summarize_trace_file(path, top, get_config_value('cdp.long_task_ms', 50))
+        except Exception as e:
+            return {"error": f"保存追踪数据失败: {str(e)}", "file": str(path)}
+        result = {
+            "file": str(path),
+            "size_mb": round(path.stat().st_size / 1024 / 1024, 2),
+            "recorded_s": round(time.time() - tracing["started"], 1),
+            "categories": tracing["categories"],
+            "data_loss": tracing["data_loss"],
+            "truncated": bool(truncated),
+            "throttling": tracing["throttling"],
+            "summary": summary
+        }
+        if truncated:
+            result["truncated_reason"] = truncated
+        return result
+
+    def _discard_trace_stream(self, tracing: Dict[str, Any]) -> None:
+        """关闭不再读取的追踪数据流并取消订阅（只执行一次）"""
+        stream = tracing.pop("stream", None)
+        self.event_bus.unsubscribe("Tracing.tracingComplete", "cdp_service:tracing")
+        if stream:
+            try:
+                self.tab.run_cdp("IO.close", handle=stream)
+            except Exception:
+                pass
+
+    def _read_stream_to_file(self, handle: str, path, chunk_size: int) -> Optional[str]:
+        """用 IO.read 分块读取数据流写入 gzip 文件，内存中每次只有一块数据
+
+        浏览器按请求压缩时原样写入，未压缩（旧版本浏览器忽略 streamCompression）时边读边压缩。
+        无论是否读完，结束时都会用 IO.close 关闭数据流。
+
+        Returns:
+            str: 读取中途失败（如 IO.read 超时）时的原因，已读取的数据保留在文件中；读完时返回 None
+        """
+        output = None
+        try:
+            while True:
+                try:
+                    chunk = self.tab.run_cdp("IO.read", handle=handle, size=chunk_size)
+                except Exception as e:
+                    return f"读取追踪数据中断: {str(e)}"
+                data = chunk.get("data", "")
+                raw = base64.b64decode(data) if chunk.get("base64Encoded") else data.encode("utf-8")
+                if output is None:
+                    if raw[:2] == b"\x1f\x8b":
+                        output = open(path, "wb")
+                    else:
+                        output = gzip.open(path, "wb", compresslevel=6)
+                if raw:
+                    output.write(raw)
+                if chunk.get("eof"):
+                    return None
+        finally:
+            if output is not None:
+                output.close()
+            try:
+                self.tab.run_cdp("IO.close", handle=handle)
+            except Exception:
+                pass
+
+    # 覆盖率相关方法
+    def start_coverage(self, js: bool = True, css: bool = True) -> str:
+        """开始采集JS/CSS覆盖率
+
+        Args:
+            js: 是否采集脚本的块级覆盖率（Profiler.startPreciseCoverage）
+            css: 是否采集样式规则使用情况（CSS.startRuleUsageTracking）
+
+        Returns:
+            str: 启动结果
+        """
+        if self._coverage is not None:
+            return "覆盖率采集已在进行中，请先调用 stop_coverage()"
+        if not js and not css:
+            return "js 和 css 至少需要开启一项"
+        coverage = {"js": js, "css": css, "started": time.time(), "sheets": {}}
+
+        def on_style_sheet_added(**event):
+            header = event.get("header", {})
+            if header.get("styleSheetId"):
+                coverage["sheets"][header["styleSheetId"]] = header
+
+        try:
+            if js:
+                self.domains.acquire("Profiler", "coverage")
+                # 获取脚本源码需要启用 Debugger，跳过页面中的 debugger 语句，避免页面被暂停
+                self.domains.acquire("Debugger", "coverage")
+                self.tab.run_cdp("Debugger.setSkipAllPauses", skip=True)
+                self.tab.run_cdp("Profiler.startPreciseCoverage", callCount=False, detailed=True)
+            if css:
+                # 首次启用 CSS 域时浏览器会为已有样式表补发 styleSheetAdded，需先订阅
+                self.event_bus.subscribe("CSS.styleSheetAdded", on_style_sheet_added, "cdp_service:coverage")
+                self.domains.acquire("CSS", "coverage")
+                self.tab.run_cdp("CSS.startRuleUsageTracking")
+            self._coverage = coverage
+            return f"覆盖率采集已开始（{'、'.join(k for k in ('js', 'css') if coverage[k])}）"
+        except Exception as e:
+            self._release_coverage(coverage)
+            return f"开始覆盖率采集失败: {str(e)}"
+
+    def _release_coverage(self, coverage: Dict[str, Any]) -> None:
+        if coverage["js"]:
+            self.domains.release("Profiler", "coverage")
+            self.domains.release("Debugger", "coverage")
+        if coverage["css"]:
+            self.event_bus.unsubscribe("CSS.styleSheetAdded", "cdp_service:coverage")
+            self.domains.release("CSS", "coverage")
+
+    def _fetch_sources(self, command: str, id_field: str, ids: List[str], result_field: str) -> Dict[str, str]:
+        """获取每个资源的源码，每个资源只获取一次"""
+        unique_ids = list(dict.fromkeys(ids))
+        results = self.run_commands([{"command": command, "params": {id_field: resource_id}}
+                                     for resource_id in unique_ids], timeout=30)["results"]
+        return {resource_id: result["result"].get(result_field, "")
+                for resource_id, result in zip(unique_ids, results) if result.get("ok")}
+
+    def stop_coverage(self, top: int = 20, include_anonymous: bool = False) -> Dict[str, Any]:
+        """结束覆盖率采集并生成按未使用字节排序的报告
+
+        Args:
+            top: 返回的资源数量
+            include_anonymous: 是否包含没有URL的脚本（eval、扩展注入等）
+
+        Returns:
+            dict: 按类型的总计和未使用字节最多的资源
+        """
+        coverage = self._coverage
+        if coverage is None:
+            return {"error": "没有进行中的覆盖率采集"}
+        self._coverage = None
+        entries: List[Dict[str, Any]] = []
+        try:
+            if coverage["js"]:
+                scripts = self.tab.run_cdp("Profiler.takePreciseCoverage").get("result", [])
+                self.tab.run_cdp("Profiler.stopPreciseCoverage")
+                scripts = [script for script in scripts if script.get("url") or include_anonymous]
+                sources = self._fetch_sources("Debugger.getScriptSource", "scriptId",
+                                              [script["scriptId"] for script in scripts], "scriptSource")
+                for script in scripts:
+                    source = sources.get(script["scriptId"])
+                    if source is None:
+                        continue
+                    entries.append({"type": "js", "url": script.get("url") or "(anonymous)",
+                                    **resource_usage(source, js_used_ranges(script.get("functions", [])))})
+            if coverage["css"]:
+                rule_usage = self.tab.run_cdp("CSS.stopRuleUsageTracking").get("ruleUsage", [])
+                used = css_used_ranges(rule_usage)
+                texts = self._fetch_sources("CSS.getStyleSheetText", "styleSheetId", list(used), "text")
+                for sheet_id, ranges in used.items():
+                    text = texts.get(sheet_id)
+                    if text is None:
+                        continue
+                    header = coverage["sheets"].get(sheet_id, {})
+                    url = header.get("sourceURL") or f"(stylesheet {sheet_id})"
+                    if header.get("isInline"):
+                        url += " (inline)"
+                    entries.append({"type": "css", "url": url, **resource_usage(text, ranges)})
+        except Exception as e:
+            return {"error": f"结束覆盖率采集失败: {str(e)}"}
+        finally:
+            self._release_coverage(coverage)
+        report = build_coverage_report(entries, top, time.time() - coverage["started"])
+        report["throttling"] = self.throttling.active_name
+        return report
+
+    # 限速相关方法
+    def apply_throttling(self, profile: Optional[str] = None, latency_ms: Optional[float] = None,
+                         download_kbps: Optional[float] = None, upload_kbps: Optional[float] = None,
+                         cpu_rate: Optional[float] = None, duration: Optional[float] = None) -> str:
+        """对当前标签页应用网络与CPU限速方案，参数见 ThrottlingManager.apply"""
+        return self.throttling.apply(profile, latency_ms, download_kbps, upload_kbps, cpu_rate, duration)
+
+    def clear_throttling(self) -> str:
+        """恢复当前标签页为不限速"""
+        return self.throttling.restore()
+
+    def get_throttling_status(self) -> Dict[str, Any]:
+        """获取当前限速设置和可用方案"""
+        return {"active": self.throttling.describe(), "profiles": THROTTLING_PROFILES}
+
     # Network 域相关方法
     def enable_network_monitoring(self) -> str:
         """启用网络监控
@@ -343,15 +750,7 @@ class CDPService:
         Returns:
             dict: 域状态信息
         """
-        domains = ["Network", "Runtime", "Page", "Security", "DOM", "CSS"]
-        status = {}
-        
-        for domain in domains:
-            try:
-                # 尝试获取域信息来判断是否启用
-                result = self.run_command(f"{domain}.enable")
-                status[domain] = not isinstance(result, dict) or "error" not in result
-            except:
-                status[domain] = False
-        
-        return status
\ No newline at end of file
+        # 原因：原实现对每个域发送 enable 命令来“探测”状态，会意外启用所有域；
+        # 改为读取域管理器缓存的状态，不发送命令，副作用：未经本服务启用的域显示为 False，回滚策略：还原探测逻辑
+        domains = ["Network", "Runtime", "Page", "Security", "DOM", "CSS", "Fetch"]
+        return self.domains.status(domains)
\ No newline at end of file
@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+"""截图保留策略模块
+
+基于SQLite索引记录截图文件，按数量、总大小、时间增量清理旧截图。
+"""
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+
+class ScreenshotRetention:
+    """截图保留管理器
+
+    每次截图后追加一条索引记录（路径、大小、修改时间），并在超出
+    max_files / max_total_mb / max_age_days 限制时按时间顺序淘汰最旧的文件。
+    淘汰只读取需要删除的索引行，不再扫描整个目录。
+    """
+
+    def __init__(self,
+                 base_dir: Optional[Path] = None,
+                 max_files: Optional[int] = None,
+                 max_total_mb: Optional[float] = None,
+                 max_age_days: Optional[float] = None,
+                 auto_cleanup: Optional[bool] = None):
+        from ..config.settings import get_config_value, get_screenshots_directory
+
+        self.base_dir = Path(base_dir) if base_dir else get_screenshots_directory()
+        self.max_files = max_files if max_files is not None else get_config_value('screenshot.max_files', 100)
+        self.max_total_mb = (max_total_mb if max_total_mb is not None
+                             else get_config_value('screenshot.max_total_mb', 0))
+        self.max_age_days = (max_age_days if max_age_days is not None
+                             else get_config_value('screenshot.max_age_days', 0))
+        self.auto_cleanup = (auto_cleanup if auto_cleanup is not None
+                             else get_config_value('screenshot.auto_cleanup', True))
+
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+        self.db_path = self.base_dir / "screenshot_index.db"
+        self._lock = threading.Lock()
+
+        is_new = not self.db_path.exists()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS captures (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                path TEXT UNIQUE NOT NULL,
+                size INTEGER NOT NULL,
+                mtime REAL NOT NULL
+            )
+        ''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_captures_mtime ON captures (mtime)')
+        self._conn.commit()
+
+        # 计数与总大小常驻内存，避免每次截图后重新聚合
+        row = self._conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM captures').fetchone()
+        self._count, self._total_bytes = int(row[0]), int(row[1])
+        self._evicted_count = 0
+        self._evicted_bytes = 0
+
+        if is_new:
+            # 首次建立索引时导入已有截图，只执行一次
+            self.rebuild_index()
+
+    @property
+    def max_total_bytes(self) -> int:
+        """总大小上限（字节），0表示不限制"""
+        return int((self.max_total_mb or 0) * 1024 * 1024)
+
+    def manages(self, file_path: str) -> bool:
+        """判断文件是否位于受管理的截图目录中
+
+        Args:
+            file_path: 文件路径
+
+        Returns:
+            bool: 是否受管理
+        """
+        try:
+            Path(file_path).resolve().relative_to(self.base_dir.resolve())
+            return True
+        except (ValueError, OSError):
+            return False
+
+    def record(self, file_path: str) -> Dict[str, Any]:
+        """记录一次截图，并按需增量清理
+
+        Args:
+            file_path: 截图文件路径
+
+        Returns:
+            dict: 本次清理结果
+        """
+        path = Path(file_path)
+        try:
+            stat = path.stat()
+        except OSError:
+            return {"evicted_count": 0, "evicted_files": []}
+
+        with self._lock:
+            key = str(path.resolve())
+            previous = self._conn.execute('SELECT id, size FROM captures WHERE path = ?', (key,)).fetchone()
+            if previous:
+                # 同名覆盖：移除旧记录，重新追加到队尾
+                self._conn.execute('DELETE FROM captures WHERE id = ?', (previous[0],))
+                self._count -= 1
+                self._total_bytes -= previous[1]
+
+            self._conn.execute('INSERT INTO captures (path, size, mtime) VALUES (?, ?, ?)',
+                               (key, stat.st_size, stat.st_mtime))
+            self._count += 1
+            self._total_bytes += stat.st_size
+            self._conn.commit()
+
+        if self.auto_cleanup:
+            return self.enforce()
+        return {"evicted_count": 0, "evicted_files": []}
+
+    def enforce(self) -> Dict[str, Any]:
+        """按保留策略淘汰旧截图
+
+        Returns:
+            dict: 清理结果
+        """
+        with self._lock:
+            victims: Dict[int, Tuple[int, str, int]] = {}
+            if self.max_age_days:
+                cutoff = time.time() - self.max_age_days * 24 * 60 * 60
+                for row in self._conn.execute(
+                        'SELECT id, path, size FROM captures WHERE mtime < ? ORDER BY mtime', (cutoff,)):
+                    victims[row[0]] = row
+
+            # 按追加顺序从最旧的开始选取，直到剩余数量和大小都满足上限
+            count = self._count - len(victims)
+            total_bytes = self._total_bytes - sum(row[2] for row in victims.values())
+            max_bytes = self.max_total_bytes
+            if (self.max_files and count > self.max_files) or (max_bytes and total_bytes > max_bytes):
+                for row in self._conn.execute('SELECT id, path, size FROM captures ORDER BY id'):
+                    if not ((self.max_files and count > self.max_files) or (max_bytes and total_bytes > max_bytes)):
+                        break
+                    if row[0] in victims:
+                        continue
+                    victims[row[0]] = row
+                    count -= 1
+                    total_bytes -= row[2]
+
+        return self._evict(list(victims.values()))
+
+    def _evict(self, rows: List[Tuple[int, str, int]]) -> Dict[str, Any]:
+        """删除文件，删除成功（或文件已不存在）后再移除对应的索引行
+
+        删除失败的文件保留在索引中，下次清理时重试。
+        """
+        removed: List[Tuple[int, str, int]] = []
+        freed = 0
+        for row in rows:
+            try:
+                Path(row[1]).unlink()
+                freed += row[2]
+            except FileNotFoundError:
+                pass
+            except OSError:
+                continue
+            removed.append(row)
+
+        if removed:
+            with self._lock:
+                for row_id, _, size in removed:
+                    # 并发清理可能已移除同一行，只在确实删除时更新计数
+                    if self._conn.execute('DELETE FROM captures WHERE id = ?', (row_id,)).rowcount:
+                        self._count -= 1
+                        self._total_bytes -= size
+                self._conn.commit()
+                self._evicted_count += len(removed)
+                self._evicted_bytes += freed
+
+        return {
+            "evicted_count": len(removed),
+            "evicted_files": [row[1] for row in removed],
+            "size_freed_mb": round(freed / (1024 * 1024), 2)
+        }
+
+    def evict_older_than(self, days_old: float, extensions: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """立即清理早于指定天数的截图
+
+        只按修改时间清理，不受 max_files / max_total_mb 限制影响；days_old 为 0 时清理全部匹配的截图。
+
+        Args:
+            days_old: 天数
+            extensions: 只清理这些扩展名的文件（如 [".png"]），为空时不限
+
+        Returns:
+            dict: 清理结果
+        """
+        cutoff = time.time() - days_old * 24 * 60 * 60
+        suffixes = {ext.lower() if ext.startswith(".") else f".{ext.lower()}" for ext in extensions} if extensions else None
+        with self._lock:
+            rows = [row for row in self._conn.execute(
+                        'SELECT id, path, size FROM captures WHERE mtime < ? ORDER BY mtime', (cutoff,))
+                    if suffixes is None or Path(row[1]).suffix.lower() in suffixes]
+        return self._evict(rows)
+
+    def rebuild_index(self) -> str:
+        """全量扫描截图目录重建索引（仅用于首次导入或索引损坏时）
+
+        Returns:
+            str: 重建结果
+        """
+        files = []
+        for pattern in ("*.png", "*.jpg", "*.jpeg", "*.webp"):
+            for file_path in self.base_dir.rglob(pattern):
+                if file_path.is_file():
+                    stat = file_path.stat()
+                    files.append((str(file_path.resolve()), stat.st_size, stat.st_mtime))
+        # 按修改时间追加，保证id顺序即时间顺序
+        files.sort(key=lambda item: item[2])
+
+        with self._lock:
+            self._conn.execute('DELETE FROM captures')
+            self._conn.executemany('INSERT INTO captures (path, size, mtime) VALUES (?, ?, ?)', files)
+            self._conn.commit()
+            self._count = len(files)
+            self._total_bytes = sum(item[1] for item in files)
+
+        return f"截图索引已重建，共 {len(files)} 个文件"
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取截图保留统计
+
+        Returns:
+            dict: 统计信息
+        """
+        return {
+            "directory": str(self.base_dir),
+            "file_count": self._count,
+            "total_size_mb": round(self._total_bytes / (1024 * 1024), 2),
+            "max_files": self.max_files,
+            "max_total_mb": self.max_total_mb,
+            "max_age_days": self.max_age_days,
+            "auto_cleanup": self.auto_cleanup,
+            "evicted_count": self._evicted_count,
+            "evicted_size_mb": round(self._evicted_bytes / (1024 * 1024), 2)
+        }
+
+    def close(self) -> None:
+        """关闭索引数据库"""
+        with self._lock:
+            self._conn.close()
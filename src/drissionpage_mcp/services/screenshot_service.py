@@ -5,20 +5,47 @@
 """
 
 import os
+import threading
+from collections import OrderedDict
 from typing import Dict, Any, Optional, Union, List
 from pathlib import Path
 from datetime import datetime
 from DrissionPage import Chromium
 
 
+# 各标签页上一帧的灰度图，用于视觉差异比较。
+# 放在模块级而非服务实例上：切换/新建标签页时服务会被重建，基准帧需要保留
+_PREVIOUS_FRAMES: "OrderedDict[str, Any]" = OrderedDict()
+_PREVIOUS_FRAMES_LOCK = threading.Lock()
+# 最多保留基准帧的标签页数量，超出时丢弃最久未比较的
+_MAX_DIFF_BASELINES = 16
+
+
 class ScreenshotService:
     """截图服务
     
     负责页面截图、元素截图等功能。
     """
     
-    def __init__(self, tab):
+    def __init__(self, tab, retention=None, network_listener=None):
         self.tab = tab
+        # 截图保留管理器（ScreenshotRetention），为None时不做自动清理
+        self.retention = retention
+        # 网络监听器（NetworkListener），用于按网络空闲判断页面稳定
+        self.network_listener = network_listener
+
+    def _track_capture(self, screenshot_path: str) -> None:
+        """将截图登记到保留索引，并触发增量清理
+
+        Args:
+            screenshot_path: 截图文件路径
+        """
+        if self.retention and screenshot_path and self.retention.manages(screenshot_path):
+            try:
+                self.retention.record(screenshot_path)
+            except Exception:
+                # 索引失败不影响截图本身
+                pass
     
     def capture_page(self, 
                     path: str = None, 
@@ -58,6 +85,7 @@ class ScreenshotService:
                 name=name, 
                 full_page=full_page
             )
+            self._track_capture(screenshot_path)
             return screenshot_path
         except Exception as e:
             return f"截图失败: {str(e)}"
@@ -98,6 +126,7 @@ class ScreenshotService:
             path.mkdir(parents=True, exist_ok=True)
             
             screenshot_path = element.get_screenshot(path=str(path), name=name)
+            self._track_capture(screenshot_path)
             return screenshot_path
         except Exception as e:
             return f"元素截图失败: {str(e)}"
@@ -167,7 +196,266 @@ class ScreenshotService:
             return screenshot
         except Exception as e:
             raise Exception(f"获取截图二进制数据失败: {str(e)}")
-    
+
+    def get_llm_screenshot(self,
+                           max_dimension: Optional[int] = None,
+                           image_format: Optional[str] = None,
+                           quality: Optional[int] = None,
+                           grayscale: Optional[bool] = None,
+                           full_page: bool = False,
+                           xpath: Optional[str] = None) -> Dict[str, Any]:
+        """获取面向多模态模型优化的截图（缩放并重新编码）
+
+        Args:
+            max_dimension: 最长边上限（像素），默认读取 screenshot.llm_max_dimension
+            image_format: 输出格式（webp, jpeg, png, auto），默认读取 screenshot.llm_format
+            quality: 有损压缩质量，默认读取 screenshot.quality
+            grayscale: 是否转为灰度图，默认读取 screenshot.llm_grayscale
+            full_page: 是否截取完整页面
+            xpath: 仅截取指定元素（XPath），可选
+
+        Returns:
+            dict: 编码后的图片数据及尺寸、体积信息
+        """
+        from ..config.settings import get_config_value
+        from ..utils.image_utils import encode_image_for_llm
+
+        if max_dimension is None:
+            max_dimension = get_config_value('screenshot.llm_max_dimension', 1280)
+        if image_format is None:
+            image_format = get_config_value('screenshot.llm_format', 'auto')
+        if quality is None:
+            quality = get_config_value('screenshot.quality', 90)
+        if grayscale is None:
+            grayscale = get_config_value('screenshot.llm_grayscale', False)
+
+        try:
+            if xpath:
+                element = self.tab.ele(f'xpath:{xpath}', timeout=4)
+                if not element:
+                    raise Exception(f"元素 {xpath} 不存在，无法截图")
+                raw = element.get_screenshot(as_bytes='png')
+            else:
+                raw = self.tab.get_screenshot(as_bytes='png', full_page=full_page)
+
+            return encode_image_for_llm(raw, max_dimension, image_format, quality, grayscale)
+        except Exception as e:
+            raise Exception(f"获取优化截图失败: {str(e)}")
+
+    def capture_diff(self,
+                     block_size: int = 16,
+                     threshold: int = 24,
+                     return_crops: bool = False,
+                     max_regions: int = 8,
+                     image_format: Optional[str] = None,
+                     quality: Optional[int] = None) -> Dict[str, Any]:
+        """截取当前视口并与该标签页上一次截图比较，返回变化区域
+
+        首次调用只记录基准帧。区域坐标为截图像素坐标。
+
+        Args:
+            block_size: 分块边长（像素）
+            threshold: 块内像素差阈值（0-255）
+            return_crops: 是否返回变化区域的裁剪图
+            max_regions: 最多返回的区域数量（按面积排序）
+            image_format: 裁剪图格式，默认读取 screenshot.llm_format
+            quality: 裁剪图压缩质量，默认读取 screenshot.quality
+
+        Returns:
+            dict: 变化区域、变化占比以及可选的裁剪图数据
+
+        Raises:
+            ValueError: 分块边长或阈值无效
+        """
+        if not isinstance(block_size, int) or block_size <= 0:
+            raise ValueError(f"分块边长必须为正整数: {block_size}")
+        if not 0 <= threshold <= 255:
+            raise ValueError(f"像素差阈值必须在 0-255 之间: {threshold}")
+
+        import io
+        import numpy as np
+        from PIL import Image
+        from ..config.settings import get_config_value
+        from ..utils.image_utils import (
+            find_changed_regions, resolve_image_format, encode_image, IMAGE_MIME_TYPES
+        )
+
+        try:
+            raw = self.tab.get_screenshot(as_bytes='png')
+            with Image.open(io.BytesIO(raw)) as image:
+                image.load()
+                current = np.asarray(image.convert("L"))
+
+                tab_id = self.tab.tab_id
+                with _PREVIOUS_FRAMES_LOCK:
+                    previous = _PREVIOUS_FRAMES.pop(tab_id, None)
+                    _PREVIOUS_FRAMES[tab_id] = current
+                    while len(_PREVIOUS_FRAMES) > _MAX_DIFF_BASELINES:
+                        _PREVIOUS_FRAMES.popitem(last=False)
+
+                result: Dict[str, Any] = {
+                    "baseline": previous is None,
+                    "width": image.width,
+                    "height": image.height,
+                    "regions": [],
+                    "changed_ratio": 0.0,
+                    "crops": []
+                }
+                if previous is None:
+                    return result
+
+                diff = find_changed_regions(previous, current, block_size, threshold)
+                result["changed_ratio"] = diff["changed_ratio"]
+                result["total_regions"] = len(diff["regions"])
+                result["regions"] = diff["regions"][:max_regions]
+
+                if return_crops and result["regions"]:
+                    output_format = resolve_image_format(
+                        image_format or get_config_value('screenshot.llm_format', 'auto')
+                    )
+                    if quality is None:
+                        quality = get_config_value('screenshot.quality', 90)
+                    for region in result["regions"]:
+                        box = (region["x"], region["y"],
+                               region["x"] + region["width"], region["y"] + region["height"])
+                        result["crops"].append({
+                            "region": region,
+                            "data": encode_image(image.crop(box), output_format, quality),
+                            "mime_type": IMAGE_MIME_TYPES[output_format]
+                        })
+
+                return result
+        except Exception as e:
+            raise Exception(f"截图差异比较失败: {str(e)}")
+
+    def reset_diff_baseline(self, tab_id: Optional[str] = None) -> str:
+        """清除视觉差异比较的基准帧
+
+        Args:
+            tab_id: 标签页ID，不指定则清除全部
+
+        Returns:
+            str: 清除结果
+        """
+        with _PREVIOUS_FRAMES_LOCK:
+            if tab_id:
+                _PREVIOUS_FRAMES.pop(tab_id, None)
+                return f"标签页 {tab_id} 的基准帧已清除"
+            _PREVIOUS_FRAMES.clear()
+        return "所有基准帧已清除"
+
+    # 一次页面内遍历收集视口内可交互元素的位置与定位符。
+    # 定位符为 "xpath:" 前缀的XPath，可直接传给 click_element / input_text / get_element_text
+    _INTERACTIVE_ELEMENTS_SCRIPT = """
+    function(maxElements) {
+        const query = 'a[href], button, input:not([type=hidden]), select, textarea, summary, ' +
+                      '[role=button], [role=link], [role=checkbox], [role=radio], [role=tab], ' +
+                      '[role=menuitem], [role=option], [onclick], [contenteditable=""], ' +
+                      '[contenteditable=true], [tabindex]:not([tabindex="-1"])';
+        const vw = window.innerWidth, vh = window.innerHeight;
+        const literal = v => v.indexOf('"') < 0 ? '"' + v + '"' : (v.indexOf("'") < 0 ? "'" + v + "'" : null);
+        const xpathOf = el => {
+            // 从元素向上逐级生成路径，遇到页面内唯一的 id 时以其为锚点
+            const parts = [];
+            let node = el;
+            while (node && node.nodeType === 1) {
+                const id = node.id && literal(node.id);
+                if (id && document.querySelectorAll('#' + CSS.escape(node.id)).length === 1) {
+                    parts.unshift('//*[@id=' + id + ']');
+                    return parts.join('/');
+                }
+                const name = node.localName;
+                const ns = node.namespaceURI;
+                // SVG 等非 HTML 命名空间的元素只能按 local-name() 匹配
+                let part = ns === 'http://www.w3.org/1999/xhtml' ? name : '*[local-name()="' + name + '"]';
+                const parent = node.parentElement;
+                if (parent) {
+                    const same = Array.from(parent.children).filter(c => c.localName === name && c.namespaceURI === ns);
+                    if (same.length > 1) part += '[' + (same.indexOf(node) + 1) + ']';
+                }
+                parts.unshift(part);
+                node = parent;
+            }
+            return '/' + parts.join('/');
+        };
+        const results = [];
+        for (const el of document.querySelectorAll(query)) {
+            if (results.length >= maxElements) break;
+            const rect = el.getBoundingClientRect();
+            if (rect.width < 2 || rect.height < 2) continue;
+            if (rect.bottom <= 0 || rect.right <= 0 || rect.top >= vh || rect.left >= vw) continue;
+            const style = getComputedStyle(el);
+            if (style.visibility === 'hidden' || style.display === 'none' || style.opacity === '0') continue;
+            // 被其他元素完全遮挡的不标注
+            const cx = Math.min(Math.max(rect.left + rect.width / 2, 0), vw - 1);
+            const cy = Math.min(Math.max(rect.top + rect.height / 2, 0), vh - 1);
+            const top = document.elementFromPoint(cx, cy);
+            if (top && top !== el && !el.contains(top) && !top.contains(el)) continue;
+            const text = (el.innerText || el.value || el.getAttribute('aria-label') ||
+                          el.getAttribute('placeholder') || el.title || '').trim().replace(/\\s+/g, ' ');
+            results.push({
+                selector: 'xpath:' + xpathOf(el),
+                tag: el.tagName.toLowerCase(),
+                type: el.getAttribute('type') || el.getAttribute('role') || '',
+                text: text.slice(0, 40),
+                box: [Math.round(rect.left), Math.round(rect.top), Math.round(rect.width), Math.round(rect.height)]
+            });
+        }
+        return JSON.stringify({innerWidth: vw, innerHeight: vh, elements: results});
+    }
+    """
+
+    def capture_annotated(self,
+                          max_elements: int = 60,
+                          max_dimension: Optional[int] = None,
+                          image_format: Optional[str] = None,
+                          quality: Optional[int] = None) -> Dict[str, Any]:
+        """截取视口并在图上标注可交互元素编号（set-of-marks）
+
+        元素信息在一次页面脚本中收集，标注框在服务端用 Pillow 绘制，编号与选择器一一对应。
+
+        Args:
+            max_elements: 最多标注的元素数量
+            max_dimension: 输出图片最长边上限，默认读取 screenshot.llm_max_dimension
+            image_format: 输出格式，默认读取 screenshot.llm_format
+            quality: 压缩质量，默认读取 screenshot.quality
+
+        Returns:
+            dict: 标注后的图片数据、尺寸信息以及编号到选择器的对照表
+        """
+        import io
+        import json
+        from PIL import Image
+        from ..config.settings import get_config_value
+        from ..utils.image_utils import draw_element_marks, prepare_image_for_llm
+
+        if max_dimension is None:
+            max_dimension = get_config_value('screenshot.llm_max_dimension', 1280)
+        if image_format is None:
+            image_format = get_config_value('screenshot.llm_format', 'auto')
+        if quality is None:
+            quality = get_config_value('screenshot.quality', 90)
+
+        try:
+            page_info = json.loads(self.tab.run_js(self._INTERACTIVE_ELEMENTS_SCRIPT, max_elements))
+            raw = self.tab.get_screenshot(as_bytes='png')
+
+            elements = []
+            for ref, element in enumerate(page_info["elements"], start=1):
+                element["ref"] = ref
+                elements.append(element)
+
+            with Image.open(io.BytesIO(raw)) as image:
+                image.load()
+                scale = image.width / float(page_info["innerWidth"] or image.width)
+                annotated = draw_element_marks(image, elements, scale)
+                result = prepare_image_for_llm(annotated, max_dimension, image_format, quality)
+
+            result["elements"] = elements
+            return result
+        except Exception as e:
+            raise Exception(f"标注截图失败: {str(e)}")
+
     def capture_multiple_elements(self, 
                                  xpaths: list, 
                                  path: str = ".", 
@@ -217,7 +505,7 @@ class ScreenshotService:
                 before_action()
             
             # 等待页面稳定
-            self.tab.wait(1)
+            self._wait_for_stable()
             
             # 执行后续操作
             if after_action:
@@ -236,52 +524,163 @@ class ScreenshotService:
                 "error": f"对比截图失败: {str(e)}"
             }
     
+    def _wait_for_stable(self, idle_ms: int = 500, timeout: float = 10) -> None:
+        """等待页面稳定：有网络监听器时等待网络空闲，否则退回固定等待"""
+        if self.network_listener is not None:
+            try:
+                self.network_listener.wait_for_network_idle(idle_ms, 0, timeout)
+                return
+            except Exception:
+                pass
+        self.tab.wait(1)
+
+    # 滚动到指定位置后等待页面稳定：资源请求静默且视口内图片加载完成，再等两帧绘制；
+    # 返回实际滚动位置与重新测量的页面高度（懒加载内容会改变scrollHeight）
+    _SCROLL_SETTLE_SCRIPT = """
+    function(targetY, quietMs, maxWaitMs) {
+        return new Promise(resolve => {
+            if (targetY !== null) window.scrollTo(0, targetY);
+            const start = performance.now();
+            let lastActivity = start;
+            let observer = null;
+            try {
+                observer = new PerformanceObserver(() => { lastActivity = performance.now(); });
+                observer.observe({type: 'resource', buffered: false});
+            } catch (e) {}
+            const nextFrame = cb => {
+                let done = false;
+                const run = () => { if (!done) { done = true; cb(); } };
+                requestAnimationFrame(() => requestAnimationFrame(run));
+                setTimeout(run, 100);  // 后台标签页不触发rAF时兜底
+            };
+            const pendingImages = () => Array.from(document.images).some(img => {
+                if (img.complete) return false;
+                const rect = img.getBoundingClientRect();
+                return rect.bottom > 0 && rect.top < window.innerHeight;
+            });
+            const finish = () => {
+                if (observer) observer.disconnect();
+                nextFrame(() => resolve(JSON.stringify({
+                    y: window.scrollY,
+                    scrollHeight: Math.max(document.documentElement.scrollHeight,
+                                           document.body ? document.body.scrollHeight : 0),
+                    innerHeight: window.innerHeight,
+                    waitedMs: Math.round(performance.now() - start)
+                })));
+            };
+            const check = () => {
+                const now = performance.now();
+                if ((now - lastActivity >= quietMs && !pendingImages()) || now - start >= maxWaitMs) {
+                    finish();
+                } else {
+                    setTimeout(check, Math.min(50, quietMs));
+                }
+            };
+            nextFrame(check);
+        });
+    }
+    """
+
+    def _scroll_and_settle(self, target_y: Optional[int], quiet_ms: int, max_wait_ms: int) -> Dict[str, Any]:
+        """滚动到指定位置并等待页面稳定
+
+        Args:
+            target_y: 目标滚动位置（CSS像素），为None时不滚动
+            quiet_ms: 资源请求静默时长（毫秒）
+            max_wait_ms: 最长等待时间（毫秒）
+
+        Returns:
+            dict: 实际滚动位置、页面高度、视口高度及等待耗时
+        """
+        import json
+
+        result = self.tab.run_js(self._SCROLL_SETTLE_SCRIPT, target_y, quiet_ms, max_wait_ms,
+                                 timeout=max_wait_ms / 1000 + 5)
+        return json.loads(result)
+
     def capture_scroll_sequence(self, 
-                               path: str = ".", 
+                               path: str = None, 
                                prefix: str = "scroll", 
-                               scroll_count: int = 5) -> List[str]:
+                               scroll_count: int = 20,
+                               stitch: bool = False,
+                               keep_frames: bool = True,
+                               quiet_ms: int = 300,
+                               max_wait_ms: int = 3000) -> List[str]:
         """捕获滚动序列截图
-        
+
+        每次按视口高度向下滚动，等待资源请求静默和页面绘制后再截图，并在每一步重新测量
+        页面高度，直到到达页面底部或达到最大帧数。
+
         Args:
-            path: 保存路径
+            path: 保存路径，如果为None则使用默认截图目录下的 scroll 目录
             prefix: 文件名前缀
-            scroll_count: 滚动次数
+            scroll_count: 最大截图帧数
+            stitch: 是否将各帧拼接为一张长图（自动检测重叠和固定页头/页脚）
+            keep_frames: 拼接时是否同时保留各帧文件
+            quiet_ms: 判定页面稳定所需的资源请求静默时长（毫秒）
+            max_wait_ms: 每一步最长等待时间（毫秒）
             
         Returns:
-            list: 截图文件路径列表
+            list: 截图文件路径列表，拼接时长图路径位于最后
         """
         try:
+            import io
+            from PIL import Image
+            from ..config.settings import get_screenshots_directory
+
+            if not path:
+                path = get_screenshots_directory() / "scroll"
+            path = Path(path)
+            path.mkdir(parents=True, exist_ok=True)
+
             screenshots = []
-            
-            # 滚动到顶部
-            self.tab.scroll.to_top()
-            self.tab.wait(0.5)
-            
-            # 获取页面高度
-            page_height = self.tab.run_js("return document.body.scrollHeight")
-            viewport_height = self.tab.run_js("return window.innerHeight")
-            
-            if page_height <= viewport_height:
-                # 页面不需要滚动
-                screenshot_path = self.capture_page(path, f"{prefix}_0.png")
-                screenshots.append(screenshot_path)
-                return screenshots
-            
-            # 计算滚动步长
-            scroll_step = (page_height - viewport_height) / (scroll_count - 1)
-            
-            for i in range(scroll_count):
-                # 截图
-                filename = f"{prefix}_{i}.png"
-                screenshot_path = self.capture_page(path, filename)
-                screenshots.append(screenshot_path)
-                
-                # 滚动（除了最后一次）
-                if i < scroll_count - 1:
-                    scroll_position = int(scroll_step * (i + 1))
-                    self.tab.scroll.to_location(0, scroll_position)
-                    self.tab.wait(0.5)
-            
+            frames = []
+            positions = []
+
+            # 拼接时每步少滚动一部分，保证相邻帧有重叠，避免固定页头遮挡的内容丢失
+            step_ratio = 0.85 if stitch else 1.0
+
+            metrics = self._scroll_and_settle(0, quiet_ms, max_wait_ms)
+
+            for i in range(max(1, scroll_count)):
+                raw = self.tab.get_screenshot(as_bytes='png')
+                positions.append(metrics["y"])
+
+                if stitch:
+                    with Image.open(io.BytesIO(raw)) as image:
+                        image.load()
+                        frames.append(image.convert("RGB"))
+                if keep_frames or not stitch:
+                    frame_path = path / f"{prefix}_{i}.png"
+                    frame_path.write_bytes(raw)
+                    screenshots.append(str(frame_path))
+                    self._track_capture(str(frame_path))
+
+                # 到达底部（高度按本步重新测量的值判断）
+                if metrics["y"] + metrics["innerHeight"] >= metrics["scrollHeight"] - 1:
+                    break
+                if i == scroll_count - 1:
+                    break
+
+                next_y = metrics["y"] + max(1, int(metrics["innerHeight"] * step_ratio))
+                metrics = self._scroll_and_settle(next_y, quiet_ms, max_wait_ms)
+                if metrics["y"] <= positions[-1]:
+                    # 页面无法继续滚动
+                    break
+
+            if stitch:
+                from ..utils.image_utils import stitch_vertical
+
+                # 截图像素与CSS像素的比例（高DPI屏幕下大于1）
+                scale = frames[0].height / float(metrics["innerHeight"] or frames[0].height)
+                offsets = [0] + [int(round((positions[k] - positions[k - 1]) * scale))
+                                 for k in range(1, len(positions))]
+                stitched = stitch_vertical(frames, offsets)
+                stitched_path = path / f"{prefix}_stitched.png"
+                stitched.save(stitched_path, format="PNG")
+                screenshots.append(str(stitched_path))
+                self._track_capture(str(stitched_path))
+
             return screenshots
         except Exception as e:
             return [f"滚动序列截图失败: {str(e)}"]
@@ -347,7 +746,18 @@ class ScreenshotService:
             path_obj = Path(path)
             if not path_obj.exists():
                 return {"error": f"路径不存在: {path}"}
-            
+
+            # 受管理的截图目录直接走索引，只读取需要删除的记录（"*" 或 "*.扩展名" 形式的模式）
+            extension = pattern[1:] if pattern.startswith("*.") and not any(c in pattern[2:] for c in "*?[") else None
+            if (self.retention and (pattern == "*" or extension)
+                    and path_obj.resolve() == self.retention.base_dir.resolve()):
+                result = self.retention.evict_older_than(days_old, [extension] if extension else None)
+                return {
+                    "deleted_count": result["evicted_count"],
+                    "deleted_files": result["evicted_files"],
+                    "size_freed_mb": result["size_freed_mb"]
+                }
+
             current_time = time.time()
             cutoff_time = current_time - (days_old * 24 * 60 * 60)
             
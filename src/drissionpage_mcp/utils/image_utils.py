@@ -0,0 +1,406 @@
+# -*- coding: utf-8 -*-
+"""图片处理工具模块
+
+提供截图缩放、编码、差异比较等图片处理函数，依赖 Pillow 与 numpy（按需导入）。
+"""
+
+import io
+from typing import Dict, Any, Optional, Tuple
+
+
+# 支持的输出格式与对应的MIME类型
+IMAGE_MIME_TYPES = {
+    "webp": "image/webp",
+    "jpeg": "image/jpeg",
+    "png": "image/png",
+}
+
+
+def resolve_image_format(image_format: str = "auto") -> str:
+    """协商输出图片格式
+
+    Args:
+        image_format: 期望的格式（webp, jpeg, png, auto），auto 表示优先 webp，不支持时回退 jpeg
+
+    Returns:
+        str: 实际使用的格式
+    """
+    from PIL import features
+
+    image_format = (image_format or "auto").lower()
+    if image_format == "jpg":
+        image_format = "jpeg"
+
+    if image_format == "auto":
+        return "webp" if features.check("webp") else "jpeg"
+
+    if image_format not in IMAGE_MIME_TYPES:
+        raise ValueError(f"不支持的图片格式: {image_format}")
+
+    if image_format == "webp" and not features.check("webp"):
+        return "jpeg"
+
+    return image_format
+
+
+def fit_size(width: int, height: int, max_dimension: Optional[int]) -> Tuple[int, int]:
+    """按最长边等比缩放尺寸
+
+    Args:
+        width: 原始宽度
+        height: 原始高度
+        max_dimension: 最长边上限，为None或0时不缩放
+
+    Returns:
+        tuple: 缩放后的 (宽, 高)
+    """
+    if not max_dimension or max(width, height) <= max_dimension:
+        return width, height
+
+    scale = max_dimension / float(max(width, height))
+    return max(1, int(round(width * scale))), max(1, int(round(height * scale)))
+
+
+def encode_image(image, image_format: str = "webp", quality: int = 90) -> bytes:
+    """将PIL图片编码为指定格式的字节
+
+    Args:
+        image: PIL.Image 对象
+        image_format: 输出格式（webp, jpeg, png）
+        quality: 有损格式的压缩质量（1-100）
+
+    Returns:
+        bytes: 编码后的图片数据
+    """
+    buffer = io.BytesIO()
+
+    if image_format == "jpeg":
+        # JPEG 不支持透明通道
+        if image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        image.save(buffer, format="JPEG", quality=quality, optimize=True)
+    elif image_format == "webp":
+        image.save(buffer, format="WEBP", quality=quality, method=4)
+    else:
+        image.save(buffer, format="PNG", optimize=True)
+
+    return buffer.getvalue()
+
+
+def encode_image_for_llm(image_bytes: bytes,
+                         max_dimension: Optional[int] = 1280,
+                         image_format: str = "auto",
+                         quality: int = 90,
+                         grayscale: bool = False) -> Dict[str, Any]:
+    """将原始截图缩放并重新编码，用于直接返回给多模态模型
+
+    Args:
+        image_bytes: 原始截图数据（PNG/JPEG等）
+        max_dimension: 最长边上限（像素），为None或0时保持原尺寸
+        image_format: 输出格式（webp, jpeg, png, auto）
+        quality: 有损格式的压缩质量（1-100）
+        grayscale: 是否转为灰度图
+
+    Returns:
+        dict: 包含编码数据、MIME类型及尺寸信息
+    """
+    from PIL import Image
+
+    with Image.open(io.BytesIO(image_bytes)) as image:
+        image.load()
+        result = prepare_image_for_llm(image, max_dimension, image_format, quality, grayscale)
+
+    result["original_size_bytes"] = len(image_bytes)
+    return result
+
+
+def prepare_image_for_llm(image,
+                          max_dimension: Optional[int] = 1280,
+                          image_format: str = "auto",
+                          quality: int = 90,
+                          grayscale: bool = False) -> Dict[str, Any]:
+    """将已解码的PIL图片缩放并编码
+
+    Args:
+        image: PIL.Image 对象
+        max_dimension: 最长边上限（像素），为None或0时保持原尺寸
+        image_format: 输出格式（webp, jpeg, png, auto）
+        quality: 有损格式的压缩质量（1-100）
+        grayscale: 是否转为灰度图
+
+    Returns:
+        dict: 包含编码数据、MIME类型及尺寸信息
+    """
+    from PIL import Image
+
+    output_format = resolve_image_format(image_format)
+    original_width, original_height = image.size
+
+    if grayscale:
+        image = image.convert("L")
+    elif image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGB")
+
+    width, height = fit_size(original_width, original_height, max_dimension)
+    if (width, height) != (original_width, original_height):
+        # 截图以缩小为主，reducing_gap 先整数倍缩小再 LANCZOS 精修，兼顾速度与清晰度
+        image = image.resize((width, height), Image.LANCZOS, reducing_gap=3.0)
+
+    data = encode_image(image, output_format, quality)
+
+    return {
+        "data": data,
+        "mime_type": IMAGE_MIME_TYPES[output_format],
+        "format": output_format,
+        "width": width,
+        "height": height,
+        "original_width": original_width,
+        "original_height": original_height,
+        "size_bytes": len(data),
+    }
+
+
+def find_changed_regions(previous, current,
+                         block_size: int = 16,
+                         threshold: int = 24,
+                         padding: int = 1) -> Dict[str, Any]:
+    """分块比较两帧灰度图，返回发生变化区域的外接矩形
+
+    Args:
+        previous: 上一帧灰度图（numpy uint8 二维数组）
+        current: 当前帧灰度图（numpy uint8 二维数组）
+        block_size: 分块边长（像素）
+        threshold: 块内最大像素差超过该值视为变化（0-255）
+        padding: 合并相邻变化块时允许的间隔块数
+
+    Returns:
+        dict: 变化区域列表（像素坐标）及变化块占比
+    """
+    import numpy as np
+
+    height, width = current.shape[:2]
+    if previous is None or previous.shape != current.shape:
+        # 尺寸变化（如视口调整）时视为整帧变化
+        return {
+            "regions": [{"x": 0, "y": 0, "width": width, "height": height}],
+            "changed_ratio": 1.0,
+        }
+
+    rows = -(-height // block_size)
+    cols = -(-width // block_size)
+
+    diff = np.abs(current.astype(np.int16) - previous.astype(np.int16)).astype(np.uint8)
+    padded = np.zeros((rows * block_size, cols * block_size), dtype=np.uint8)
+    padded[:height, :width] = diff
+    block_max = padded.reshape(rows, block_size, cols, block_size).max(axis=(1, 3))
+    changed = block_max > threshold
+
+    changed_count = int(changed.sum())
+    if changed_count == 0:
+        return {"regions": [], "changed_ratio": 0.0}
+
+    # 在块网格上做连通域标记，相距不超过padding个块的变化块归为同一区域
+    visited = np.zeros_like(changed)
+    regions = []
+    for start_row, start_col in zip(*np.nonzero(changed)):
+        if visited[start_row, start_col]:
+            continue
+        visited[start_row, start_col] = True
+        stack = [(start_row, start_col)]
+        top, left, bottom, right = start_row, start_col, start_row, start_col
+
+        while stack:
+            row, col = stack.pop()
+            top, bottom = min(top, row), max(bottom, row)
+            left, right = min(left, col), max(right, col)
+            for next_row in range(max(0, row - padding - 1), min(rows, row + padding + 2)):
+                for next_col in range(max(0, col - padding - 1), min(cols, col + padding + 2)):
+                    if changed[next_row, next_col] and not visited[next_row, next_col]:
+                        visited[next_row, next_col] = True
+                        stack.append((next_row, next_col))
+
+        x = int(left * block_size)
+        y = int(top * block_size)
+        regions.append({
+            "x": x,
+            "y": y,
+            "width": int(min(width, (right + 1) * block_size) - x),
+            "height": int(min(height, (bottom + 1) * block_size) - y),
+        })
+
+    # 面积大的区域优先
+    regions.sort(key=lambda r: r["width"] * r["height"], reverse=True)
+
+    return {
+        "regions": regions,
+        "changed_ratio": round(changed_count / float(rows * cols), 4),
+    }
+
+
+def _row_profile(gray, columns: int = 128):
+    """按列降采样得到每行的特征向量，用于快速比较行内容"""
+    import numpy as np
+
+    step = max(1, gray.shape[1] // columns)
+    return gray[:, ::step].astype(np.int16)
+
+
+def detect_static_edges(previous, current, max_ratio: float = 0.25, tolerance: float = 2.0) -> Tuple[int, int]:
+    """检测两帧之间位置不变的顶部/底部区域（如固定页头、页脚）
+
+    Args:
+        previous: 上一帧灰度图（numpy二维数组）
+        current: 当前帧灰度图（numpy二维数组）
+        max_ratio: 页头/页脚高度占帧高的上限
+        tolerance: 行平均像素差小于该值视为相同
+
+    Returns:
+        tuple: (页头高度, 页脚高度)，单位像素
+    """
+    import numpy as np
+
+    height = current.shape[0]
+    limit = int(height * max_ratio)
+    row_diff = np.abs(_row_profile(previous) - _row_profile(current)).mean(axis=1)
+    same = row_diff < tolerance
+
+    header = 0
+    while header < limit and same[header]:
+        header += 1
+
+    footer = 0
+    while footer < limit and same[height - 1 - footer]:
+        footer += 1
+
+    return header, footer
+
+
+def refine_vertical_offset(previous, current, expected: int,
+                           header: int = 0, footer: int = 0, search: int = 48) -> int:
+    """在预期滚动偏移附近搜索两帧内容的最佳对齐偏移
+
+    Args:
+        previous: 上一帧灰度图
+        current: 当前帧灰度图
+        expected: 根据滚动位置换算的预期偏移（像素）
+        header: 固定页头高度（比较时排除）
+        footer: 固定页脚高度（比较时排除）
+        search: 搜索半径（像素）
+
+    Returns:
+        int: 当前帧第0行对应上一帧的行号偏移
+    """
+    import numpy as np
+
+    height = current.shape[0]
+    prev_profile = _row_profile(previous)
+    cur_profile = _row_profile(current)
+
+    best_offset, best_score = expected, None
+    for offset in range(max(1, expected - search), min(height - 1, expected + search) + 1):
+        top, bottom = header, height - footer - offset
+        if bottom - top < 16:
+            # 重叠区域太小，无法可靠比较
+            continue
+        score = float(np.abs(prev_profile[top + offset:bottom + offset] - cur_profile[top:bottom]).mean())
+        # 分数相同时偏向预期偏移
+        if best_score is None or score < best_score or (score == best_score and
+                                                        abs(offset - expected) < abs(best_offset - expected)):
+            best_offset, best_score = offset, score
+
+    return best_offset
+
+
+def stitch_vertical(frames, offsets, detect_overlap: bool = True):
+    """将按顺序向下滚动得到的多帧截图拼接为一张长图
+
+    Args:
+        frames: PIL.Image 列表（尺寸相同）
+        offsets: 每帧相对上一帧的预期滚动距离（像素），首帧为0
+        detect_overlap: 是否基于像素检测重叠与固定页头/页脚并修正偏移
+
+    Returns:
+        PIL.Image: 拼接后的图片
+    """
+    import numpy as np
+    from PIL import Image
+
+    if len(frames) == 1:
+        return frames[0].copy()
+
+    width, height = frames[0].size
+    grays = [np.asarray(frame.convert("L")) for frame in frames] if detect_overlap else None
+
+    # 先计算每帧在画布上的位置及需要粘贴的行区间
+    placements = [(0, 0, height)]  # (画布y, 起始行, 结束行)
+    top = 0
+    for index in range(1, len(frames)):
+        offset = int(offsets[index])
+        header = footer = 0
+        if detect_overlap:
+            header, footer = detect_static_edges(grays[index - 1], grays[index])
+            offset = refine_vertical_offset(grays[index - 1], grays[index], offset, header, footer)
+
+        # 上一帧有效内容截止到页脚之前，当前帧从对应行接续，并跳过固定页头
+        start_row = max(header, height - footer - offset, 0)
+        last_y, last_start, last_end = placements[-1]
+        placements[-1] = (last_y, last_start, min(last_end, height - footer))
+        top += offset
+        placements.append((top + start_row, start_row, height))
+
+    canvas_height = placements[-1][0] + (placements[-1][2] - placements[-1][1])
+    canvas = Image.new(frames[0].mode, (width, canvas_height), "white")
+    for frame, (y, start_row, end_row) in zip(frames, placements):
+        if end_row > start_row:
+            canvas.paste(frame.crop((0, start_row, width, end_row)), (0, y))
+
+    return canvas
+
+
+# 标注框配色，相邻编号使用不同颜色便于区分
+MARK_COLORS = [
+    (230, 25, 75), (60, 180, 75), (0, 130, 200), (245, 130, 48),
+    (145, 30, 180), (0, 128, 128), (240, 50, 230), (128, 0, 0),
+]
+
+
+def draw_element_marks(image, marks, scale: float = 1.0, line_width: int = 2):
+    """在截图上绘制带编号的元素标注框（set-of-marks）
+
+    Args:
+        image: PIL.Image 对象（会被原地修改）
+        marks: 标注列表，每项包含 ref 与 box（[x, y, 宽, 高]，CSS像素）
+        scale: 截图像素与CSS像素的比例
+        line_width: 边框线宽（CSS像素）
+
+    Returns:
+        PIL.Image: 绘制后的图片
+    """
+    from PIL import ImageDraw, ImageFont
+
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+
+    draw = ImageDraw.Draw(image)
+    font_size = max(10, int(12 * scale))
+    try:
+        font = ImageFont.load_default(size=font_size)
+    except TypeError:
+        # Pillow < 10.1 的默认字体不支持指定大小
+        font = ImageFont.load_default()
+
+    width = max(1, int(round(line_width * scale)))
+    for mark in marks:
+        color = MARK_COLORS[(mark["ref"] - 1) % len(MARK_COLORS)]
+        x, y, w, h = [value * scale for value in mark["box"]]
+        draw.rectangle((x, y, x + w, y + h), outline=color, width=width)
+
+        label = str(mark["ref"])
+        left, top, right, bottom = draw.textbbox((0, 0), label, font=font)
+        label_w, label_h = right - left + 4, bottom - top + 4
+        # 标签放在框的左上角外侧，空间不足时放到框内
+        label_y = y - label_h if y - label_h >= 0 else y
+        draw.rectangle((x, label_y, x + label_w, label_y + label_h), fill=color)
+        draw.text((x + 2 - left, label_y + 2 - top), label, fill=(255, 255, 255), font=font)
+
+    return image
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""
+定长环形缓冲区模块
+
+为事件回调线程（写入）与工具调用线程（读取）之间提供有界、线程安全的数据交换。
+缓冲区写满后覆盖最旧的数据并累计丢弃计数，内存占用不随监听时长增长。
+"""
+
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class RingBuffer:
+    """定长、加锁的环形缓冲区
+
+    每条写入的数据分配一个递增序号，序号可作为游标增量读取（since）。
+    尾部读取只遍历所需的条目，复杂度为 O(limit)。
+    """
+
+    def __init__(self, capacity: int = 1000):
+        """
+        初始化环形缓冲区
+
+        Args:
+            capacity: 缓冲区容量（条目数），至少为 1
+        """
+        self.capacity = max(1, int(capacity))
+        self._slots: List[Any] = [None] * self.capacity
+        self._lock = threading.Lock()
+        self._start = 0  # 最旧有效条目的序号
+        self._next = 0  # 下一条写入的序号
+        self._dropped = 0
+
+    def append(self, item: Any) -> int:
+        """写入一条数据，缓冲区已满时覆盖最旧的数据
+
+        Args:
+            item: 要写入的数据
+
+        Returns:
+            int: 该条数据的序号
+        """
+        with self._lock:
+            seq = self._next
+            self._slots[seq % self.capacity] = item
+            self._next = seq + 1
+            if self._next - self._start > self.capacity:
+                self._start += 1
+                self._dropped += 1
+            return seq
+
+    def tail(self, limit: Optional[int] = None) -> List[Any]:
+        """按写入顺序返回最新的 limit 条数据
+
+        Args:
+            limit: 返回条数上限，None 表示返回全部有效数据
+
+        Returns:
+            list: 数据列表（旧 → 新）
+        """
+        with self._lock:
+            size = self._next - self._start
+            if limit is not None:
+                size = min(size, max(0, limit))
+            return [self._slots[seq % self.capacity] for seq in range(self._next - size, self._next)]
+
+    def since(self, cursor: int = 0, limit: Optional[int] = None) -> Tuple[List[Any], int]:
+        """从游标位置开始增量读取
+
+        Args:
+            cursor: 上次读取返回的游标（序号），早于最旧数据时从最旧数据开始
+            limit: 单次读取条数上限
+
+        Returns:
+            tuple: (数据列表, 下次读取使用的游标)
+        """
+        with self._lock:
+            begin = max(cursor, self._start)
+            end = self._next if limit is None else min(self._next, begin + max(0, limit))
+            items = [self._slots[seq % self.capacity] for seq in range(begin, end)]
+            return items, max(end, cursor)
+
+    def from_key(self, value: Any, key: Callable[[Any], Any], limit: Optional[int] = None) -> List[Any]:
+        """返回 key(条目) >= value 的条目，二分查找起点，复杂度 O(log n + limit)
+
+        要求条目按 key 递增写入（如带全局递增序号的数据）。
+
+        Args:
+            value: 下限（包含）
+            key: 从条目中取比较值的函数
+            limit: 返回条数上限
+
+        Returns:
+            list: 数据列表（旧 → 新）
+        """
+        with self._lock:
+            low, high = self._start, self._next
+            while low < high:
+                middle = (low + high) // 2
+                if key(self._slots[middle % self.capacity]) < value:
+                    low = middle + 1
+                else:
+                    high = middle
+            end = self._next if limit is None else min(self._next, low + max(0, limit))
+            return [self._slots[seq % self.capacity] for seq in range(low, end)]
+
+    def latest(self) -> Optional[Any]:
+        """获取最新写入的一条数据"""
+        with self._lock:
+            if self._next == self._start:
+                return None
+            return self._slots[(self._next - 1) % self.capacity]
+
+    def clear(self) -> None:
+        """清空缓冲区（序号继续递增，已有游标仍然有效）"""
+        with self._lock:
+            self._slots = [None] * self.capacity
+            self._start = self._next
+
+    def stats(self) -> Dict[str, int]:
+        """获取缓冲区统计信息
+
+        Returns:
+            dict: 容量、当前条数、累计写入数、因覆盖丢弃的条数和当前游标
+        """
+        with self._lock:
+            return {
+                "capacity": self.capacity,
+                "size": self._next - self._start,
+                "total_appended": self._next,
+                "dropped": self._dropped,
+                "cursor": self._next
+            }
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._next - self._start
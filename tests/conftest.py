@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""测试共用的假标签页
+
+模拟 DrissionPage 标签页的 run_cdp 与驱动的事件回调注册，不需要启动浏览器。
+"""
+
+import pytest
+
+
+class FakeDriver:
+    """记录事件回调的驱动，emit() 模拟浏览器推送事件"""
+
+    def __init__(self):
+        self.event_handlers = {}
+
+    def set_callback(self, event, callback):
+        if callback is None:
+            self.event_handlers.pop(event, None)
+        else:
+            self.event_handlers[event] = callback
+
+    def emit(self, event, **params):
+        handler = self.event_handlers.get(event)
+        if handler is not None:
+            handler(**params)
+
+
+class FakeTab:
+    """记录发送的CDP命令，responses 中按命令名配置返回值或异常"""
+
+    def __init__(self):
+        self.driver = FakeDriver()
+        self.commands = []
+        self.responses = {}
+
+    def run_cdp(self, cmd, **cmd_args):
+        self.commands.append((cmd, cmd_args))
+        response = self.responses.get(cmd, {})
+        if isinstance(response, Exception):
+            raise response
+        return response(**cmd_args) if callable(response) else response
+
+    def sent(self, prefix=""):
+        """已发送的命令名称"""
+        return [cmd for cmd, _ in self.commands if cmd.startswith(prefix)]
+
+
+@pytest.fixture
+def fake_tab():
+    return FakeTab()
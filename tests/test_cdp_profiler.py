@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""CDP往返耗时分析测试
+
+验证工具调用中（包括 asyncio.to_thread 中执行的 run_cdp_commands）发出的CDP调用
+归属到对应工具，而不是 "(background)"。
+"""
+
+import asyncio
+import json
+
+import pytest
+from DrissionPage._base.driver import Driver
+
+from drissionpage_mcp.core.cdp_profiler import profiler, BACKGROUND
+from drissionpage_mcp.main import DrissionPageMCP
+from drissionpage_mcp.services.cdp_service import CDPService
+
+
+class _FakeDriver(Driver):
+    """不连接浏览器的驱动，_send 由测试替换"""
+
+    def __init__(self):
+        self.is_running = True
+        self.session_id = None
+
+
+class _FakeTab:
+    def __init__(self):
+        self.driver = _FakeDriver()
+
+    def run_cdp(self, cmd, **cmd_args):
+        return self.driver.run(cmd, **cmd_args)
+
+
+@pytest.fixture
+def server(monkeypatch):
+    monkeypatch.setattr(Driver, "_send", lambda self, msg, timeout=None: {"result": {}})
+    srv = DrissionPageMCP()
+    srv.cdp_service = CDPService(_FakeTab())
+    yield srv
+    profiler.disable()
+    profiler.reset()
+
+
+async def _read_report(srv):
+    contents = await srv.app.read_resource("status://cdp_profile")
+    first = contents[0]
+    return json.loads(first.content if hasattr(first, "content") else first.text)
+
+
+@pytest.mark.mock
+def test_run_cdp_commands_attributed_to_tool(server):
+    async def run():
+        await server.app.call_tool("set_cdp_profiling", {"enabled": True})
+        await server.app.call_tool("run_cdp_commands", {"commands": [
+            {"command": "DOM.getDocument"},
+            {"command": "Runtime.evaluate", "params": {"expression": "1"}},
+        ]})
+        return await _read_report(server)
+
+    report = asyncio.run(run())
+    tools = {t["tool"]: t for t in report["tools"]}
+    assert tools["run_cdp_commands"]["cdp_calls"] == 2
+    assert BACKGROUND not in tools
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""CDP服务批量命令测试"""
+
+import threading
+import time
+
+import pytest
+
+from drissionpage_mcp.services.cdp_service import CDPService
+
+
+@pytest.mark.mock
+def test_run_commands_sends_one_at_a_time(fake_tab):
+    active = []
+    overlaps = []
+
+    def slow(**params):
+        active.append(threading.get_ident())
+        if len(active) > 1:
+            overlaps.append(list(active))
+        time.sleep(0.01)
+        active.pop()
+        return {"ok": params}
+
+    fake_tab.responses["Page.getFrameTree"] = slow
+    fake_tab.responses["Network.getCookies"] = slow
+    fake_tab.responses["Bad.command"] = RuntimeError("boom")
+    service = CDPService(fake_tab)
+    result = service.run_commands([
+        {"command": "Page.getFrameTree"},
+        {"command": "Bad.command"},
+        {"params": {}},
+        {"command": "Network.getCookies", "params": {"urls": ["https://a.com"]}, "timeout": 3},
+    ], timeout=5)
+
+    assert overlaps == []
+    assert [r["command"] for r in result["results"]] == ["Page.getFrameTree", "Bad.command", None,
+                                                         "Network.getCookies"]
+    assert [r["ok"] for r in result["results"]] == [True, False, False, True]
+    assert result["results"][1]["error"] == "boom"
+    assert fake_tab.commands[-1] == ("Network.getCookies", {"_timeout": 3.0, "urls": ["https://a.com"]})
+    assert fake_tab.commands[0] == ("Page.getFrameTree", {"_timeout": 5.0})
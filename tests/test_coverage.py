@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""JS/CSS覆盖率计算测试"""
+
+import pytest
+
+from drissionpage_mcp.core.coverage import (
+    build_coverage_report, css_used_ranges, js_used_ranges, merge_ranges, resource_usage
+)
+
+
+def _function(*ranges):
+    return {"ranges": [{"startOffset": start, "endOffset": end, "count": count} for start, end, count in ranges]}
+
+
+@pytest.mark.unit
+def test_merge_ranges_joins_overlapping_and_adjacent():
+    assert merge_ranges([(5, 8), (0, 3), (3, 4), (7, 10), (12, 12), (20, 25)]) == [(0, 4), (5, 10), (20, 25)]
+    assert merge_ranges([]) == []
+
+
+@pytest.mark.unit
+def test_js_used_ranges_innermost_count_wins():
+    functions = [
+        _function((0, 100, 1)),
+        # 已执行的函数中未进入的分支
+        _function((10, 50, 1), (20, 30, 0)),
+        # 从未调用的函数
+        _function((60, 80, 0)),
+    ]
+    assert js_used_ranges(functions) == [(0, 20), (30, 60), (80, 100)]
+
+
+@pytest.mark.unit
+def test_js_used_ranges_shared_boundaries():
+    functions = [_function((0, 30, 1), (0, 10, 0), (10, 20, 2), (20, 30, 0))]
+    assert js_used_ranges(functions) == [(10, 20)]
+    assert js_used_ranges([_function((5, 5, 1))]) == []
+
+
+@pytest.mark.unit
+def test_css_used_ranges_per_sheet():
+    usage = [
+        {"styleSheetId": "a", "startOffset": 0, "endOffset": 10, "used": True},
+        {"styleSheetId": "a", "startOffset": 10, "endOffset": 20, "used": True},
+        {"styleSheetId": "a", "startOffset": 30, "endOffset": 40, "used": False},
+        {"styleSheetId": "b", "startOffset": 0, "endOffset": 5, "used": False},
+    ]
+    assert css_used_ranges(usage) == {"a": [(0, 20)], "b": []}
+
+
+@pytest.mark.unit
+def test_resource_usage_counts_utf8_bytes():
+    source = "ab" + "中" * 3 + "cd"
+    usage = resource_usage(source, [(0, 2)])
+    assert usage["total_bytes"] == 13
+    assert usage["used_bytes"] == 2
+    assert usage["unused_bytes"] == 11
+    assert usage["largest_unused_ranges"] == [{"start": 2, "end": 7, "bytes": 11}]
+
+
+@pytest.mark.unit
+def test_report_merges_same_url_and_ranks_by_unused():
+    big = dict(resource_usage("x" * 100, [(0, 10)]), type="js", url="https://a.com/big.js")
+    small = dict(resource_usage("y" * 10, [(0, 5)]), type="js", url="https://a.com/small.js")
+    report = build_coverage_report([small, big, dict(big)], top=5)
+    assert [r["url"] for r in report["resources"]] == ["https://a.com/big.js", "https://a.com/small.js"]
+    assert report["resources"][0]["instances"] == 2
+    assert report["totals"]["js"]["unused_bytes"] == 185
+    assert report["totals"]["js"]["unused_pct"] == pytest.approx(88.1)
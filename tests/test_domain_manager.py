@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""CDP域引用计数测试"""
+
+import pytest
+
+from drissionpage_mcp.core.domain_manager import CDPDomainManager
+
+
+class _FakeTab:
+    def __init__(self):
+        self.commands = []
+
+    def run_cdp(self, cmd, **cmd_args):
+        self.commands.append(cmd)
+        return {}
+
+
+@pytest.fixture
+def tab():
+    return _FakeTab()
+
+
+@pytest.mark.unit
+def test_enable_once_and_disable_with_last_owner(tab):
+    domains = CDPDomainManager(tab)
+    assert domains.acquire("Network", "a") is True
+    assert domains.acquire("Network", "b") is False
+    assert domains.acquire("Network", "a") is False
+    assert tab.commands == ["Network.enable"]
+
+    assert domains.release("Network", "a") is False
+    assert domains.is_enabled("Network")
+    assert domains.release("Network", "b") is True
+    assert tab.commands == ["Network.enable", "Network.disable"]
+    assert not domains.is_enabled("Network")
+    assert domains.owners("Network") == set()
+
+
+@pytest.mark.unit
+def test_release_by_non_owner_has_no_side_effects(tab):
+    domains = CDPDomainManager(tab)
+    domains.note_command("Network.enable")
+    assert domains.release("Network", "network:har") is False
+    assert tab.commands == []
+    assert domains.is_enabled("Network")
+
+    domains.acquire("Network", "a")
+    assert domains.release("Network", "b") is False
+    assert domains.owners("Network") == {"a"}
+    assert domains.get_stats()["disable_calls"] == 0
+
+
+@pytest.mark.unit
+def test_reenable_when_params_change(tab):
+    domains = CDPDomainManager(tab)
+    domains.acquire("Fetch", "blocker", patterns=[{"urlPattern": "*"}])
+    domains.acquire("Fetch", "blocker", patterns=[{"urlPattern": "*.js"}])
+    domains.acquire("Fetch", "replay")
+    assert tab.commands == ["Fetch.enable", "Fetch.enable"]
+
+
+@pytest.mark.unit
+def test_disable_command_drops_owners(tab):
+    domains = CDPDomainManager(tab)
+    domains.acquire("Network", "a")
+    domains.note_command("Network.disable")
+    assert domains.owners("Network") == set()
+    assert domains.release("Network", "a") is False
+    assert tab.commands == ["Network.enable"]
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""HAR流式导出测试"""
+
+import json
+
+import pytest
+
+from drissionpage_mcp.core.har_writer import HarWriter, build_har_entry
+from drissionpage_mcp.core.network_listener import NetworkListener
+
+
+def _request_event(request_id="1", url="https://a.com/api?x=1&y=", timestamp=100.0, **request):
+    return {"requestId": request_id, "timestamp": timestamp, "wallTime": 1700000000.0, "type": "XHR",
+            "request": {"url": url, "method": "GET", "headers": {"Accept": "*/*"}, **request}}
+
+
+def _response_event(request_id="1", status=200, **response):
+    return {"requestId": request_id, "response": {
+        "url": "https://a.com/api", "status": status, "statusText": "OK", "protocol": "h2",
+        "mimeType": "application/json", "headers": {"Set-Cookie": "a=1\nb=2"}, **response}}
+
+
+@pytest.mark.unit
+def test_build_har_entry_fields():
+    timing = {"requestTime": 100.0, "dnsStart": 1.0, "dnsEnd": 3.0, "connectStart": -1, "connectEnd": -1,
+              "sslStart": -1, "sslEnd": -1, "sendStart": 4.0, "sendEnd": 5.0, "receiveHeadersEnd": 25.0}
+    entry = build_har_entry(
+        _request_event(postData='{"a":1}', headers={"Content-Type": "application/json"}),
+        _response_event(timing=timing, remoteIPAddress="1.2.3.4"),
+        {"requestId": "1", "timestamp": 100.1, "encodedDataLength": 512},
+    )
+    assert entry["startedDateTime"] == "2023-11-14T22:13:20Z"
+    assert entry["time"] == pytest.approx(100.0)
+    assert entry["request"]["queryString"] == [{"name": "x", "value": "1"}, {"name": "y", "value": ""}]
+    assert entry["request"]["postData"] == {"mimeType": "application/json", "text": '{"a":1}'}
+    assert entry["request"]["bodySize"] == 7
+    assert entry["response"]["httpVersion"] == "HTTP/2.0"
+    assert entry["response"]["headers"] == [{"name": "Set-Cookie", "value": "a=1"},
+                                            {"name": "Set-Cookie", "value": "b=2"}]
+    assert entry["response"]["content"]["size"] == 512
+    assert entry["timings"]["dns"] == 2.0 and entry["timings"]["connect"] == -1
+    assert entry["timings"]["wait"] == 20.0
+    assert entry["timings"]["receive"] == pytest.approx(75.0)
+    assert entry["serverIPAddress"] == "1.2.3.4"
+
+
+@pytest.mark.unit
+def test_build_har_entry_failed_and_redirect():
+    failed = build_har_entry(_request_event(), error_text="net::ERR_FAILED")
+    assert failed["response"]["status"] == 0
+    assert failed["response"]["statusText"] == "net::ERR_FAILED"
+    assert failed["_error"] == "net::ERR_FAILED"
+
+    redirect = build_har_entry(_request_event(), finish_event=_request_event(timestamp=100.05),
+                               redirect_response={"status": 302, "headers": {"Location": "/next"}})
+    assert redirect["response"]["status"] == 302
+    assert redirect["response"]["redirectURL"] == "/next"
+
+
+@pytest.mark.unit
+def test_har_writer_streams_valid_json(tmp_path):
+    writer = HarWriter(tmp_path / "out" / "a.har")
+    for i in range(3):
+        writer.write_entry({"index": i})
+    writer.close()
+    writer.write_entry({"index": 99})
+    writer.close()
+    data = json.loads((tmp_path / "out" / "a.har").read_text(encoding="utf-8"))
+    assert data["log"]["version"] == "1.2"
+    assert [e["index"] for e in data["log"]["entries"]] == [0, 1, 2]
+    assert writer.count == 3
+
+
+@pytest.mark.unit
+def test_har_writer_empty_file_is_valid(tmp_path):
+    writer = HarWriter(tmp_path / "empty.har")
+    writer.close()
+    assert json.loads((tmp_path / "empty.har").read_text(encoding="utf-8"))["log"]["entries"] == []
+
+
+@pytest.mark.mock
+def test_recording_survives_listener_lookup_and_stops(fake_tab, tmp_path):
+    listener = NetworkListener.for_tab(fake_tab)
+    path = tmp_path / "rec.har"
+    assert "已开始" in listener.start_har_recording(str(path))
+
+    fake_tab.driver.emit("Network.requestWillBeSent", **_request_event("1"))
+    fake_tab.driver.emit("Network.responseReceived", **_response_event("1"))
+    fake_tab.driver.emit("Network.loadingFinished", requestId="1", timestamp=100.2, encodedDataLength=10)
+    fake_tab.driver.emit("Network.requestWillBeSent", **_request_event("2"))
+
+    # 重新初始化服务时取回的是同一个监听器，录制可以继续停止
+    assert NetworkListener.for_tab(fake_tab) is listener
+    result = listener.stop_har_recording()
+    assert result == {"path": str(path), "entries": 2, "incomplete": 1}
+    data = json.loads(path.read_text(encoding="utf-8"))
+    assert [e["_requestId"] for e in data["log"]["entries"]] == ["1", "2"]
+    assert fake_tab.sent("Network.") == ["Network.enable", "Network.disable"]
+    assert listener.stop_har_recording() == {"error": "HAR录制未开始"}
+
+
+@pytest.mark.mock
+def test_stop_without_recording_keeps_network_enabled(fake_tab):
+    listener = NetworkListener.for_tab(fake_tab)
+    listener.enable_network_domain()
+    assert listener.stop_har_recording() == {"error": "HAR录制未开始"}
+    assert fake_tab.sent("Network.") == ["Network.enable"]
+
+
+@pytest.mark.mock
+def test_close_all_finishes_active_recording(fake_tab, tmp_path):
+    listener = NetworkListener.for_tab(fake_tab)
+    listener.start_har_recording(str(tmp_path / "exit.har"))
+    fake_tab.driver.emit("Network.requestWillBeSent", **_request_event("7"))
+    NetworkListener.close_all()
+    data = json.loads((tmp_path / "exit.har").read_text(encoding="utf-8"))
+    assert data["log"]["entries"][0]["_error"] == "incomplete"
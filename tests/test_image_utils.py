@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""截图差异区域检测测试"""
+
+import pytest
+
+from drissionpage_mcp.utils.image_utils import find_changed_regions
+
+np = pytest.importorskip("numpy")
+
+
+def _frame(height=64, width=64):
+    return np.zeros((height, width), dtype=np.uint8)
+
+
+@pytest.mark.unit
+def test_identical_frames_have_no_regions():
+    assert find_changed_regions(_frame(), _frame()) == {"regions": [], "changed_ratio": 0.0}
+
+
+@pytest.mark.unit
+def test_changed_block_bounding_box():
+    current = _frame()
+    current[20:24, 36:40] = 200
+    result = find_changed_regions(_frame(), current, block_size=16)
+    assert result["regions"] == [{"x": 32, "y": 16, "width": 16, "height": 16}]
+    assert result["changed_ratio"] == pytest.approx(1 / 16)
+
+
+@pytest.mark.unit
+def test_threshold_ignores_small_differences():
+    current = _frame()
+    current[0:8, 0:8] = 10
+    assert find_changed_regions(_frame(), current, threshold=24)["regions"] == []
+    assert len(find_changed_regions(_frame(), current, threshold=5)["regions"]) == 1
+
+
+@pytest.mark.unit
+def test_padding_merges_nearby_blocks_and_sorts_by_area():
+    current = _frame(64, 128)
+    current[0, 0] = 255
+    current[0, 40] = 255
+    current[60, 120] = 255
+    result = find_changed_regions(_frame(64, 128), current, block_size=16, padding=1)
+    assert result["regions"] == [
+        {"x": 0, "y": 0, "width": 48, "height": 16},
+        {"x": 112, "y": 48, "width": 16, "height": 16},
+    ]
+    separate = find_changed_regions(_frame(64, 128), current, block_size=16, padding=0)
+    assert len(separate["regions"]) == 3
+
+
+@pytest.mark.unit
+def test_partial_edge_blocks_clipped_to_frame():
+    previous = _frame(20, 20)
+    current = previous.copy()
+    current[19, 19] = 255
+    assert find_changed_regions(previous, current, block_size=16)["regions"] == [
+        {"x": 16, "y": 16, "width": 4, "height": 4}
+    ]
+
+
+@pytest.mark.unit
+def test_shape_change_is_full_frame():
+    result = find_changed_regions(_frame(32, 32), _frame(48, 32))
+    assert result == {"regions": [{"x": 0, "y": 0, "width": 32, "height": 48}], "changed_ratio": 1.0}
+    assert find_changed_regions(None, _frame())["changed_ratio"] == 1.0
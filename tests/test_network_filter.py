@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""网络事件过滤器测试"""
+
+import pytest
+
+from drissionpage_mcp.core.network_filter import HostTrie, NetworkFilter
+
+
+def _response(url, status=200, mime_type="application/json", resource_type="XHR"):
+    return {"type": resource_type, "response": {"url": url, "status": status, "mimeType": mime_type}}
+
+
+@pytest.mark.unit
+def test_host_trie_matches_domain_and_subdomains():
+    trie = HostTrie(["example.com", "*.cdn.net"])
+    assert trie.matches("example.com")
+    assert trie.matches("api.example.com")
+    assert trie.matches("img.cdn.net")
+    assert not trie.matches("notexample.com")
+    assert not trie.matches("com")
+    assert not HostTrie()
+
+
+@pytest.mark.unit
+def test_url_patterns_are_or_combined():
+    network_filter = NetworkFilter(url_patterns=[r"/api/v\d+/", r"\.json$"])
+    assert network_filter.match_url("https://a.com/api/v2/users")
+    assert network_filter.match_url("https://a.com/data.json")
+    assert not network_filter.match_url("https://a.com/index.html")
+
+
+@pytest.mark.unit
+def test_invalid_regex_raises_value_error():
+    with pytest.raises(ValueError):
+        NetworkFilter(url_patterns=["("])
+
+
+@pytest.mark.unit
+def test_conditions_are_and_combined():
+    network_filter = NetworkFilter(mime_types=["json"], hosts=["example.com"],
+                                   status_ranges=["2xx", 304], resource_types=["xhr"])
+    assert network_filter.match_response(_response("https://api.example.com/x"))
+    assert network_filter.match_response(_response("https://example.com/x", status=304))
+    assert not network_filter.match_response(_response("https://other.com/x"))
+    assert not network_filter.match_response(_response("https://example.com/x", status=404))
+    assert not network_filter.match_response(_response("https://example.com/x", mime_type="text/html"))
+    assert not network_filter.match_response(_response("https://example.com/x", resource_type="Image"))
+
+
+@pytest.mark.unit
+def test_mime_type_forms():
+    network_filter = NetworkFilter(mime_types=["application/json", "image/*"])
+    assert network_filter.match_mime("application/json; charset=utf-8")
+    assert network_filter.match_mime("image/png")
+    assert not network_filter.match_mime("text/plain")
+    assert NetworkFilter(mime_types=["*/*"]).match_mime("text/plain")
+
+
+@pytest.mark.unit
+def test_status_ranges():
+    network_filter = NetworkFilter(status_ranges=["400-404", "5xx"])
+    assert network_filter.match_status(403)
+    assert network_filter.match_status(503)
+    assert not network_filter.match_status(405)
+    with pytest.raises(ValueError):
+        NetworkFilter(status_ranges=["abc"])
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""网络监听器响应体捕获测试"""
+
+import time
+
+import pytest
+
+from drissionpage_mcp.core.network_listener import NetworkListener
+from drissionpage_mcp.core.response_body_store import ResponseBodyStore
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "等待超时"
+        time.sleep(0.01)
+
+
+def _emit_response(tab, request_id, size=10):
+    tab.driver.emit("Network.responseReceived", requestId=request_id, type="XHR",
+                    response={"url": f"https://a.com/{request_id}", "status": 200, "mimeType": "application/json"})
+    tab.driver.emit("Network.loadingFinished", requestId=request_id, encodedDataLength=size)
+
+
+@pytest.mark.mock
+def test_body_capture_counts_and_releases_pool(fake_tab, tmp_path):
+    fake_tab.responses["Network.getResponseBody"] = (
+        lambda requestId: {"body": '{"id": "%s"}' % requestId, "base64Encoded": False})
+    listener = NetworkListener(fake_tab, body_store=ResponseBodyStore(spill_dir=tmp_path))
+    listener.enable_body_capture()
+    for i in range(50):
+        _emit_response(fake_tab, str(i))
+    _emit_response(fake_tab, "big", size=100 * 1024 * 1024)
+    _wait_for(lambda: listener.get_body_capture_stats()["captured"] == 50)
+
+    stats = listener.get_body_capture_stats()
+    assert stats["skipped_too_large"] == 1 and stats["failed"] == 0
+    assert listener.get_response_body("7")["body"] == '{"id": "7"}'
+
+    executor = listener._body_executor
+    listener.disable_body_capture()
+    assert listener._body_executor is None and executor._shutdown
+
+    listener.enable_body_capture()
+    assert listener._body_executor is not None
+    listener.close()
+    assert listener._body_executor is None
+    assert fake_tab.sent("Network.disable") == ["Network.disable", "Network.disable"]
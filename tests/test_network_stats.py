@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""网络统计测试"""
+
+import pytest
+
+from drissionpage_mcp.core.network_stats import LogHistogram, NetworkStats
+
+
+@pytest.mark.unit
+def test_percentiles_within_relative_error():
+    histogram = LogHistogram(precision=0.02)
+    for value in range(1, 1001):
+        histogram.record(value)
+    assert histogram.count == 1000
+    assert histogram.mean == pytest.approx(500.5)
+    for p, expected in ((50, 500), (95, 950), (99, 990)):
+        assert histogram.percentile(p) == pytest.approx(expected, rel=0.02)
+    assert histogram.percentile(100) == pytest.approx(1000, rel=0.02)
+
+
+@pytest.mark.unit
+def test_percentile_clamped_to_observed_range():
+    histogram = LogHistogram()
+    assert histogram.percentile(50) is None and histogram.mean is None
+    histogram.record(42.0)
+    assert histogram.percentile(0) == 42.0
+    assert histogram.percentile(99) == 42.0
+    histogram.record(-5)
+    assert histogram.min == 0.0
+
+
+@pytest.mark.unit
+def test_network_stats_groups_finished_requests():
+    stats = NetworkStats()
+    stats.on_response(requestId="1", type="XHR",
+                      response={"url": "https://api.a.com/x", "timing": {"requestTime": 10.0, "receiveHeadersEnd": 30}})
+    stats.on_finished(requestId="1", timestamp=10.2, encodedDataLength=2048)
+    stats.on_response(requestId="2", type="Image", response={"url": "https://a.com/y.png"}, timestamp=11.0)
+    stats.on_failed(requestId="2")
+    stats.on_finished(requestId="unknown", timestamp=12.0)
+
+    rows = {row["host"]: row for row in stats.get_table("host")}
+    assert rows["api.a.com"]["count"] == 1
+    assert rows["api.a.com"]["bytes_kb"] == 2.0
+    assert rows["api.a.com"]["p50_ms"] == pytest.approx(200, rel=0.02)
+    assert rows["api.a.com"]["ttfb_p50_ms"] == pytest.approx(30, rel=0.02)
+    assert rows["a.com"]["failed"] == 1
+    assert stats.summary()["requests"] == 1 and stats.summary()["inflight"] == 0
+    with pytest.raises(ValueError):
+        stats.get_table("path")
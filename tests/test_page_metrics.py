@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+"""页面性能指标采集器测试"""
+
+import pytest
+
+from drissionpage_mcp.core.page_metrics import PageMetricsCollector
+
+
+@pytest.mark.mock
+def test_install_once_per_tab_and_uninstall_after_lookup(fake_tab):
+    fake_tab.run_js = lambda script, *args: None
+    fake_tab.responses["Page.addScriptToEvaluateOnNewDocument"] = {"identifier": "7"}
+    collector = PageMetricsCollector.for_tab(fake_tab)
+    assert "已安装" in collector.install()
+
+    # 重新初始化服务时取回同一个采集器，不会再注册一次
+    again = PageMetricsCollector.for_tab(fake_tab)
+    assert again is collector and again.installed
+    again.install()
+    assert fake_tab.sent("Page.addScript") == ["Page.addScriptToEvaluateOnNewDocument"]
+
+    assert again.uninstall() == "页面性能观察器已移除"
+    assert fake_tab.commands[-1] == ("Page.removeScriptToEvaluateOnNewDocument", {"identifier": "7"})
+    assert not again.installed
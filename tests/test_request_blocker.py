@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+"""请求拦截测试"""
+
+import pytest
+
+from drissionpage_mcp.core.network_listener import NetworkListener
+from drissionpage_mcp.core.request_blocker import RequestBlocker, site_of
+
+
+@pytest.mark.unit
+def test_site_of():
+    assert site_of("a.b.example.com") == "example.com"
+    assert site_of("www.example.co.uk") == "example.co.uk"
+    assert site_of("example.com") == "example.com"
+
+
+@pytest.mark.mock
+def test_blocking_can_be_turned_off_after_rebuild(fake_tab):
+    fake_tab.url = "https://example.com/"
+    blocker = RequestBlocker.for_tab(fake_tab, NetworkListener.for_tab(fake_tab))
+    assert "已启用" in blocker.apply(profiles=["no-images"])
+    assert fake_tab.sent("Fetch.") == ["Fetch.enable"]
+
+    # 重新初始化服务（connect_browser / new_tab）时取回同一个拦截器
+    rebuilt = RequestBlocker.for_tab(fake_tab, NetworkListener.for_tab(fake_tab))
+    assert rebuilt is blocker and rebuilt.uses_fetch
+    assert rebuilt.apply([]) == "请求拦截已关闭"
+    assert fake_tab.sent("Fetch.") == ["Fetch.enable", "Fetch.disable"]
+    assert not fake_tab.driver.event_handlers.get("Fetch.requestPaused")
+
+
+@pytest.mark.mock
+def test_paused_requests_blocked_by_type(fake_tab):
+    fake_tab.url = "https://example.com/"
+    blocker = RequestBlocker.for_tab(fake_tab, NetworkListener.for_tab(fake_tab))
+    blocker.apply(profiles=["no-images"])
+    fake_tab.driver.emit("Fetch.requestPaused", requestId="1", resourceType="Image",
+                         request={"url": "https://example.com/a.png"})
+    fake_tab.driver.emit("Fetch.requestPaused", requestId="2", resourceType="Script",
+                         request={"url": "https://example.com/a.js"})
+    assert fake_tab.sent("Fetch.") == ["Fetch.enable", "Fetch.failRequest", "Fetch.continueRequest"]
+    stats = blocker.get_stats()
+    assert stats["blocked_requests"] == 1 and stats["by_rule"] == {"type:Image": 1}
+    blocker.disable()
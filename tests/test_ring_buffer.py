@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""环形缓冲区测试"""
+
+import pytest
+
+from drissionpage_mcp.utils.ring_buffer import RingBuffer
+
+
+@pytest.mark.unit
+def test_wraparound_keeps_newest_and_counts_dropped():
+    buffer = RingBuffer(capacity=3)
+    for i in range(5):
+        assert buffer.append(i) == i
+    assert buffer.tail() == [2, 3, 4]
+    assert buffer.tail(2) == [3, 4]
+    assert buffer.latest() == 4
+    assert len(buffer) == 3
+    stats = buffer.stats()
+    assert stats["dropped"] == 2
+    assert stats["total_appended"] == 5
+    assert stats["cursor"] == 5
+
+
+@pytest.mark.unit
+def test_since_pages_with_cursor():
+    buffer = RingBuffer(capacity=10)
+    for i in range(7):
+        buffer.append(i)
+    items, cursor = buffer.since(0, limit=3)
+    assert items == [0, 1, 2] and cursor == 3
+    items, cursor = buffer.since(cursor, limit=3)
+    assert items == [3, 4, 5] and cursor == 6
+    items, cursor = buffer.since(cursor)
+    assert items == [6] and cursor == 7
+    items, cursor = buffer.since(cursor)
+    assert items == [] and cursor == 7
+
+
+@pytest.mark.unit
+def test_since_skips_overwritten_entries():
+    buffer = RingBuffer(capacity=3)
+    for i in range(6):
+        buffer.append(i)
+    # 游标 1 对应的数据已被覆盖，从最旧的有效数据开始
+    items, cursor = buffer.since(1)
+    assert items == [3, 4, 5] and cursor == 6
+
+
+@pytest.mark.unit
+def test_clear_keeps_cursor_valid():
+    buffer = RingBuffer(capacity=4)
+    buffer.append("a")
+    buffer.append("b")
+    _, cursor = buffer.since(0)
+    buffer.clear()
+    assert buffer.tail() == [] and buffer.latest() is None
+    buffer.append("c")
+    assert buffer.since(cursor) == (["c"], 3)
+
+
+@pytest.mark.unit
+def test_from_key_bisects_live_window():
+    buffer = RingBuffer(capacity=4)
+    for seq in (1, 3, 5, 7, 9, 11):
+        buffer.append({"seq": seq})
+
+    def seq_of(item):
+        return item["seq"]
+
+    assert [i["seq"] for i in buffer.from_key(0, seq_of)] == [5, 7, 9, 11]
+    assert [i["seq"] for i in buffer.from_key(6, seq_of)] == [7, 9, 11]
+    assert [i["seq"] for i in buffer.from_key(7, seq_of, limit=2)] == [7, 9]
+    assert buffer.from_key(12, seq_of) == []
+    assert RingBuffer(2).from_key(0, seq_of) == []
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""流式消息存储测试"""
+
+import pytest
+
+from drissionpage_mcp.core.stream_frames import StreamFrameStore
+
+
+def _store_with_frames():
+    store = StreamFrameStore(max_connections=10, max_frames=3)
+    a = store.open("a", "WebSocket", "wss://a")
+    b = store.open("b", "EventSource", "https://b")
+    for i in range(6):
+        store.append(a if i % 2 == 0 else b, {"data": i})
+    return store
+
+
+@pytest.mark.unit
+def test_since_merges_connections_in_seq_order():
+    result = _store_with_frames().since(0)
+    assert [f["seq"] for f in result["frames"]] == [0, 1, 2, 3, 4, 5]
+    assert result["cursor"] == 6
+
+
+@pytest.mark.unit
+def test_since_pages_with_cursor_and_limit():
+    store = _store_with_frames()
+    first = store.since(0, limit=4)
+    assert [f["seq"] for f in first["frames"]] == [0, 1, 2, 3]
+    second = store.since(first["cursor"], limit=4)
+    assert [f["seq"] for f in second["frames"]] == [4, 5]
+    assert store.since(second["cursor"]) == {"frames": [], "cursor": 6}
+
+
+@pytest.mark.unit
+def test_since_skips_overwritten_frames_and_filters_connection():
+    store = _store_with_frames()
+    a = store.get("a")
+    for i in range(4):
+        store.append(a, {"data": i})
+    # a 只保留最新 3 帧（序号 7、8、9），b 保留 1、3、5
+    assert [f["seq"] for f in store.since(0)["frames"]] == [1, 3, 5, 7, 8, 9]
+    only_a = store.since(0, connection_id="a")
+    assert [f["seq"] for f in only_a["frames"]] == [7, 8, 9]
+    assert store.since(0, connection_id="missing") == {"frames": [], "cursor": 10}
+
+
+@pytest.mark.unit
+def test_eviction_prefers_closed_connections():
+    store = StreamFrameStore(max_connections=2, max_frames=3)
+    store.open("a", "WebSocket", "wss://a", 1.0)
+    store.open("b", "WebSocket", "wss://b", 2.0)
+    store.close("b", 3.0)
+    store.open("c", "WebSocket", "wss://c", 4.0)
+    assert {c["connection_id"] for c in store.connections()} == {"a", "c"}
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+"""限速管理测试"""
+
+import pytest
+
+from drissionpage_mcp.core.domain_manager import CDPDomainManager
+from drissionpage_mcp.core.throttling import ThrottlingManager
+
+
+@pytest.mark.mock
+def test_apply_and_restore_release_network(fake_tab):
+    throttling = ThrottlingManager.for_tab(fake_tab)
+    assert "slow-3g" in throttling.apply("slow-3g")
+    assert throttling.active_name == "slow-3g"
+    assert CDPDomainManager.for_tab(fake_tab).owners("Network") == {"throttling"}
+    assert throttling.restore() == "已恢复不限速（原方案 slow-3g）"
+    assert fake_tab.sent("Network.") == ["Network.enable", "Network.emulateNetworkConditions",
+                                         "Network.emulateNetworkConditions", "Network.disable"]
+
+
+@pytest.mark.mock
+def test_failed_restore_still_releases_network(fake_tab):
+    throttling = ThrottlingManager.for_tab(fake_tab)
+    throttling.apply("slow-3g")
+    fake_tab.responses["Network.emulateNetworkConditions"] = RuntimeError("连接已断开")
+    assert throttling.restore().startswith("恢复限速失败")
+    assert throttling.active_name is None
+    domains = CDPDomainManager.for_tab(fake_tab)
+    assert domains.owners("Network") == set()
+    assert not domains.is_enabled("Network")
+
+
+@pytest.mark.mock
+def test_applied_scope_restores_previous(fake_tab):
+    throttling = ThrottlingManager.for_tab(fake_tab)
+    throttling.apply("fast-3g")
+    with throttling.applied("slow-3g") as settings:
+        assert settings["profile"] == "slow-3g"
+        assert throttling.active_name == "slow-3g"
+    assert throttling.active_name == "fast-3g"
+    throttling.restore()
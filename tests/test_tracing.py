@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""性能追踪数据流读取测试"""
+
+import base64
+import gzip
+import json
+
+import pytest
+
+from drissionpage_mcp.services.cdp_service import CDPService
+
+
+def _trace_bytes(tasks=200):
+    events = [{"name": "RunTask", "ph": "X", "pid": 1, "tid": 1, "ts": i * 100000, "dur": 60000}
+              for i in range(tasks)]
+    return gzip.compress(json.dumps({"traceEvents": events}).encode("utf-8"))
+
+
+def _start(fake_tab, stream="stream-1", complete=True):
+    service = CDPService(fake_tab)
+    if complete:
+        fake_tab.responses["Tracing.end"] = lambda: fake_tab.driver.emit(
+            "Tracing.tracingComplete", stream=stream, dataLossOccurred=False) or {}
+    assert "已开始" in service.start_tracing(["devtools.timeline"])
+    return service
+
+
+@pytest.mark.mock
+def test_complete_stream_is_saved_and_closed(fake_tab, tmp_path):
+    service = _start(fake_tab)
+    data = _trace_bytes()
+    fake_tab.responses["IO.read"] = lambda handle, size: {
+        "data": base64.b64encode(data).decode("ascii"), "base64Encoded": True, "eof": True}
+    result = service.stop_tracing(str(tmp_path / "full.json.gz"))
+    assert result["truncated"] is False and "truncated_reason" not in result
+    assert result["summary"]["events"] == 200
+    assert ("IO.close", {"handle": "stream-1"}) in fake_tab.commands
+
+
+@pytest.mark.mock
+def test_read_timeout_keeps_partial_trace(fake_tab, tmp_path):
+    service = _start(fake_tab)
+    data = _trace_bytes()
+    chunks = [data[:len(data) // 2]]
+
+    def read(handle, size):
+        if not chunks:
+            raise TimeoutError("IO.read 超时")
+        return {"data": base64.b64encode(chunks.pop()).decode("ascii"), "base64Encoded": True, "eof": False}
+
+    fake_tab.responses["IO.read"] = read
+    result = service.stop_tracing(str(tmp_path / "partial.json.gz"))
+    assert result["truncated"] is True
+    assert "IO.read 超时" in result["truncated_reason"]
+    # 摘要按已写入的部分生成
+    assert 0 < result["summary"]["events"] < 200
+    assert fake_tab.sent("IO.close") == ["IO.close"]
+
+
+@pytest.mark.mock
+def test_late_stream_after_wait_timeout_is_closed(fake_tab, tmp_path):
+    service = _start(fake_tab, complete=False)
+    result = service.stop_tracing(str(tmp_path / "late.json.gz"), timeout=0.05)
+    assert "超时" in result["error"]
+    assert fake_tab.sent("IO.") == []
+
+    fake_tab.driver.emit("Tracing.tracingComplete", stream="late-stream")
+    assert fake_tab.commands[-1] == ("IO.close", {"handle": "late-stream"})
+    assert "Tracing.tracingComplete" not in fake_tab.driver.event_handlers
+    assert not (tmp_path / "late.json.gz").exists()